@@ -1,17 +1,27 @@
 import math
 import random
-from project.utils import wrap_delta
-from project.config import FIELD_W, FIELD_H
+import time
+from collections import namedtuple
+from project.config import AI_PLANNER_STEPS_PER_TICK
+from project.planner import Search, heading
+from project.ships.base_ship import apply_thrust
+
+# Намерение контроллера, которое применяется каждый шаг до следующего решения
+Intent = namedtuple("Intent", "target_angle thrust fire_primary fire_secondary")
 
 
 class AIController:
-    def __init__(self, ship, difficulty="Medium"):
+    def __init__(self, ship, difficulty="Medium", seed=None):
         """
         Базовый AI-контроллер с общими методами навигации, уклонения и стрельбы.
         difficulty: "Easy", "Medium" или "Hard"
+        seed – зерно случайных решений (для воспроизводимых матчей),
+        без него используется общий модуль random.
         """
         self.ship = ship
         self.difficulty = difficulty
+        self.seed = seed
+        self.decisions = 0
         if self.difficulty == "Easy":
             self.reaction_time = 0.5  # замедленная реакция
             self.dodge_chance = 0.3  # 30% вероятность уклонения
@@ -22,22 +32,34 @@ class AIController:
             self.reaction_time = 0.1
             self.dodge_chance = 1.0
         self._decision_timer = 0.0
+        self.game_time = 0
+        self.fired = []
 
-    def update(self, dt, enemy, obstacles, projectiles):
+    def update(self, dt, enemy, perception, game_time=0, worker=None):
+        """
+        Принимает решение и управляет кораблём. perception – снимок мира на этот шаг (Perception),
+        из него берётся вид со своего корабля только в шаги, когда принимается решение.
+        worker – AIWorker для решений вне основного потока (используют только контроллеры, которым он нужен).
+        Возвращает список снарядов, выпущенных кораблём в этом обновлении.
+        """
         # Отладка: выводим информацию об update
         # print(f"[AI UPDATE] Ship: {self.ship.name} | dt: {dt:.3f} | reaction_time: {self.reaction_time}")
+        self.game_time = game_time
+        self.fired = []
         self._decision_timer += dt
         if self._decision_timer < self.reaction_time:
-            return  # пропускаем обновление, если не прошёл интервал реакции
+            return self.fired  # пропускаем обновление, если не прошёл интервал реакции
         self._decision_timer = 0.0
+        rng = self.decision_rng()
+        view = perception.view(self.ship, enemy)
 
         # Проверяем препятствия – если обнаружено, получаем угол уклонения
-        avoid_direction = self.avoid_obstacles(obstacles)
+        avoid_direction = self.avoid_obstacles(view)
         #if avoid_direction is not None:
             # print(f"[AI] {self.ship.name} обнаружил препятствие, корректировка угла на {avoid_direction:.1f}")
 
         # Получаем базовый целевой угол и решение о тяге – определяется в подклассах
-        target_angle, thrust = self.determine_movement(enemy)
+        target_angle, thrust = self.determine_movement(view)
         #print(f"[AI] {self.ship.name} базовый target_angle: {target_angle:.1f}, thrust: {thrust}")
 
         # Если обнаружено препятствие, переопределяем целевой угол
@@ -46,8 +68,8 @@ class AIController:
             thrust = True
 
         # Если обнаружены вражеские снаряды, по вероятности (зависит от сложности) уклоняемся
-        if self.check_dodge_needed(projectiles):
-            dodge_angle = (self.ship.angle + (90 if random.random() < 0.5 else -90)) % 360
+        if self.check_dodge_needed(view, rng):
+            dodge_angle = (self.ship.angle + (90 if rng.random() < 0.5 else -90)) % 360
             #print(f"[AI] {self.ship.name} уклоняется: новый target_angle {dodge_angle:.1f}")
             target_angle = dodge_angle
             thrust = True
@@ -59,36 +81,45 @@ class AIController:
             #print(f"[AI] {self.ship.name} применяет ускорение")
             self.ship.accelerate()
         # Вызываем метод стрельбы (определяется в подклассах)
-        self.fire_weapons(enemy)
+        self.fire_weapons(view)
+        return self.fired
+
+    def decision_rng(self):
+        # Генератор одного решения выводится из зерна и номера решения,
+        # поэтому его состояние не нужно хранить в снимках матча
+        self.decisions += 1
+        if self.seed is None:
+            return random
+        return random.Random(f"{self.seed}:{self.decisions}")
+
+    def launch(self, fired):
+        # Запоминаем выпущенные снаряды, чтобы вернуть их в игровой мир
+        if not fired:
+            return
+        if isinstance(fired, list):
+            self.fired.extend(fired)
+        else:
+            self.fired.append(fired)
 
-    def determine_movement(self, enemy):
+    def determine_movement(self, view):
         raise NotImplementedError("determine_movement() must be implemented in subclass.")
 
-    def fire_weapons(self, enemy):
+    def fire_weapons(self, view):
         raise NotImplementedError("fire_weapons() must be implemented in subclass.")
 
-    def avoid_obstacles(self, obstacles):
-        for obs in obstacles:
-            dx = obs.x - self.ship.x
-            dy = obs.y - self.ship.y
-            safe_dist = (obs.radius + getattr(self.ship, "radius", 0) + 50) ** 2
-            if dx * dx + dy * dy < safe_dist:
-                angle_to_obs = math.degrees(math.atan2(dy, dx))
-                avoid_angle = (angle_to_obs + 90) % 360
-                return avoid_angle
+    def avoid_obstacles(self, view):
+        # Препятствия в виде отсортированы по зазору – достаточно ближайшего
+        nearest = view.nearest_obstacle()
+        if nearest is not None and nearest.clearance < 50:
+            angle_to_obs = math.degrees(math.atan2(nearest.dy, nearest.dx))
+            return (angle_to_obs + 90) % 360
         return None
 
-    def check_dodge_needed(self, projectiles):
-        for proj in projectiles:
-            dx = self.ship.x - proj.x
-            dy = self.ship.y - proj.y
-            if dx * dx + dy * dy < 100 ** 2:
-                proj_angle = math.degrees(math.atan2(proj.vy, proj.vx))
-                angle_to_ship = math.degrees(math.atan2(dy, dx))
-                angle_diff = abs((proj_angle - angle_to_ship + 180) % 360 - 180)
-                if angle_diff < 30:
-                    if random.random() < self.dodge_chance:
-                        return True
+    def check_dodge_needed(self, view, rng=random):
+        for threat in view.threats:
+            if threat.distance < 100 and threat.heading_error < 30:
+                if rng.random() < self.dodge_chance:
+                    return True
         return False
 
     def turn_towards(self, target_angle, dt):
@@ -102,49 +133,102 @@ class AIController:
 
 
 class EarthlingAIController(AIController):
-    def determine_movement(self, enemy):
-        dx = enemy.x - self.ship.x
-        dy = enemy.y - self.ship.y
-        angle_to_enemy = math.degrees(math.atan2(dy, dx))
+    def determine_movement(self, view):
         # Агрессивно – всегда двигаться в сторону врага
-        return angle_to_enemy, True
+        return view.enemy_bearing, True
 
-    def fire_weapons(self, enemy):
-        dx = enemy.x - self.ship.x
-        dy = enemy.y - self.ship.y
-        angle_to_enemy = math.degrees(math.atan2(dy, dx))
-        angle_diff = abs((angle_to_enemy - self.ship.angle + 180) % 360 - 180)
+    def fire_weapons(self, view):
+        angle_diff = abs((view.enemy_bearing - self.ship.angle + 180) % 360 - 180)
         missile_range = 700.0
-        distance = math.hypot(dx, dy)
-        if angle_diff < 30 and distance <= missile_range:
+        if angle_diff < 30 and view.enemy_distance <= missile_range:
             #print(f"[AI] {self.ship.name} стреляет ракетой (fire_primary)")
-            self.ship.fire_primary(enemy, 0)
+            self.launch(self.ship.fire_primary(view.enemy, self.game_time))
+
+
+class PlannerAIController(AIController):
+    """
+    Awesome Cyborg: решение выбирает планировщик (project.planner) по прогнозу на 1–2 секунды.
+    Поиск начинается в шаг решения и продолжается в следующих шагах порциями не больше
+    AI_PLANNER_STEPS_PER_TICK шагов прогноза, а с time_budget – ещё и не дольше time_budget
+    секунд за шаг. Через reaction_time лучший найденный план становится намерением, и начинается
+    поиск из нового положения; до этого корабль выполняет прежнее намерение.
+    Без time_budget результат не зависит от скорости машины (записи и турниры воспроизводимы).
+    С worker поиск целиком выполняется в AIWorker, а план применяется на границе шага, когда готов.
+    """
+    def __init__(self, ship, difficulty="Hard", seed=None, time_budget=None):
+        super().__init__(ship, difficulty, seed)
+        self.time_budget = time_budget
+        self.search = None
+        self.intent = None
+
+    def update(self, dt, enemy, perception, game_time=0, worker=None):
+        # Предел времени считается от начала update(): в него входят и вид мира, и новый поиск
+        started = time.perf_counter()
+        self.game_time = game_time
+        self.fired = []
+        self._decision_timer += dt
+        if worker is not None:
+            self.decide_with_worker(enemy, perception, worker)
+        elif self.search is None or self._decision_timer >= self.reaction_time:
+            self._decision_timer = 0.0
+            self.decisions += 1
+            view = perception.view(self.ship, enemy)
+            self.intent = self.commit(view, self.search.result() if self.search is not None else None)
+            # Оценка стоимости шага прогноза переходит в следующий поиск
+            step_cost = self.search.step_cost if self.search is not None else 0.0
+            self.search = Search(self.ship, view, perception.wells, game_time, self.reaction_time, step_cost)
+        if self.search is not None and worker is None:
+            deadline = started + self.time_budget if self.time_budget is not None else None
+            self.search.run(AI_PLANNER_STEPS_PER_TICK, deadline)
+        self.apply_intent(self.intent, enemy, dt)
+        return self.fired
+
+    def decide_with_worker(self, enemy, perception, worker):
+        key = self.ship.id
+        if self.intent is not None and (self._decision_timer < self.reaction_time or worker.busy(key)):
+            return  # рано или рабочий не успел – корабль выполняет прежнее намерение
+        self._decision_timer = 0.0
+        self.decisions += 1
+        view = perception.view(self.ship, enemy)
+        self.intent = self.commit(view, worker.collect(key, self.game_time))
+        self.search = None
+        worker.submit(key, Search(self.ship, view, perception.wells, self.game_time, self.reaction_time))
+
+    def commit(self, view, plan):
+        """Намерение из плана; без плана – доворот на врага с тягой."""
+        if plan is None:
+            return Intent(heading(view.enemy_dx, view.enemy_dy), True, False, False)
+        target = (self.ship.angle + plan.turn * self.ship.turn_speed * self.reaction_time) % 360
+        return Intent(target, plan.thrust, plan.fire, False)
+
+    def apply_intent(self, intent, enemy, dt):
+        self.turn_towards(intent.target_angle, dt)
+        if intent.thrust:
+            apply_thrust(self.ship, dt)
+        if intent.fire_primary:
+            self.launch(self.ship.fire_primary(enemy, self.game_time))
+        if intent.fire_secondary:
+            self.launch(self.ship.fire_secondary([enemy], self.game_time))
 
 
 class KohrAhAIController(AIController):
-    def __init__(self, ship, difficulty="Medium"):
-        super().__init__(ship, difficulty)
+    def __init__(self, ship, difficulty="Medium", seed=None):
+        super().__init__(ship, difficulty, seed)
         self.mine_cooldown = 0.0
 
-    def determine_movement(self, enemy):
+    def determine_movement(self, view):
         # Агрессивная тактика: всегда поворачиваемся к врагу и сближаемся
-        dx = enemy.x - self.ship.x
-        dy = enemy.y - self.ship.y
-        target_angle = math.degrees(math.atan2(dy, dx))
-        return target_angle, True
+        return view.enemy_bearing, True
 
-    def fire_weapons(self, enemy):
+    def fire_weapons(self, view):
         # Всегда запускаем мины как основное оружие
         #print(f"[AI] {self.ship.name} запускает мины (fire_primary)")
-        self.ship.fire_primary(enemy, 0)
+        self.launch(self.ship.fire_primary(view.enemy, self.game_time))
         # Если враг близко, используем вторичное оружие (плазмоиды)
-        dx = enemy.x - self.ship.x
-        dy = enemy.y - self.ship.y
-        distance = math.hypot(dx, dy)
-        if distance < 300:
+        if view.enemy_distance < 300:
             if self.mine_cooldown <= 0:
                 #print(f"[AI] {self.ship.name} использует плазмоиды (fire_secondary)")
-                self.ship.fire_secondary([enemy], 0)
+                self.launch(self.ship.fire_secondary([view.enemy], self.game_time))
                 if self.difficulty == "Hard":
                     self.mine_cooldown = 0.8
                 elif self.difficulty == "Medium":
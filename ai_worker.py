@@ -0,0 +1,90 @@
+"""
+Решения AI вне основного потока.
+
+Контроллер Awesome Cyborg в шаг решения отдаёт AIWorker поиск планировщика (Search – копия
+нужной части мира, общих объектов с симуляцией у него нет) и продолжает выполнять прежнее
+намерение. Поиск проходит все горизонты в потоке или в отдельном процессе; готовый план
+контроллер забирает на ближайшей границе шага. На каждый корабль в работе не больше одного
+поиска – следующий запускается из самого свежего состояния, когда забран предыдущий.
+
+Устаревание плана – игровое время от начала поиска до применения. При успевающем рабочем
+оно равно reaction_time, как и у синхронного контроллера; план старше max_staleness
+отбрасывается. Замеры устаревания и число отброшенных планов – в summary().
+Результат зависит от скорости машины, поэтому рабочий используется только в игре без записи.
+"""
+import math
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from project.config import AI_WORKER_MAX_STALENESS
+
+MODES = ("thread", "process")
+# Сколько последних замеров устаревания хранится для summary()
+STATS_WINDOW = 1000
+
+
+def plan_search(search):
+    """Задание рабочего: поиск до конца всех горизонтов. Возвращает лучший план."""
+    search.run(math.inf)
+    return search.result()
+
+
+class AIWorker:
+    def __init__(self, mode="thread", max_staleness=AI_WORKER_MAX_STALENESS, workers=2):
+        if mode not in MODES:
+            raise ValueError(f"Unknown AI worker mode '{mode}'")
+        if mode == "process":
+            self.executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai-worker")
+        self.mode = mode
+        self.max_staleness = max_staleness
+        self.pending = {}  # ключ (id корабля) -> (время начала поиска, Future)
+        self.staleness = deque(maxlen=STATS_WINDOW)
+        self.committed = 0
+        self.dropped = 0
+
+    def busy(self, key):
+        """Поиск для key ещё выполняется."""
+        job = self.pending.get(key)
+        return job is not None and not job[1].done()
+
+    def submit(self, key, search):
+        self.pending[key] = (search.start_time, self.executor.submit(plan_search, search))
+
+    def collect(self, key, game_time):
+        """
+        Забирает готовый план для key. Возвращает None, если плана нет, он слишком стар
+        или построен для другого времени (после перемотки назад).
+        """
+        job = self.pending.get(key)
+        if job is None or not job[1].done():
+            return None
+        del self.pending[key]
+        start_time, future = job
+        staleness = game_time - start_time
+        try:
+            plan = future.result()
+        except Exception as e:
+            print("AI worker failed:", e)
+            self.dropped += 1
+            return None
+        if staleness < 0 or staleness > self.max_staleness:
+            self.dropped += 1
+            return None
+        self.staleness.append(staleness)
+        self.committed += 1
+        return plan
+
+    def summary(self):
+        """Статистика устаревания применённых планов, секунды игрового времени."""
+        samples = sorted(self.staleness)
+        if not samples:
+            return {"committed": self.committed, "dropped": self.dropped}
+        return {"committed": self.committed, "dropped": self.dropped,
+                "mean": sum(samples) / len(samples),
+                "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+                "max": samples[-1]}
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.pending.clear()
@@ -0,0 +1,101 @@
+"""
+Бенчмарк сущностей со __slots__: байт на объект и время цикла update() против тех же полей в __dict__.
+
+Вариант «до» – объект без __slots__ с теми же полями экземпляра; методы update() вызываются
+те же самые, поэтому разница – только в хранении атрибутов.
+
+Запуск из каталога, в котором лежит пакет project:
+    python -m project.benchmarks.bench_entities
+"""
+import random
+import timeit
+import tracemalloc
+from project.entities.asteroid import Asteroid
+from project.entities.planet import Planet
+from project.entities.missile import Missile
+from project.entities.mine import Mine, Plasmoid
+from project.entities.projectile_bank import BANK
+from project.ships import SHIP_CLASSES
+from project.ships.base_ship import BaseShip
+from project.ships.stats import ShipStats
+from project.snapshot import object_state
+
+COUNT = 1000
+FRAMES = 100
+DT = 1.0 / 60
+
+
+DICT_CLASSES = {}
+
+
+def dict_copy(obj):
+    """Объект без __slots__ с теми же полями экземпляра и характеристиками класса."""
+    cls = type(obj)
+    if cls not in DICT_CLASSES:
+        namespace = {field: getattr(cls, field) for field in ShipStats.__slots__ if hasattr(cls, field)}
+        DICT_CLASSES[cls] = type("Dict" + cls.__name__, (), namespace)
+    copy = DICT_CLASSES[cls]()
+    # Числовые поля снарядов лежат в общем хранилище; без него они были бы полями объекта
+    for name, value in object_state(obj).items():
+        if name != "owner_id":
+            setattr(copy, name, value)
+    return copy
+
+
+def allocated(factory):
+    """Байт памяти на объект, созданный factory() (по tracemalloc, объекты живут до замера)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory() for _ in range(COUNT)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del objects
+    return used / COUNT
+
+
+def entity_factories(rng):
+    target = SHIP_CLASSES["Earthling Cruiser"](0, 0, (255, 255, 255))
+    factories = {
+        "Asteroid": lambda: Asteroid(100, 100, 10, 5, 5, (200, 200, 200), rng),
+        "Planet": lambda: Planet(800, 600, 30, (180, 180, 180)),
+        "Missile": lambda: Missile(0, 0, 1, 1, target, 0.0),
+        "Mine": lambda: Mine(0, 0, 1, 1, target, 0.0),
+        "Plasmoid": lambda: Plasmoid(0.5, 0.0),
+    }
+    for ship_class in SHIP_CLASSES.values():
+        factories[ship_class.__name__] = lambda ship_class=ship_class: ship_class(0, 0, (255, 255, 255))
+    return factories
+
+
+def time_updates(update, objects):
+    def frames():
+        for _ in range(FRAMES):
+            for obj in objects:
+                update(obj, DT)
+    return min(timeit.repeat(frames, number=1, repeat=5)) / FRAMES
+
+
+def main():
+    rng = random.Random(1)
+    # Хранилище снарядов растёт удвоением – заранее, чтобы рост не попал в замер одного из классов
+    BANK.grow(BANK.capacity + 2 * COUNT)
+    slot_bytes = sum(column.itemsize for column in BANK.columns.values())
+    print(f"{'Сущность':<16} {'__slots__':>10} {'__dict__':>10}  байт на объект")
+    for name, factory in entity_factories(rng).items():
+        print(f"{name:<16} {allocated(factory):>10.0f} {allocated(lambda: dict_copy(factory())):>10.0f}")
+    print(f"(у снарядов со __slots__ числовые поля – ещё {slot_bytes} байт в ячейке BANK)")
+
+    asteroids = [Asteroid(rng.uniform(0, 1600), rng.uniform(0, 1200), 10, rng.uniform(-50, 50),
+                          rng.uniform(-50, 50), (200, 200, 200), rng) for _ in range(COUNT)]
+    ship_classes = list(SHIP_CLASSES.values())
+    ships = [ship_classes[i % len(ship_classes)](rng.uniform(0, 1600), rng.uniform(0, 1200), (255, 255, 255))
+             for i in range(COUNT)]
+    print(f"\nupdate() для {COUNT} объектов, мс/кадр:")
+    for name, update, objects in (("Asteroid", Asteroid.update, asteroids), ("Корабли", BaseShip.update, ships)):
+        slotted = time_updates(update, objects)
+        plain = time_updates(update, [dict_copy(obj) for obj in objects])
+        print(f"{name:<16} __slots__ {slotted * 1e3:.3f}   __dict__ {plain * 1e3:.3f}")
+
+
+if __name__ == "__main__":
+    main()
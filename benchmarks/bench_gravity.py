@@ -0,0 +1,72 @@
+"""
+Бенчмарк гравитации: прежний вызов apply_gravity на каждую пару тело-планета против
+одного прохода GravityField.apply по всем телам и колодцам, а также скалярный и NumPy-путь
+по отдельности – по ним выбирается порог gravity.MIN_VECTOR_PAIRS.
+
+Запуск из каталога, в котором лежит пакет project:
+    python -m project.benchmarks.bench_gravity
+"""
+import math
+import random
+import timeit
+from project.config import FIELD_W, FIELD_H, GRAVITY_RANGE, GRAVITY_STRENGTH, GRAVITY_MODEL
+from project.utils import wrap_delta
+from project.gravity import GravityField, MIN_VECTOR_PAIRS, np
+
+DT = 1.0 / 60
+
+
+class Body:
+    __slots__ = ("x", "y", "vx", "vy", "in_gravity_field")
+
+    def __init__(self, rng):
+        self.x = rng.uniform(0, FIELD_W)
+        self.y = rng.uniform(0, FIELD_H)
+        self.vx = 0.0
+        self.vy = 0.0
+        self.in_gravity_field = False
+
+
+def apply_formula(ship, planet, dt):
+    """Прежняя реализация: формула и проверка модели на каждый вызов."""
+    dx = wrap_delta(ship.x, planet.x, FIELD_W)
+    dy = wrap_delta(ship.y, planet.y, FIELD_H)
+    distance = math.hypot(dx, dy)
+    if distance < GRAVITY_RANGE and distance != 0:
+        if GRAVITY_MODEL == "inverse_square":
+            accel = GRAVITY_STRENGTH / ((distance + 1.0) ** 2)
+        else:
+            accel = GRAVITY_STRENGTH * (1 - distance / GRAVITY_RANGE) * 3
+        ship.vx += dx / distance * accel * dt
+        ship.vy += dy / distance * accel * dt
+        ship.in_gravity_field = True
+
+
+def main():
+    rng = random.Random(1)
+    field = GravityField()
+    print(f"{'тел x колодцев':<16} {'по парам':>10} {'scalar':>10} {'vector':>10} {'apply':>10}"
+          f"  мс/кадр; MIN_VECTOR_PAIRS = {MIN_VECTOR_PAIRS}")
+    sizes = ((3, 1), (50, 4), (100, 4), (150, 4), (200, 4), (300, 4), (500, 4), (1000, 4), (5000, 8))
+    for count, well_count in sizes:
+        bodies = [Body(rng) for _ in range(count)]
+        wells = [Body(rng) for _ in range(well_count)]
+
+        def pairs():
+            for body in bodies:
+                for well in wells:
+                    apply_formula(body, well, DT)
+
+        def best(function):
+            return min(timeit.repeat(function, number=10, repeat=5)) / 10
+
+        per_pair = best(pairs)
+        scalar = best(lambda: field.apply_scalar(bodies, wells, DT))
+        vector = best(lambda: field.apply_vector(bodies, wells, DT)) if np is not None else math.nan
+        batched = best(lambda: field.apply(bodies, wells, DT))
+        print(f"{f'{count} x {well_count}':<16} {per_pair * 1e3:>10.3f} {scalar * 1e3:>10.3f}"
+              f" {vector * 1e3:>10.3f} {batched * 1e3:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Бенчмарк панели характеристик: отрисовка всех строк каждый кадр против кэширующего Hud.
+
+Запуск из каталога, в котором лежит пакет project:
+    python -m project.benchmarks.bench_hud
+"""
+import os
+import timeit
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+from project.config import SCREEN_W, SCREEN_H, GAME_SCREEN_W, PANEL_WIDTH
+from project.hud import Hud
+
+FRAMES = 600
+
+
+def panel_lines(frame):
+    # Экипаж и энергия меняются редко, скорость – примерно раз в несколько кадров
+    lines = []
+    for team, top in (("Team 1", 10), ("Team 2", 220)):
+        lines.append((f"{team}: Earthling", top))
+        lines.append((f"Crew: {18 - frame // 200}", top + 30))
+        lines.append((f"Energy: {frame // 20 % 18}", top + 60))
+        lines.append((f"Speed: {frame // 4 % 120}", top + 90))
+        lines.append(("Ctrl: Cyborg", top + 120))
+        lines.append(("Diff: Hard", top + 150))
+    return tuple(lines)
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
+    frames = [panel_lines(frame) for frame in range(FRAMES)]
+
+    def every_frame():
+        for lines in frames:
+            pygame.draw.rect(screen, (50, 50, 50), (GAME_SCREEN_W, 0, PANEL_WIDTH, SCREEN_H))
+            font = pygame.font.SysFont("Arial", 24)
+            for string, y in lines:
+                screen.blit(font.render(string, True, (255, 255, 255)), (GAME_SCREEN_W + 10, y))
+
+    hud = Hud((GAME_SCREEN_W, 0, PANEL_WIDTH, SCREEN_H))
+
+    def cached():
+        for lines in frames:
+            hud.draw(screen, lines)
+
+    old = min(timeit.repeat(every_frame, number=1, repeat=3)) / FRAMES
+    new = min(timeit.repeat(cached, number=1, repeat=3)) / FRAMES
+    print(f"Каждый кадр: {old * 1e3:.3f} мс/кадр")
+    print(f"Hud:         {new * 1e3:.3f} мс/кадр (среднее по Hud.average_time {hud.average_time * 1e3:.3f} мс, "
+          f"перерисовок {hud.redraws} из {hud.frames} кадров)")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Бенчмарк планировщика Awesome Cyborg: время update() контроллера за шаг симуляции
+(перцентили) при пределе только по шагам прогноза и с пределом времени.
+
+Запуск из каталога, в котором лежит пакет project:
+    python -m project.benchmarks.bench_planner
+"""
+import time
+from project.simulation import Simulation
+from project.ships import SHIP_CLASSES
+from project.ai_controller import PlannerAIController
+
+TICKS = 3000
+DT = 1.0 / 60
+
+
+def measure(time_budget, seed=3):
+    times = []
+    update = PlannerAIController.update
+
+    def timed(self, *args):
+        start = time.perf_counter()
+        result = update(self, *args)
+        times.append(time.perf_counter() - start)
+        return result
+
+    PlannerAIController.update = timed
+    try:
+        ships = list(SHIP_CLASSES.values())
+        sim = Simulation(ships, ships, cyborgs={"Team 1": "Hard", "Team 2": "Hard"}, seed=seed,
+                         ai_time_budget=time_budget)
+        for _ in range(TICKS):
+            if sim.finished:
+                break
+            sim.step(DT, {})
+    finally:
+        PlannerAIController.update = update
+    times.sort()
+    return [times[min(len(times) - 1, int(len(times) * p))] * 1e3 for p in (0.5, 0.95, 0.99, 1.0)]
+
+
+def main():
+    print(f"{'предел':<16} {'p50':>7} {'p95':>7} {'p99':>7} {'max':>7}  мс за шаг")
+    for label, budget in (("шаги прогноза", None), ("2 мс", 0.002), ("0.5 мс", 0.0005)):
+        print(f"{label:<16}" + "".join(f" {value:>7.3f}" for value in measure(budget)))
+
+
+if __name__ == "__main__":
+    main()
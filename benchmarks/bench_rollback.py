@@ -0,0 +1,78 @@
+"""
+Бенчмарк отката сетевой игры: время save_state / load_state против снимков capture / restore
+и сколько шагов пересчёта с откатом укладывается в один кадр 16 мс.
+
+Мир – бой двух людей под управлением бота из netplay (мины KOHR-AH, ракеты, кольца плазмоидов).
+Замер идёт в нескольких точках матча; пересчёт на depth шагов – это load_state и depth раз
+save_state, step и контрольная сумма, как в RollbackSession.reconcile.
+
+Запуск из каталога, в котором лежит пакет project:
+    python -m project.benchmarks.bench_rollback
+"""
+import timeit
+from project.simulation import Simulation, TEAMS
+from project.ships import SHIP_CLASSES
+from project.snapshot import save_state, load_state, capture, restore
+from project.netplay import scripted_controls, state_checksum
+
+DT = 1.0 / 60
+FRAME = 0.016
+CHECKPOINTS = (300, 1200, 2400)
+DEPTHS = (1, 4, 8, 16, 32, 64)
+FLEET = ("KOHR-AH MARAUDER", "YEHAT TERMINATOR", "Earthling Cruiser")
+
+
+def inputs(tick):
+    return {team: scripted_controls(team, tick) for team in TEAMS}
+
+
+def best(function, number):
+    return min(timeit.repeat(function, number=number, repeat=5)) / number
+
+
+def rollback(sim, state, start, depth):
+    """Откат к state (шаг start) и пересчёт depth шагов с сохранением состояния перед каждым."""
+    load_state(sim, state)
+    for tick in range(start, start + depth):
+        save_state(sim)
+        sim.step(DT, inputs(tick))
+        state_checksum(sim)
+
+
+def main():
+    ships = [SHIP_CLASSES[name] for name in FLEET]
+    sim = Simulation(ships, list(reversed(ships)), seed=42)
+    tick = 0
+    print(f"{'шаг':>5} {'снаряды':>8} {'save':>8} {'load':>8} {'capture':>8} {'restore':>8} {'step':>8}"
+          f"  мкс;  шагов отката в {FRAME * 1e3:.0f} мс")
+    for checkpoint in CHECKPOINTS:
+        while tick < checkpoint:
+            sim.step(DT, inputs(tick))
+            tick += 1
+        state = save_state(sim)
+        snapshot = capture(sim, compress=False)
+        save = best(lambda: save_state(sim), 200)
+        load = best(lambda: load_state(sim, state), 200)
+        packed = best(lambda: capture(sim, compress=False), 20)
+        unpacked = best(lambda: restore(sim, snapshot), 20)
+        load_state(sim, state)
+
+        def step():
+            sim.step(DT, inputs(tick))
+            state_checksum(sim)
+            load_state(sim, state)
+        # В замер шага входит и load_state – вычитается
+        step_cost = best(step, 100) - load
+        fits = int((FRAME - load) / (save + step_cost))
+        depths = []
+        for depth in DEPTHS:
+            seconds = best(lambda: rollback(sim, state, tick, depth), 5)
+            depths.append(f"{depth}:{seconds * 1e3:.2f}мс")
+        load_state(sim, state)
+        print(f"{tick:>5} {len(sim.missiles):>8} {save * 1e6:>8.1f} {load * 1e6:>8.1f} {packed * 1e6:>8.1f}"
+              f" {unpacked * 1e6:>8.1f} {step_cost * 1e6:>8.1f}  {fits}")
+        print("      откат на N шагов: " + "  ".join(depths))
+
+
+if __name__ == "__main__":
+    main()
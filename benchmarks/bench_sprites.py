@@ -0,0 +1,74 @@
+"""
+Бенчмарк отрисовки астероидов и кораблей: многоугольник и круг каждый кадр против кэша спрайтов.
+
+Запуск из каталога, в котором лежит пакет project:
+    python -m project.benchmarks.bench_sprites
+"""
+import math
+import os
+import random
+import timeit
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+from project.config import SCREEN_W, SCREEN_H, GAME_SCREEN_W
+from project.sprites import SPRITES, asteroid_sprite, ship_sprite
+
+COUNT = 200
+FRAMES = 100
+
+
+def draw_polygon(screen, x, y, half_size, color, angle):
+    rad = math.radians(angle)
+    cos_a = math.cos(rad)
+    sin_a = math.sin(rad)
+    corners = []
+    for dx, dy in [(-half_size, -half_size), (half_size, -half_size),
+                   (half_size, half_size), (-half_size, half_size)]:
+        corners.append((x + dx * cos_a - dy * sin_a, y + dx * sin_a + dy * cos_a))
+    pygame.draw.polygon(screen, color, corners)
+
+
+def draw_ship(screen, x, y, radius, color, angle):
+    pygame.draw.circle(screen, color, (x, y), radius)
+    rad = math.radians(angle)
+    pygame.draw.line(screen, (255, 255, 255), (x, y),
+                     (x + int(radius * math.sin(rad)), y - int(radius * math.cos(rad))), 2)
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
+    random.seed(0)
+    objects = [(random.randrange(GAME_SCREEN_W), random.randrange(SCREEN_H), random.randint(8, 12),
+                random.uniform(0, 360), random.uniform(50, 180)) for _ in range(COUNT)]
+
+    def frames(asteroid, ship):
+        for frame in range(FRAMES):
+            for x, y, radius, angle, spin in objects:
+                asteroid(x, y, radius, angle + spin * frame / 60)
+                ship(x, y, radius + 4, angle + spin * frame / 60)
+
+    def direct():
+        frames(lambda x, y, r, a: draw_polygon(screen, x, y, r, (200, 200, 200), a),
+               lambda x, y, r, a: draw_ship(screen, x, y, r, (255, 100, 100), a))
+
+    def blit_sprite(sprite_half, x, y):
+        sprite, half = sprite_half
+        screen.blit(sprite, (x - half, y - half))
+
+    def cached():
+        frames(lambda x, y, r, a: blit_sprite(asteroid_sprite(r, (200, 200, 200), a), x, y),
+               lambda x, y, r, a: blit_sprite(ship_sprite(r, (255, 100, 100), a), x, y))
+
+    cached()  # заполнение кэша не входит в замер
+    old = min(timeit.repeat(direct, number=1, repeat=3)) / FRAMES
+    new = min(timeit.repeat(cached, number=1, repeat=3)) / FRAMES
+    print(f"{COUNT} астероидов и {COUNT} кораблей за кадр")
+    print(f"Рисование:   {old * 1e3:.3f} мс/кадр")
+    print(f"Спрайты:     {new * 1e3:.3f} мс/кадр (спрайтов в кэше {len(SPRITES.sprites)}, "
+          f"попаданий {SPRITES.hits}, промахов {SPRITES.misses})")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Бенчмарк звёздного фона: отрисовка каждой звезды против запечённых слоёв StarLayer.
+
+Запуск из каталога, в котором лежит пакет project:
+    python -m project.benchmarks.bench_starfield
+"""
+import os
+import random
+import timeit
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+from project.config import SCREEN_W, SCREEN_H
+from project.stars import generate_colored_stars, draw_star_layer_colored, StarLayer
+
+LAYERS = ((180, 0.3), (120, 0.6), (80, 0.9))
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
+    random.seed(0)
+    star_lists = [(generate_colored_stars(count), parallax) for count, parallax in LAYERS]
+    layers = [StarLayer(stars, parallax) for stars, parallax in star_lists]
+    frame = [0]
+
+    def per_star(zoom):
+        frame[0] += 1
+        for stars, parallax in star_lists:
+            draw_star_layer_colored(screen, stars, frame[0] * 3.7, frame[0] * 1.3, parallax, zoom)
+
+    def baked(zoom):
+        frame[0] += 1
+        for layer in layers:
+            layer.draw(screen, frame[0] * 3.7, frame[0] * 1.3, zoom)
+
+    print(f"{'зум':>5} {'по звёздам':>12} {'запечённые':>12}")
+    for zoom in (0.5, 1.0, 2.0):
+        baked(zoom)  # запекание не входит в замер кадра
+        old = min(timeit.repeat(lambda: per_star(zoom), number=200, repeat=5)) / 200
+        new = min(timeit.repeat(lambda: baked(zoom), number=200, repeat=5)) / 200
+        print(f"{zoom:>5} {old * 1e3:>9.3f} мс {new * 1e3:>9.3f} мс")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
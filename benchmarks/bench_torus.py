@@ -0,0 +1,61 @@
+"""
+Микро-бенчмарк векторного ядра тора против скалярного wrap_delta.
+
+Запуск из каталога, в котором лежит пакет project (как и main.py):
+    python -m project.benchmarks.bench_torus [--no-numpy]
+"""
+import math
+import random
+import sys
+import timeit
+from project.config import FIELD_W, FIELD_H
+from project.utils import wrap_delta
+from project import torus
+
+
+def scalar_distances(xs, ys):
+    return [[math.hypot(wrap_delta(x, tx, FIELD_W), wrap_delta(y, ty, FIELD_H))
+             for tx, ty in zip(xs, ys)] for x, y in zip(xs, ys)]
+
+
+def scalar_pairs(xs, ys, radii):
+    pairs = []
+    n = len(xs)
+    for i in range(n):
+        for j in range(i + 1, n):
+            dx = wrap_delta(xs[i], xs[j], FIELD_W)
+            dy = wrap_delta(ys[i], ys[j], FIELD_H)
+            if math.hypot(dx, dy) <= radii[i] + radii[j]:
+                pairs.append((i, j))
+    return pairs
+
+
+def best_of(func, repeat=5):
+    number = 1
+    while timeit.timeit(func, number=number) < 0.05:
+        number *= 2
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if "--no-numpy" in argv:
+        torus.np = None  # проверяем скалярный путь ядра
+    random.seed(0)
+    print("NumPy:", "да" if torus.np is not None else "нет (скалярный путь и сетка)")
+    print(f"{'N':>6} {'матрица: скаляр':>16} {'ядро':>10} {'пары: скаляр':>14} {'ядро':>10}")
+    for n in (10, 100, 1000):
+        xs = [random.uniform(0, FIELD_W) for _ in range(n)]
+        ys = [random.uniform(0, FIELD_H) for _ in range(n)]
+        radii = [random.uniform(4, 12) for _ in range(n)]
+        matrix_scalar = best_of(lambda: scalar_distances(xs, ys), repeat=1 if n >= 1000 else 5)
+        matrix_kernel = best_of(lambda: torus.distances(xs, ys, xs, ys))
+        pairs_scalar = best_of(lambda: scalar_pairs(xs, ys, radii), repeat=1 if n >= 1000 else 5)
+        pairs_kernel = best_of(lambda: torus.pairs_within(xs, ys, radii))
+        assert set(scalar_pairs(xs, ys, radii)) <= set(torus.pairs_within(xs, ys, radii))
+        print(f"{n:>6} {matrix_scalar * 1e3:>13.3f} мс {matrix_kernel * 1e3:>7.3f} мс "
+              f"{pairs_scalar * 1e3:>11.3f} мс {pairs_kernel * 1e3:>7.3f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,8 +16,9 @@ SCREEN_H = 600
 # ---------------------------
 # Параметры зума
 # ---------------------------
-MARGIN = 2.0
-MIN_VISIBLE_WIDTH = 400.0
+MARGIN = 2.0               # Видимая ширина – расстояние между кораблями, умноженное на MARGIN
+MIN_VISIBLE_WIDTH = 400.0  # Ближе этого камера не приближает (максимальный зум)
+ZOOM_SPEED = 4.0           # Скорость, с которой зум догоняет нужный (доля разницы в секунду)
 
 # ---------------------------
 # Параметры гравитации
@@ -28,12 +29,58 @@ GRAVITY_STRENGTH = 75.0
 # --- Новое: выбор модели гравитации ---
 GRAVITY_MODEL = "linear"  # Опции: "linear" или "inverse_square"
 # --- Конец изменений ---
+# Число отсчётов таблицы спада силы на радиусе GRAVITY_RANGE
+GRAVITY_TABLE_SIZE = 4096
 
 # ---------------------------
 # Глобальная ось вращения астероида
 # ---------------------------
 ASTEROID_ROTATION_AXIS = random.choice([-1, 1])
 
+# ---------------------------
+# Параметры симуляции
+# ---------------------------
+TICK_RATE = 60        # Шагов симуляции в секунду, каждый шаг длится ровно 1 / TICK_RATE
+FRAME_RATE = 60       # Ограничение частоты кадров отрисовки
+MAX_SUBSTEPS = 5      # Не больше стольких шагов за кадр – после зависания время не «догоняется» рывком
+REPLAY_KEYFRAME_INTERVAL = 600  # Снимок состояния в записи матча каждые столько шагов (для перемотки)
+REPLAY_SEEK_SECONDS = 10        # Шаг перемотки повтора стрелками влево/вправо
+REWIND_INTERVAL = 60            # Снимок для мгновенной перемотки назад каждые столько шагов
+REWIND_CAPACITY = 30            # Сколько последних снимков хранится (память ограничена)
+REWIND_SECONDS = 5              # На сколько секунд назад перематывает Backspace
+
+# ---------------------------
+# AI
+# ---------------------------
+AI_PLANNER_STEPS_PER_TICK = 60  # Шагов прогноза планировщика Awesome Cyborg за шаг симуляции
+AI_PLANNER_BUDGET_MS = 2.0      # В игре без записи – ещё и не дольше стольких миллисекунд за шаг
+AI_WORKER = None                # В игре без записи: None – планировщик в основном потоке, "thread" или "process"
+AI_WORKER_MAX_STALENESS = 0.5   # План старше стольких секунд игрового времени отбрасывается
+
+# ---------------------------
+# Сетевая игра (lockstep по UDP)
+# ---------------------------
+NET_PORT = 47000               # Порт хоста по умолчанию
+NET_INPUT_DELAY = 6            # Через сколько шагов применяется нажатое управление (скрывает задержку сети до ~100 мс)
+NET_SEND_INTERVAL = 4          # Пакет с управлением раз в столько шагов (~15 пакетов в секунду)
+NET_TIMEOUT = 10.0             # Секунд без пакетов партнёра до разрыва соединения
+NET_ROLLBACK_DELAY = 2         # Задержка ввода в игре с откатом (остальное скрывает предсказание)
+NET_ROLLBACK_WINDOW = 8        # Дальше стольких шагов вперёд подтверждённого предсказание не уходит
+
+# ---------------------------
+# Профилирование
+# ---------------------------
+PROFILER_ENABLED = False       # Замерять подсистемы с запуска (иначе – с первого нажатия F3 или с --profile)
+PROFILER_WINDOW = 600          # По скольким последним кадрам считаются перцентили
+PROFILER_DUMP_FILE = None      # Куда периодически писать статистику: "*.csv" (дописывается) или "*.json"
+PROFILER_DUMP_INTERVAL = 10.0  # Секунд между записями в PROFILER_DUMP_FILE
+
+# ---------------------------
+# Меню
+# ---------------------------
+MENU_REDRAW_MODE = "events"  # "events" – перерисовка только по вводу и только изменившихся виджетов, "continuous" – полный кадр 30 раз в секунду
+SAVES_JOURNAL = False         # Дописывать правки профилей в журнал вместо перезаписи saved_teams.json (для тысяч профилей)
+
 # ---------------------------
 # Параметры игрового поля
 # ---------------------------
@@ -1,12 +1,51 @@
-from project.config import FIELD_W, FIELD_H
-from project.utils import wrap_midpoint
+from project.config import (FIELD_W, FIELD_H, GAME_SCREEN_W, SCREEN_H, MARGIN, MIN_VISIBLE_WIDTH,
+                            ZOOM_SPEED)
+from project.utils import wrap_midpoint, wrap_delta
+from project.torus import offsets
+
+# Сильнее отдалять нельзя: на экране появились бы две копии поля (тора)
+MIN_ZOOM = max(GAME_SCREEN_W / FIELD_W, SCREEN_H / FIELD_H)
+MAX_ZOOM = GAME_SCREEN_W / MIN_VISIBLE_WIDTH
+# Запас отсечения в пикселях: линии носа и обводки выходят за радиус объекта
+CULL_PADDING = 2
+
 
 class Camera:
-    def __init__(self, x, y):
+    def __init__(self, x, y, zoom=1.0):
         self.x = float(x)
         self.y = float(y)
+        self.zoom = zoom
 
     def update_center_on_two_ships(self, sA, sB):
         mx, my = wrap_midpoint(sA.x, sA.y, sB.x, sB.y)
         self.x = mx % FIELD_W
         self.y = my % FIELD_H
+
+    def framing_zoom(self, sA, sB):
+        """Зум, при котором оба корабля на экране с запасом MARGIN, как в оригинальном Super Melee."""
+        dx = abs(wrap_delta(sA.x, sB.x, FIELD_W))
+        dy = abs(wrap_delta(sA.y, sB.y, FIELD_H))
+        visible_width = max(dx * MARGIN, dy * MARGIN * GAME_SCREEN_W / SCREEN_H, MIN_VISIBLE_WIDTH)
+        return min(MAX_ZOOM, max(MIN_ZOOM, GAME_SCREEN_W / visible_width))
+
+    def update_zoom(self, sA, sB, dt):
+        # Плавное приближение к нужному зуму, без рывков при резкой смене расстояния
+        target = self.framing_zoom(sA, sB)
+        self.zoom += (target - self.zoom) * min(1.0, ZOOM_SPEED * dt)
+
+    def visible(self, objects, zoom=None):
+        """
+        Объекты, чей круг (с учётом заворота поля) пересекает экран при зуме zoom.
+        Остальные можно не рисовать.
+        """
+        if not objects:
+            return []
+        zoom = self.zoom if zoom is None else zoom
+        half_w = GAME_SCREEN_W / 2 / zoom
+        half_h = SCREEN_H / 2 / zoom
+        pad = CULL_PADDING / zoom
+        if half_w >= FIELD_W / 2 and half_h >= FIELD_H / 2:
+            return list(objects)  # на экране всё поле
+        dxs, dys = offsets(self.x, self.y, [obj.x for obj in objects], [obj.y for obj in objects])
+        return [obj for obj, dx, dy in zip(objects, dxs, dys)
+                if abs(dx) <= half_w + obj.radius + pad and abs(dy) <= half_h + obj.radius + pad]
@@ -1,10 +1,18 @@
 import math
 from project.config import FIELD_W, FIELD_H
 from project.utils import wrap_position, wrap_delta
-import pygame
 from project.entities.projectile import Projectile
+from project.entities.projectile_bank import bank_field, KIND_MINE, KIND_PLASMOID
 
 class Mine(Projectile):
+    # in_gravity_field выставляет apply_gravity, пока мина в режиме запуска
+    __slots__ = ("target", "launch_time", "in_gravity_field")
+    KIND = KIND_MINE
+    BANK_FIELDS = Projectile.BANK_FIELDS + ("speed", "homing_strength", "launching")
+    speed = bank_field("speed")
+    homing_strength = bank_field("homing_strength")
+    launching = bank_field("launching")
+
     def __init__(self, x, y, vx, vy, target, launch_time, launching=True):
         # Наследуем общие поля: damage=4, radius=5
         super().__init__(x, y, vx, vy, damage=4, radius=5)
@@ -13,6 +21,7 @@ class Mine(Projectile):
         self.homing_strength = 1.0   # Коэффициент корректировки скорости в режиме homing
         self.launch_time = launch_time
         self.launching = launching   # True, пока мина находится в режиме запуска
+        self.in_gravity_field = False
 
     def update(self, dt):
         if self.launching:
@@ -47,7 +56,17 @@ class Mine(Projectile):
 
 
 class Plasmoid(Projectile):
+    __slots__ = ()
     RING_SCALING = 1.5  # Множитель для увеличения радиуса кольца
+    KIND = KIND_PLASMOID
+    BANK_FIELDS = Projectile.BANK_FIELDS + ("orbit_angle", "ring_start_time", "orbit_speed",
+                                            "base_radius", "lifetime")
+    orbit_angle = bank_field("orbit_angle")
+    ring_start_time = bank_field("ring_start_time")
+    orbit_speed = bank_field("orbit_speed")
+    base_radius = bank_field("base_radius")
+    lifetime = bank_field("lifetime")
+
     def __init__(self, orbit_angle, ring_start_time, orbit_speed=50.0, lifetime=1.0):
         # Изначально позиция и скорость неизвестны, поэтому задаём (0,0)
         super().__init__(0, 0, 0, 0, damage=3, radius=4)
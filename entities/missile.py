@@ -1,10 +1,17 @@
 import math
 from project.config import FIELD_W, FIELD_H
 from project.utils import wrap_position, wrap_delta
-import pygame
 from project.entities.projectile import Projectile
+from project.entities.projectile_bank import bank_field, KIND_MISSILE
 
 class Missile(Projectile):
+    __slots__ = ("target", "launch_time")
+    KIND = KIND_MISSILE
+    BANK_FIELDS = Projectile.BANK_FIELDS + ("speed", "homing_strength", "lifetime")
+    speed = bank_field("speed")
+    homing_strength = bank_field("homing_strength")
+    lifetime = bank_field("lifetime")
+
     def __init__(self, x, y, vx, vy, target, launch_time):
         # Наследуем общие поля: damage=4, radius=5
         super().__init__(x, y, vx, vy, damage=4, radius=5)
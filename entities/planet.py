@@ -1,7 +1,8 @@
-import pygame
 from project.utils import world_to_screen
 
 class Planet:
+    __slots__ = ("x", "y", "radius", "color")
+
     def __init__(self, x, y, radius, color):
         self.x = float(x)
         self.y = float(y)
@@ -9,5 +10,6 @@ class Planet:
         self.color = color
 
     def draw(self, screen, cam, zoom):
+        import pygame
         sx, sy = world_to_screen(self.x, self.y, cam.x, cam.y, zoom)
         pygame.draw.circle(screen, self.color, (sx, sy), int(self.radius * zoom))
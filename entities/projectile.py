@@ -1,10 +1,70 @@
 import math
 from project.config import FIELD_W, FIELD_H
 from project.utils import wrap_position, wrap_delta
-import pygame
+from project.entities.projectile_bank import BANK, bank_field, KIND_OTHER, KIND_PROJECTILE
+
+# Не больше стольких свободных снарядов каждого класса хранит пул
+MAX_POOLED = 256
+
+
+class ProjectilePool:
+    """
+    Списки свободных снарядов по классам. Погибший снаряд возвращается в пул вместе со своей
+    ячейкой BANK, новый выстрел берёт его оттуда и заново инициализирует – в установившемся бою
+    снаряды и ячейки не создаются и не освобождаются.
+    """
+    def __init__(self, capacity=MAX_POOLED):
+        self.capacity = capacity
+        self.free = {}
+        self.reused = 0
+        self.created = 0
+
+    def acquire(self, cls, *args, **kwargs):
+        free = self.free.get(cls)
+        if free:
+            projectile = free.pop()
+            projectile.__init__(*args, **kwargs)
+            self.reused += 1
+            return projectile
+        self.created += 1
+        return cls(*args, **kwargs)
+
+    def release(self, projectile):
+        """Возвращает погибший снаряд в пул. На него не должно оставаться ссылок из игры."""
+        free = self.free.setdefault(type(projectile), [])
+        if len(free) >= self.capacity:
+            return  # лишний снаряд просто удаляется сборщиком мусора
+        BANK.kind[projectile.slot] = KIND_OTHER
+        projectile.owner = None
+        free.append(projectile)
+
+    def clear(self):
+        self.free.clear()
+
+
+POOL = ProjectilePool()
+
 
 class Projectile:
+    # Числовые поля хранятся в общем хранилище BANK, объект помнит только номер ячейки
+    __slots__ = ("slot", "active", "_owner")
+    KIND = KIND_PROJECTILE
+    BANK_FIELDS = ("x", "y", "vx", "vy", "damage", "radius")
+    x = bank_field("x")
+    y = bank_field("y")
+    vx = bank_field("vx")
+    vy = bank_field("vy")
+    damage = bank_field("damage")
+    radius = bank_field("radius")
+
     def __init__(self, x, y, vx, vy, damage, radius):
+        kind = type(self).__dict__.get("KIND", KIND_OTHER)
+        try:
+            slot = self.slot  # снаряд из пула сохраняет свою ячейку
+        except AttributeError:
+            self.slot = BANK.allocate(kind)
+        else:
+            BANK.kind[slot] = kind
         self.x = float(x)
         self.y = float(y)
         self.vx = float(vx)
@@ -12,6 +72,44 @@ class Projectile:
         self.damage = damage
         self.radius = radius
         self.active = True
+        self._owner = None  # номер владельца в BANK.owner_id уже сброшен в allocate()
+
+    @classmethod
+    def spawn(cls, *args, **kwargs):
+        """Снаряд из пула POOL – как cls(*args, **kwargs), но без нового объекта, если есть свободный."""
+        return POOL.acquire(cls, *args, **kwargs)
+
+    @property
+    def owner(self):
+        return self._owner
+
+    @owner.setter
+    def owner(self, ship):
+        self._owner = ship
+        BANK.owner_id[self.slot] = ship.id if ship is not None else -1
+
+    def __del__(self):
+        try:
+            BANK.release(self.slot)
+        except (AttributeError, TypeError):
+            pass  # объект не до конца создан или интерпретатор завершается
+
+    def __getstate__(self):
+        # Копия снаряда (copy/pickle) получает собственную ячейку хранилища
+        _, state = super().__getstate__()
+        del state["slot"]
+        # Номер владельца хранится отдельно: при восстановлении снимка сам корабль может быть ещё пустым
+        state["owner_id"] = BANK.owner_id[self.slot]
+        for name in self.BANK_FIELDS:
+            state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        self.slot = BANK.allocate(type(self).__dict__.get("KIND", KIND_OTHER))
+        state = dict(state)
+        BANK.owner_id[self.slot] = state.pop("owner_id", -1)
+        for name, value in state.items():
+            setattr(self, name, value)
 
     def update(self, dt):
         # Базовая логика обновления: простое движение с учетом инерции
@@ -20,6 +118,7 @@ class Projectile:
         self.x, self.y = wrap_position(self.x, self.y)
 
     def draw(self, screen, cam, zoom, color=(255, 255, 255)):
+        import pygame
         from project.utils import world_to_screen
         sx, sy = world_to_screen(self.x, self.y, cam.x, cam.y, zoom)
         pygame.draw.circle(screen, color, (sx, sy), int(self.radius * zoom))
@@ -0,0 +1,264 @@
+import math
+from array import array
+from project.config import FIELD_W, FIELD_H
+from project.utils import wrap_delta
+from project.torus import wrap_array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен – без него снаряды обновляются по одному
+    np = None
+
+# Флаги типа снаряда (только точные классы, подклассы обновляются своим update())
+KIND_OTHER = 0
+KIND_PROJECTILE = 1
+KIND_MISSILE = 2
+KIND_MINE = 3
+KIND_PLASMOID = 4
+
+# Столбцы хранилища: имя -> тип элементов array.array
+COLUMNS = {
+    "x": "d", "y": "d", "vx": "d", "vy": "d",
+    "radius": "d", "damage": "q", "lifetime": "d",
+    "owner_id": "q", "kind": "b",
+    "speed": "d", "homing_strength": "d", "launching": "b",
+    "orbit_angle": "d", "ring_start_time": "d", "orbit_speed": "d", "base_radius": "d",
+}
+
+
+class ProjectileBank:
+    """
+    Хранилище снарядов в виде структуры массивов: x, y, vx, vy, radius, damage, lifetime,
+    owner_id, kind и параметры наведения/орбиты лежат в непрерывных массивах, а объекты
+    Projectile/Missile/Mine/Plasmoid – лёгкие представления, хранящие только номер своей ячейки.
+    Наведение ракет и мин, расстановка плазмоидов на кольце и заворот координат выполняются
+    одним векторным проходом NumPy по всем снарядам сразу; результат побитно совпадает
+    с вызовом update() у каждого снаряда.
+    """
+    # Ниже этого числа снарядов накладные расходы NumPy превышают выигрыш – работает update_scalar()
+    MIN_BATCH = 256
+
+    def __init__(self, capacity=256):
+        self.columns = {name: array(code) for name, code in COLUMNS.items()}
+        for name, column in self.columns.items():
+            setattr(self, name, column)
+        self.capacity = 0
+        self.free = []
+        self.min_batch = self.MIN_BATCH
+        self.grow(capacity)
+
+    def grow(self, capacity):
+        # Массивы расширяются на месте, поэтому ссылки на столбцы остаются действительными
+        extra = capacity - self.capacity
+        if extra <= 0:
+            return
+        for column in self.columns.values():
+            column.frombytes(bytes(extra * column.itemsize))
+        self.free.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+
+    def allocate(self, kind):
+        if not self.free:
+            self.grow(self.capacity * 2)
+        slot = self.free.pop()
+        self.kind[slot] = kind
+        self.owner_id[slot] = -1
+        return slot
+
+    def release(self, slot):
+        self.kind[slot] = KIND_OTHER
+        self.free.append(slot)
+
+    def view(self, name):
+        """Массив NumPy поверх столбца без копирования (действителен до следующего grow)."""
+        column = self.columns[name]
+        return np.frombuffer(column, dtype=column.typecode)
+
+    def gather(self, slots, name):
+        """Значения столбца для списка ячеек (в порядке ячеек) в виде списка Python."""
+        if np is not None and len(slots) >= self.min_batch:
+            return self.view(name)[slots].tolist()
+        column = self.columns[name]
+        return [column[slot] for slot in slots]
+
+    def update(self, projectiles, dt, game_time):
+        n = len(projectiles)
+        if np is None or n < self.min_batch:
+            self.update_scalar(projectiles, dt, game_time)
+            return
+        from project.entities.mine import Plasmoid
+        slots = np.fromiter([p.slot for p in projectiles], dtype=np.intp, count=n)
+        kind = self.view("kind")[slots]
+        for i in np.flatnonzero(kind == KIND_OTHER).tolist():
+            update_projectile(projectiles[i], dt, game_time)
+
+        X, Y, VX, VY = self.view("x"), self.view("y"), self.view("vx"), self.view("vy")
+        x, y, vx, vy = X[slots], Y[slots], VX[slots], VY[slots]
+        radius = self.view("radius")[slots]
+        lifetime = self.view("lifetime")[slots]
+        is_missile = kind == KIND_MISSILE
+        is_mine = kind == KIND_MINE
+        is_plasmoid = kind == KIND_PLASMOID
+        known = kind != KIND_OTHER
+
+        # Время жизни ракет и плазмоидов
+        timed = is_missile | is_plasmoid
+        lifetime = np.where(timed, lifetime - dt, lifetime)
+        expired = timed & (lifetime <= 0)
+        alive = known & ~expired
+
+        # Координаты целей (наведение) и владельцев (кольцо плазмоидов)
+        tx = np.zeros(n)
+        ty = np.zeros(n)
+        present = np.zeros(n, dtype=bool)
+        for i in np.flatnonzero(is_missile | is_mine | is_plasmoid).tolist():
+            p = projectiles[i]
+            if kind[i] == KIND_PLASMOID:
+                other = p.owner
+            else:
+                other = p.target
+                if other is not None and kind[i] == KIND_MINE and not getattr(other, 'active', True):
+                    other = None
+            if other is not None:
+                present[i] = True
+                tx[i] = other.x
+                ty[i] = other.y
+
+        # Наведение ракет и зафиксированных мин
+        dx = wrap_array(tx - x, FIELD_W)
+        dy = wrap_array(ty - y, FIELD_H)
+        # math.hypot вместо np.hypot – иначе результат расходится с update() в последнем бите
+        distance = np.fromiter(map(math.hypot, dx.tolist(), dy.tolist()), dtype=float, count=n)
+        mine_fixed = is_mine & (self.view("launching")[slots] == 0)
+        steer = alive & present & (distance != 0) & (is_missile | (mine_fixed & (distance <= 24 * radius)))
+        stop = mine_fixed & ~steer
+        safe_distance = np.where(distance != 0, distance, 1.0)
+        speed = self.view("speed")[slots]
+        homing_strength = self.view("homing_strength")[slots]
+        desired_vx = speed * dx / safe_distance
+        desired_vy = speed * dy / safe_distance
+        vx = np.where(steer, vx + (desired_vx - vx) * homing_strength * dt, vx)
+        vy = np.where(steer, vy + (desired_vy - vy) * homing_strength * dt, vy)
+        vx = np.where(stop, 0.0, vx)
+        vy = np.where(stop, 0.0, vy)
+
+        moving = alive & ~is_plasmoid
+        x = np.where(moving, x + vx * dt, x)
+        y = np.where(moving, y + vy * dt, y)
+
+        # Плазмоиды: позиция на расширяющемся кольце вокруг владельца
+        plasmoid = alive & is_plasmoid
+        if plasmoid.any():
+            angle = self.view("orbit_angle")[slots]
+            orbit_speed = self.view("orbit_speed")[slots]
+            orbit_distance = Plasmoid.RING_SCALING * (game_time - self.view("ring_start_time")[slots]) * orbit_speed
+            sin_a = np.sin(angle)
+            cos_a = np.cos(angle)
+            ringed = plasmoid & present
+            drifting = plasmoid & ~present
+            x = np.where(ringed, tx + orbit_distance * sin_a, np.where(drifting, x + orbit_speed * dt * sin_a, x))
+            y = np.where(ringed, ty - orbit_distance * cos_a, np.where(drifting, y - orbit_speed * dt * cos_a, y))
+            radius = np.where(plasmoid, self.view("base_radius")[slots] + orbit_distance / 50.0, radius)
+
+        x = np.where(alive, np.mod(x, FIELD_W), x)
+        y = np.where(alive, np.mod(y, FIELD_H), y)
+
+        # Запись результата только для снарядов известных типов
+        known_slots = slots[known]
+        X[known_slots] = x[known]
+        Y[known_slots] = y[known]
+        VX[known_slots] = vx[known]
+        VY[known_slots] = vy[known]
+        self.view("radius")[known_slots] = radius[known]
+        self.view("lifetime")[known_slots] = lifetime[known]
+        for i in np.flatnonzero(expired).tolist():
+            projectiles[i].active = False
+
+
+    def update_scalar(self, projectiles, dt, game_time):
+        """
+        Тот же проход по одному снаряду без NumPy: поля читаются из столбцов напрямую,
+        минуя свойства объектов. Повторяет update() классов Missile, Mine и Plasmoid.
+        """
+        from project.entities.mine import Plasmoid
+        X, Y, VX, VY = self.x, self.y, self.vx, self.vy
+        kinds = self.kind
+        lifetimes = self.lifetime
+        for p in projectiles:
+            slot = p.slot
+            kind = kinds[slot]
+            if kind == KIND_OTHER:
+                update_projectile(p, dt, game_time)
+                continue
+            if kind == KIND_MISSILE or kind == KIND_PLASMOID:
+                lifetime = lifetimes[slot] - dt
+                lifetimes[slot] = lifetime
+                if lifetime <= 0:
+                    p.active = False
+                    continue
+            x = X[slot]
+            y = Y[slot]
+            if kind == KIND_PLASMOID:
+                orbit_angle = self.orbit_angle[slot]
+                orbit_speed = self.orbit_speed[slot]
+                orbit_distance = Plasmoid.RING_SCALING * (game_time - self.ring_start_time[slot]) * orbit_speed
+                owner = p.owner
+                if owner is not None:
+                    x = owner.x + orbit_distance * math.sin(orbit_angle)
+                    y = owner.y - orbit_distance * math.cos(orbit_angle)
+                else:
+                    x += orbit_speed * dt * math.sin(orbit_angle)
+                    y -= orbit_speed * dt * math.cos(orbit_angle)
+                self.radius[slot] = self.base_radius[slot] + orbit_distance / 50.0
+            else:
+                vx = VX[slot]
+                vy = VY[slot]
+                if kind == KIND_MISSILE or (kind == KIND_MINE and not self.launching[slot]):
+                    target = p.target
+                    if kind == KIND_MINE and target is not None and not getattr(target, 'active', True):
+                        target = None
+                    steered = False
+                    if target is not None:
+                        dx = wrap_delta(x, target.x, FIELD_W)
+                        dy = wrap_delta(y, target.y, FIELD_H)
+                        distance = math.hypot(dx, dy)
+                        if distance != 0 and (kind == KIND_MISSILE or distance <= 24 * self.radius[slot]):
+                            speed = self.speed[slot]
+                            homing_strength = self.homing_strength[slot]
+                            vx += (speed * dx / distance - vx) * homing_strength * dt
+                            vy += (speed * dy / distance - vy) * homing_strength * dt
+                            steered = True
+                    if kind == KIND_MINE and not steered:
+                        vx = 0.0
+                        vy = 0.0
+                    VX[slot] = vx
+                    VY[slot] = vy
+                x += vx * dt
+                y += vy * dt
+            X[slot] = x % FIELD_W
+            Y[slot] = y % FIELD_H
+
+
+def bank_field(name):
+    """Свойство снаряда, значение которого хранится в столбце name общего хранилища."""
+    column = BANK.columns[name]
+
+    def fget(self):
+        return column[self.slot]
+
+    def fset(self, value):
+        column[self.slot] = value
+
+    return property(fget, fset)
+
+
+def update_projectile(projectile, dt, game_time):
+    from project.entities.mine import Plasmoid
+    if isinstance(projectile, Plasmoid):
+        projectile.update(dt, game_time)
+    else:
+        projectile.update(dt)
+
+
+# Общее хранилище всех снарядов процесса
+BANK = ProjectileBank()
@@ -4,128 +4,166 @@ import math
 import random
 
 from project.config import *
-from project.utils import spawn_ship, wrap_delta, world_to_screen, wrap_position
-from project.gravity import apply_gravity
-from project.entities.planet import Planet
-from project.entities.asteroid import Asteroid
-from project.entities.camera import Camera
 from project.ships import SHIP_CLASSES  # Реестр кораблей
-from project.entities.mine import Plasmoid
-from project.collisions import (handle_planet_collision, handle_ship_asteroid_collision,
-                                handle_ship_ship_collision, handle_asteroid_collision)
+from project.simulation import Simulation, ShipControls
+from project.utils import wrap_delta
+from project.replay import ReplayWriter, encode_controls
+from project.netplay import RollbackSession
+from project.snapshot import RewindBuffer
+from project.hud import Hud, ProfilerOverlay
+from project.ai_worker import AIWorker
+from project import profiler
 from menu import PauseMenu
 
+# Уровни AI из меню и соответствующая сложность контроллера
+CYBORG_DIFFICULTIES = {"Weak Cyborg": "Easy", "Good Cyborg": "Medium", "Awesome Cyborg": "Hard"}
+
+
+def cyborg_difficulty(settings):
+    """Сложность AI команды по её настройкам из меню или None для игрока."""
+    control = settings["control"]
+    if control == "Cyborg":
+        return settings["cyborg_difficulty"]
+    return CYBORG_DIFFICULTIES.get(control)
+
+
+def is_human(settings):
+    """Управляет ли командой игрок: меню и сетевая игра пишут "Human Control", старые настройки – "Human"."""
+    return settings["control"] in ("Human Control", "Human")
+
 
 class Game:
-    def __init__(self, config):
+    def __init__(self, config=None, record=None, replay=None, speed=1.0, net=None):
+        """
+        config – настройки из меню. record – путь файла для записи матча.
+        replay – ReplayReader: матч воспроизводится из записи (config берётся из неё),
+        speed – множитель скорости воспроизведения.
+        net – LockstepSession или RollbackSession: сетевой матч, config и флоты присылает хост.
+        """
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
         pygame.display.set_caption("Combat Zone with Gravity-Boosted Ships")
         self.clock = pygame.time.Clock()
-
+        self.hud = Hud((GAME_SCREEN_W, 0, PANEL_WIDTH, SCREEN_H))
+        self.game_rect = pygame.Rect(0, 0, GAME_SCREEN_W, SCREEN_H)
+
+        self.replay = replay
+        self.speed = speed
+        self.recorder = None
+        self.ai_worker = None
+        self.net = net
+        if replay is not None:
+            config = replay.meta["config"]
+        elif net is not None:
+            config = net.start["config"]
         self.config = config
         self.game_mode = config["mode"]
 
-        self.team1_fleet = [SHIP_CLASSES[ship] for ship in config["teams"]["Team 1"] if ship is not None]
-        self.team2_fleet = [SHIP_CLASSES[ship] for ship in config["teams"]["Team 2"] if ship is not None]
+        team1_fleet = [SHIP_CLASSES[ship] for ship in config["teams"]["Team 1"] if ship is not None]
+        team2_fleet = [SHIP_CLASSES[ship] for ship in config["teams"]["Team 2"] if ship is not None]
 
-        if not self.team1_fleet or not self.team2_fleet:
+        if not team1_fleet or not team2_fleet:
             print("Error: One of the fleets is empty!")
             pygame.quit()
             sys.exit()
 
-        self.team1_remaining = list(self.team1_fleet)
-        self.team2_remaining = list(self.team2_fleet)
-
-        if config["settings"]["Team 1"]["control"] == "Human":
-            selected_ship = self.human_select_initial_ship("Team 1", self.team1_remaining)
-            self.team1_remaining.remove(selected_ship)
-            sx1, sy1 = spawn_ship()
-            self.ship1 = selected_ship(sx1, sy1, (255, 100, 100))
-            self.wait_for_key("Team 1 selected. Press any key for Team 2 selection.")
-        else:
-            selected_ship = self.team1_remaining.pop(0)
-            sx1, sy1 = spawn_ship()
-            self.ship1 = selected_ship(sx1, sy1, (255, 100, 100))
-
-        if config["settings"]["Team 2"]["control"] == "Human":
-            selected_ship = self.human_select_initial_ship("Team 2", self.team2_remaining)
-            self.team2_remaining.remove(selected_ship)
-            sx2, sy2 = spawn_ship()
-            self.ship2 = selected_ship(sx2, sy2, (100, 200, 255))
-            self.wait_for_key("Team 2 selected. Press any key to start round.")
-        else:
-            selected_ship = self.team2_remaining.pop(0)
-            sx2, sy2 = spawn_ship()
-            self.ship2 = selected_ship(sx2, sy2, (100, 200, 255))
-
-        if self.game_mode != "Human vs Human":
-            if self.config["settings"]["Team 2"]["control"] == "Cyborg":
-                from project.ai_controller import EarthlingAIController
-                self.ship2.ai_controller = EarthlingAIController(self.ship2,
-                                                                 difficulty=self.config["settings"]["Team 2"][
-                                                                     "cyborg_difficulty"])
-            if self.config["settings"]["Team 1"]["control"] == "Cyborg":
-                from project.ai_controller import EarthlingAIController
-                self.ship1.ai_controller = EarthlingAIController(self.ship1,
-                                                                 difficulty=self.config["settings"]["Team 1"][
-                                                                     "cyborg_difficulty"])
+        if replay is not None:
+            # Флоты, киборги, зерно и выборы кораблей берутся из записи
+            self.sim = replay.build_simulation()
+        elif net is not None:
+            # Оба узла строят один и тот же мир из параметров хоста; замены кораблей – по зерну матча
+            self.sim = net.build_simulation()
         else:
-            self.ship1.ai_controller = None
-            self.ship2.ai_controller = None
+            # Игрок выбирает стартовый корабль – он ставится первым в списке флота
+            team1_fleet = self.order_fleet("Team 1", team1_fleet,
+                                           "Team 1 selected. Press any key for Team 2 selection.")
+            team2_fleet = self.order_fleet("Team 2", team2_fleet,
+                                           "Team 2 selected. Press any key to start round.")
+
+            cyborgs = {}
+            if self.game_mode != "Human vs Human":
+                for team in ("Team 1", "Team 2"):
+                    difficulty = cyborg_difficulty(self.config["settings"][team])
+                    if difficulty is not None:
+                        cyborgs[team] = difficulty
+
+            # Вся игровая логика живёт в Simulation, Game отвечает за ввод и отрисовку.
+            # Предел времени планировщика и рабочий AI – только без записи: запись должна воспроизводиться
+            ai_time_budget = AI_PLANNER_BUDGET_MS / 1000.0 if not record else None
+            if AI_WORKER is not None and not record and "Hard" in cyborgs.values():
+                self.ai_worker = AIWorker(AI_WORKER)
+            self.sim = Simulation(team1_fleet, team2_fleet, cyborgs=cyborgs,
+                                  select_replacement=self.choose_replacement, ai_time_budget=ai_time_budget,
+                                  ai_worker=self.ai_worker)
+        # С откатом шаги пересчитываются – записывать нечего, пока они не подтверждены
+        if record and replay is None and not isinstance(net, RollbackSession):
+            self.recorder = ReplayWriter(record, self.sim, TICK_RATE, meta={"config": self.config})
 
-        self.planet = Planet(FIELD_W / 2, FIELD_H / 2, 30, (180, 180, 180))
-        self.cam = Camera(FIELD_W / 2, FIELD_H / 2)
         self.globalCamX = self.cam.x
         self.globalCamY = self.cam.y
         self.prevCamX = self.cam.x
         self.prevCamY = self.cam.y
 
-        from project.stars import generate_colored_stars
-        self.star_layer_far = generate_colored_stars(180)
-        self.star_layer_mid = generate_colored_stars(120)
-        self.star_layer_near = generate_colored_stars(80)
-
-        self.asteroids = []
-        for _ in range(5):
-            x = random.uniform(0, FIELD_W)
-            y = random.uniform(0, FIELD_H)
-            radius = random.randint(8, 12)
-            vx = random.uniform(-50, 50)
-            vy = random.uniform(-50, 50)
-            color = (200, 200, 200)
-            self.asteroids.append(Asteroid(x, y, radius, vx, vy, color))
-
-        self.missiles = []
-        self.game_time = 0
+        from project.stars import generate_colored_stars, StarLayer
+        self.star_layer_far = StarLayer(generate_colored_stars(180), 0.3)
+        self.star_layer_mid = StarLayer(generate_colored_stars(120), 0.6)
+        self.star_layer_near = StarLayer(generate_colored_stars(80), 0.9)
+
+        self.controls = {}
         self.running = True
-        self.dt = 0
-
-    def pre_round_ship_selection(self):
-        if self.config["settings"]["Team 1"]["control"] == "Human":
-            if self.team1_remaining:
-                selected_ship = self.human_select_initial_ship("Team 1", self.team1_remaining)
-                self.team1_remaining.remove(selected_ship)
-                sx, sy = spawn_ship()
-                self.ship1 = selected_ship(sx, sy, (255, 100, 100))
-                self.wait_for_key("Team 1 replacement selected. Press any key for Team 2 replacement.")
-        else:
-            if self.team1_remaining:
-                selected_ship = self.team1_remaining.pop(0)
-                sx, sy = spawn_ship()
-                self.ship1 = selected_ship(sx, sy, (255, 100, 100))
-        if self.config["settings"]["Team 2"]["control"] == "Human":
-            if self.team2_remaining:
-                selected_ship = self.human_select_initial_ship("Team 2", self.team2_remaining)
-                self.team2_remaining.remove(selected_ship)
-                sx, sy = spawn_ship()
-                self.ship2 = selected_ship(sx, sy, (100, 200, 255))
-                self.wait_for_key("Team 2 replacement selected. Press any key to continue round.")
-        else:
-            if self.team2_remaining:
-                selected_ship = self.team2_remaining.pop(0)
-                sx, sy = spawn_ship()
-                self.ship2 = selected_ship(sx, sy, (100, 200, 255))
+        self.dt = 1.0 / (replay.tick_rate if replay is not None else TICK_RATE)
+        # Фиксированный шаг: накопленное, но ещё не просимулированное время кадров
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self.previous = {}
+        self.prevGlobalCamX = self.globalCamX
+        self.prevGlobalCamY = self.globalCamY
+        self.zoom = self.prevZoom = self.cam.zoom
+        # Мгновенная перемотка назад (Backspace). При записи матча отключена:
+        # запись должна совпадать с тем, что было сыграно, и в сетевой игре: мир у партнёра общий
+        self.rewind_buffer = None
+        if replay is None and self.recorder is None and net is None:
+            self.rewind_buffer = RewindBuffer(REWIND_INTERVAL, REWIND_CAPACITY)
+        # Таблица замеров подсистем, переключается F3
+        self.profile_overlay = None
+
+    # Доступ к состоянию симуляции для отрисовки
+    @property
+    def ship1(self):
+        return self.sim.ship1
+
+    @property
+    def ship2(self):
+        return self.sim.ship2
+
+    @property
+    def planet(self):
+        return self.sim.planet
+
+    @property
+    def asteroids(self):
+        return self.sim.asteroids
+
+    @property
+    def missiles(self):
+        return self.sim.missiles
+
+    @property
+    def cam(self):
+        return self.sim.cam
+
+    @property
+    def game_time(self):
+        return self.sim.game_time
+
+    def order_fleet(self, team, fleet, message):
+        if not is_human(self.config["settings"][team]):
+            return fleet
+        selected_ship = self.human_select_initial_ship(team, fleet)
+        remaining = list(fleet)
+        remaining.remove(selected_ship)
+        self.wait_for_key(message)
+        return [selected_ship] + remaining
 
     def wait_for_key(self, message):
         waiting = True
@@ -172,9 +210,12 @@ class Game:
     def pause(self):
         pause_menu = PauseMenu(self.screen, self.clock)
         option = pause_menu.display()
+        self.hud.invalidate()
         return option
 
     def handle_input(self):
+        controls1 = ShipControls()
+        controls2 = ShipControls()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
@@ -188,226 +229,84 @@ class Game:
                     elif event.key == pygame.K_x:
                         pygame.quit()
                         sys.exit()
-                if not (hasattr(self.ship1, 'ai_controller') and self.ship1.ai_controller is not None):
-                    if event.key == pygame.K_a:
-                        primary = self.ship1.fire_primary(self.ship2, self.game_time)
-                        if primary:
-                            if isinstance(primary, list):
-                                self.missiles.extend(primary)
-                            else:
-                                self.missiles.append(primary)
-                    if event.key == pygame.K_q:
-                        special = self.ship1.fire_secondary([self.ship2] + self.asteroids + self.missiles,
-                                                            self.game_time)
-                        if special:
-                            if isinstance(special, list):
-                                self.missiles.extend(special)
-                            else:
-                                self.missiles.append(special)
-                if not (hasattr(self.ship2, 'ai_controller') and self.ship2.ai_controller is not None):
-                    if event.key == pygame.K_RCTRL:
-                        primary = self.ship2.fire_primary(self.ship1, self.game_time)
-                        if primary:
-                            if isinstance(primary, list):
-                                self.missiles.extend(primary)
-                            else:
-                                self.missiles.append(primary)
-                    if event.key == pygame.K_RSHIFT:
-                        special = self.ship2.fire_secondary([self.ship1] + self.asteroids + self.missiles,
-                                                            self.game_time)
-                        if special:
-                            if isinstance(special, list):
-                                self.missiles.extend(special)
-                            else:
-                                self.missiles.append(special)
+                if self.replay is not None and event.key in (pygame.K_LEFT, pygame.K_RIGHT):
+                    seconds = REPLAY_SEEK_SECONDS if event.key == pygame.K_RIGHT else -REPLAY_SEEK_SECONDS
+                    self.seek_replay(seconds)
+                if event.key == pygame.K_BACKSPACE and self.rewind_buffer is not None:
+                    self.rewind(REWIND_SECONDS)
+                if event.key == pygame.K_F3:
+                    self.toggle_profile_overlay()
+                if event.key == pygame.K_a:
+                    controls1.fire_primary = True
+                if event.key == pygame.K_q:
+                    controls1.fire_secondary = True
+                if event.key == pygame.K_RCTRL:
+                    controls2.fire_primary = True
+                if event.key == pygame.K_RSHIFT:
+                    controls2.fire_secondary = True
             elif event.type == pygame.KEYUP:
                 if event.key == pygame.K_a:
-                    if hasattr(self.ship1, 'release_mine'):
-                        mine = self.ship1.release_mine()
-                        if mine and mine not in self.missiles:
-                            self.missiles.append(mine)
+                    controls1.release_mine = True
                 if event.key == pygame.K_RCTRL:
-                    if hasattr(self.ship2, 'release_mine'):
-                        mine = self.ship2.release_mine()
-                        if mine and mine not in self.missiles:
-                            self.missiles.append(mine)
+                    controls2.release_mine = True
         keys = pygame.key.get_pressed()
-        if keys[pygame.K_a]:
-            if hasattr(self.ship1, 'current_mine') and self.ship1.current_mine is not None:
-                if self.ship1.current_mine not in self.missiles:
-                    self.missiles.append(self.ship1.current_mine)
-        if keys[pygame.K_RCTRL]:
-            if hasattr(self.ship2, 'current_mine') and self.ship2.current_mine is not None:
-                if self.ship2.current_mine not in self.missiles:
-                    self.missiles.append(self.ship2.current_mine)
-        if (not hasattr(self.ship1, 'ai_controller')) or (self.ship1.ai_controller is None):
-            if keys[pygame.K_s]:
-                self.ship1.angle = (self.ship1.angle - self.ship1.turn_speed * self.dt) % 360
-            if keys[pygame.K_f]:
-                self.ship1.angle = (self.ship1.angle + self.ship1.turn_speed * self.dt) % 360
-            if keys[pygame.K_e]:
-                if not hasattr(self.ship1, "thrust_timer"):
-                    self.ship1.thrust_timer = 0
-                self.ship1.thrust_timer += self.dt
-                while self.ship1.thrust_timer >= self.ship1.thrust_wait:
-                    rad = math.radians(self.ship1.angle)
-                    thrust_dx = math.sin(rad)
-                    thrust_dy = -math.cos(rad)
-                    speed = math.hypot(self.ship1.vx, self.ship1.vy)
-                    if speed > self.ship1.max_thrust and (speed > 0 and (
-                            self.ship1.vx * thrust_dx + self.ship1.vy * thrust_dy) / speed > 0) and not self.ship1.in_gravity_field:
-                        self.ship1.thrust_timer -= self.ship1.thrust_wait
-                        continue
-                    if (self.ship1.vx * thrust_dx + self.ship1.vy * thrust_dy) / max(speed, 1) < 0:
-                        braking_multiplier = 2.0
-                        self.ship1.vx += braking_multiplier * self.ship1.thrust_increment * thrust_dx
-                        self.ship1.vy += braking_multiplier * self.ship1.thrust_increment * thrust_dy
-                    else:
-                        self.ship1.vx += self.ship1.thrust_increment * thrust_dx
-                        self.ship1.vy += self.ship1.thrust_increment * thrust_dy
-                    self.ship1.thrust_timer -= self.ship1.thrust_wait
-        if (not hasattr(self.ship2, 'ai_controller')) or (self.ship2.ai_controller is None):
-            if keys[pygame.K_LEFT]:
-                self.ship2.angle = (self.ship2.angle - self.ship2.turn_speed * self.dt) % 360
-            if keys[pygame.K_RIGHT]:
-                self.ship2.angle = (self.ship2.angle + self.ship2.turn_speed * self.dt) % 360
-            if keys[pygame.K_UP]:
-                if not hasattr(self.ship2, "thrust_timer"):
-                    self.ship2.thrust_timer = 0
-                self.ship2.thrust_timer += self.dt
-                while self.ship2.thrust_timer >= self.ship2.thrust_wait:
-                    rad = math.radians(self.ship2.angle)
-                    thrust_dx = math.sin(rad)
-                    thrust_dy = -math.cos(rad)
-                    speed = math.hypot(self.ship2.vx, self.ship2.vy)
-                    if speed > self.ship2.max_thrust and (speed > 0 and (
-                            self.ship2.vx * thrust_dx + self.ship2.vy * thrust_dy) / speed > 0) and not self.ship2.in_gravity_field:
-                        self.ship2.thrust_timer -= self.ship2.thrust_wait
-                        continue
-                    if (self.ship2.vx * thrust_dx + self.ship2.vy * thrust_dy) / max(speed, 1) < 0:
-                        braking_multiplier = 2.0
-                        self.ship2.vx += braking_multiplier * self.ship2.thrust_increment * thrust_dx
-                        self.ship2.vy += braking_multiplier * self.ship2.thrust_increment * thrust_dy
-                    else:
-                        self.ship2.vx += self.ship2.thrust_increment * thrust_dx
-                        self.ship2.vy += self.ship2.thrust_increment * thrust_dy
-                    self.ship2.thrust_timer -= self.ship2.thrust_wait
+        controls1.hold_primary = keys[pygame.K_a]
+        controls1.turn = keys[pygame.K_f] - keys[pygame.K_s]
+        controls1.thrust = keys[pygame.K_e]
+        controls2.hold_primary = keys[pygame.K_RCTRL]
+        controls2.turn = keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]
+        controls2.thrust = keys[pygame.K_UP]
+        # В сетевой игре свой корабль управляется клавишами Team 1, чужой – партнёром
+        layouts = {"Team 1": controls1, "Team 2": controls2}
+        if self.net is not None:
+            layouts = {self.net.local_team: controls1}
+        # Нажатия из кадра, в котором не было ни одного шага симуляции, переносятся в следующий
+        for team, controls in layouts.items():
+            pending = self.controls.get(team)
+            if pending is not None:
+                controls.take_edges(pending)
+        self.controls = layouts
+
+    def advance(self, frame_time):
+        """
+        Продвигает симуляцию фиксированными шагами 1 / TICK_RATE на прошедшее время кадра.
+        Результат зависит только от последовательности шагов и управления, но не от частоты кадров.
+        """
+        self.accumulator += frame_time * self.speed
+        steps = 0
+        while self.accumulator >= self.dt and self.running:
+            if steps == MAX_SUBSTEPS * max(1, math.ceil(self.speed)):
+                # Долгий кадр (пауза, выбор корабля, подвисание) – лишнее время отбрасываем
+                self.accumulator = 0.0
+                break
+            self.remember_positions()
+            if self.update(self.dt) is False:
+                # Сетевая игра ждёт управление партнёра – время ожидания не копится, чтобы не догонять рывком
+                self.accumulator = min(self.accumulator, self.dt)
+                break
+            self.accumulator -= self.dt
+            steps += 1
+        self.alpha = self.accumulator / self.dt
 
     def update(self, dt):
-        self.dt = dt
-        self.game_time += dt
-
-        self.ship1.in_gravity_field = False
-        self.ship2.in_gravity_field = False
-
-        if hasattr(self.ship1, "ai_controller") and self.ship1.ai_controller is not None:
-            self.ship1.ai_controller.update(dt, self.ship2, self.asteroids + [self.planet], self.missiles)
-        if hasattr(self.ship2, "ai_controller") and self.ship2.ai_controller is not None:
-            self.ship2.ai_controller.update(dt, self.ship1, self.asteroids + [self.planet], self.missiles)
-
-        apply_gravity(self.ship1, self.planet, dt)
-        apply_gravity(self.ship2, self.planet, dt)
-        for projectile in self.missiles:
-            if hasattr(projectile, 'launching') and projectile.launching:
-                apply_gravity(projectile, self.planet, dt)
-
-        self.ship1.update(dt)
-        self.ship2.update(dt)
-        for asteroid in self.asteroids:
-            asteroid.update(dt)
-        for projectile in self.missiles:
-            if isinstance(projectile, Plasmoid):
-                projectile.update(dt, self.game_time)
-            else:
-                projectile.update(dt)
-
-        for projectile in self.missiles:
-            if not projectile.active:
-                continue
-            if hasattr(projectile, "target") and projectile.target is not None:
-                tx = projectile.target.x
-                ty = projectile.target.y
-                d_x = wrap_delta(projectile.x, tx, FIELD_W)
-                d_y = wrap_delta(projectile.y, ty, FIELD_H)
-                target_radius = getattr(projectile.target, 'radius', 0)
-                if math.hypot(d_x, d_y) < (projectile.radius + target_radius):
-                    projectile.target.take_damage(projectile.damage)
-                    projectile.active = False
-                    continue
-            elif hasattr(projectile, "owner") and projectile.owner is not None:
-                if projectile.owner.id == self.ship1.id:
-                    enemy = self.ship2
-                else:
-                    enemy = self.ship1
-                d_x = wrap_delta(projectile.x, enemy.x, FIELD_W)
-                d_y = wrap_delta(projectile.y, enemy.y, FIELD_H)
-                if math.hypot(d_x, d_y) < (projectile.radius + enemy.radius):
-                    enemy.take_damage(projectile.damage)
-                    projectile.active = False
-                    continue
-            if isinstance(projectile, Plasmoid) and projectile.active:
-                for other_proj in self.missiles:
-                    if other_proj is projectile or not other_proj.active:
-                        continue
-                    if hasattr(other_proj, "owner") and other_proj.owner is not None:
-                        if other_proj.owner.id != projectile.owner.id:
-                            dx = wrap_delta(projectile.x, other_proj.x, FIELD_W)
-                            dy = wrap_delta(projectile.y, other_proj.y, FIELD_H)
-                            if math.hypot(dx, dy) < (projectile.radius + other_proj.radius):
-                                projectile.active = False
-                                other_proj.active = False
-                                break
-                if not projectile.active:
-                    continue
-            for asteroid in self.asteroids:
-                if abs(projectile.x - asteroid.x) > (projectile.radius + asteroid.radius) or abs(
-                        projectile.y - asteroid.y) > (projectile.radius + asteroid.radius):
-                    continue
-                dx = wrap_delta(projectile.x, asteroid.x, FIELD_W)
-                dy = wrap_delta(projectile.y, asteroid.y, FIELD_H)
-                if math.hypot(dx, dy) < (projectile.radius + asteroid.radius):
-                    asteroid.active = False
-                    projectile.active = False
-                    break
-            dx = wrap_delta(projectile.x, self.planet.x, FIELD_W)
-            dy = wrap_delta(projectile.y, self.planet.y, FIELD_H)
-            if math.hypot(dx, dy) < (projectile.radius + self.planet.radius):
-                projectile.active = False
-
-        for i in range(len(self.missiles)):
-            for j in range(i + 1, len(self.missiles)):
-                proj1 = self.missiles[i]
-                proj2 = self.missiles[j]
-                if not proj1.active or not proj2.active:
-                    continue
-                if hasattr(proj1, "owner") and hasattr(proj2,
-                                                       "owner") and proj1.owner is not None and proj2.owner is not None:
-                    if proj1.owner.id != proj2.owner.id:
-                        dx = wrap_delta(proj1.x, proj2.x, FIELD_W)
-                        dy = wrap_delta(proj1.y, proj2.y, FIELD_H)
-                        if math.hypot(dx, dy) <= (proj1.radius + proj2.radius):
-                            proj1.active = False
-                            proj2.active = False
-
-        self.missiles = [m for m in self.missiles if m.active]
-        self.asteroids = [a for a in self.asteroids if a.active]
-
-        handle_planet_collision(self.ship1, self.planet, self.game_time)
-        handle_planet_collision(self.ship2, self.planet, self.game_time)
-        for asteroid in self.asteroids:
-            handle_ship_asteroid_collision(self.ship1, asteroid)
-            handle_ship_asteroid_collision(self.ship2, asteroid)
-        handle_ship_ship_collision(self.ship1, self.ship2)
-        for i in range(len(self.asteroids)):
-            for j in range(i + 1, len(self.asteroids)):
-                handle_asteroid_collision(self.asteroids[i], self.asteroids[j])
-        for i, asteroid in enumerate(self.asteroids):
-            dx = wrap_delta(asteroid.x, self.planet.x, FIELD_W)
-            dy = wrap_delta(asteroid.y, self.planet.y, FIELD_H)
-            if math.hypot(dx, dy) < (self.planet.radius + asteroid.radius):
-                self.asteroids[i] = self.generate_offscreen_asteroid(self.cam, 1.0)
-
-        self.cam.update_center_on_two_ships(self.ship1, self.ship2)
+        if self.replay is not None:
+            # Управление берётся из записи, клавиатура только для паузы и выхода
+            self.controls = self.replay.next_inputs()
+            if self.controls is None:
+                self.running = False
+                return
+        if self.net is not None:
+            if not self.exchange_inputs():
+                return False
+            self.net.step(self.sim, dt)
+            self.net.send()
+        else:
+            if self.rewind_buffer is not None:
+                self.rewind_buffer.tick(self.sim)
+            self.sim.step(dt, self.controls)
+        # Нажатия срабатывают один раз, на последующих шагах кадра – только удерживаемые клавиши
+        self.controls = {team: controls.held() for team, controls in self.controls.items()}
+
         dx_cam = self.cam.x - self.prevCamX
         dy_cam = self.cam.y - self.prevCamY
         if dx_cam > FIELD_W / 2:
@@ -418,78 +317,78 @@ class Game:
             dy_cam -= FIELD_H
         elif dy_cam < -FIELD_H / 2:
             dy_cam += FIELD_H
+        self.prevGlobalCamX = self.globalCamX
+        self.prevGlobalCamY = self.globalCamY
         self.globalCamX += dx_cam
         self.globalCamY += dy_cam
         self.prevCamX = self.cam.x
         self.prevCamY = self.cam.y
+        self.prevZoom = self.zoom
+        self.zoom = self.cam.zoom
+
+        if self.sim.finished if self.net is None else self.net.over(self.sim):
+            self.end_game(winner=self.sim.winner)
+
+    def exchange_inputs(self):
+        """
+        Сетевая игра: отдаёт своё управление на шаг через input_delay шагов и принимает управление партнёра.
+        Возвращает True, если управление обоих игроков на текущий шаг известно.
+        """
+        net = self.net
+        net.poll()
+        local = self.controls.get(net.local_team)
+        if net.add_local(encode_controls(local)):
+            # Нажатия ушли в свой шаг, дальше до следующего кадра – только удерживаемые клавиши
+            self.controls = {net.local_team: local.held()} if local is not None else {}
+        ready = net.ready()
+        if not ready:
+            net.stalls += 1
+            net.send()
+        if net.finished:
+            self.running = False
+            return False
+        return ready
+
+    def seek_replay(self, seconds):
+        """Перемотка повтора на seconds вперёд или назад через ключевые кадры записи."""
+        target = max(0, self.replay.ticks + round(seconds * self.replay.tick_rate))
+        self.replay.seek(self.sim, target)
+        self.controls = {}
+        self.reset_interpolation()
+
+    def rewind(self, seconds):
+        """Возвращает матч примерно на seconds назад из кольцевого буфера снимков."""
+        if self.rewind_buffer.rewind(self.sim, round(seconds / self.dt)):
+            self.controls = {}
+            self.reset_interpolation()
+
+    def reset_interpolation(self):
+        # После перехода объекты новые – интерполировать между кадрами нечего
+        self.previous = {}
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self.prevCamX = self.cam.x
+        self.prevCamY = self.cam.y
+        self.prevGlobalCamX = self.globalCamX
+        self.prevGlobalCamY = self.globalCamY
+        self.zoom = self.prevZoom = self.cam.zoom
+
+    def toggle_profile_overlay(self):
+        if self.profile_overlay is None:
+            # Без --profile замеры начинаются с первого показа таблицы
+            profiler.enable()
+            self.profile_overlay = ProfilerOverlay()
+        else:
+            self.profile_overlay = None
 
-        self.check_ship_replacement()
-
-    def generate_offscreen_asteroid(self, cam, zoom):
-        margin = 20
-        while True:
-            x = random.uniform(0, FIELD_W)
-            y = random.uniform(0, FIELD_H)
-            sx, sy = world_to_screen(x, y, cam.x, cam.y, zoom)
-            if sx < -margin or sx > GAME_SCREEN_W + margin or sy < -margin or sy > SCREEN_H + margin:
-                break
-        radius = random.randint(8, 12)
-        vx = random.uniform(-50, 50)
-        vy = random.uniform(-50, 50)
-        color = (200, 200, 200)
-        new_ast = Asteroid(x, y, radius, vx, vy, color)
-        from project.config import ASTEROID_ROTATION_AXIS
-        new_ast.angular_velocity = ASTEROID_ROTATION_AXIS * random.uniform(50, 180)
-        return new_ast
-
-    def check_ship_replacement(self):
-        if self.ship1 and self.ship1.dead:
-            new_ship_class = self.get_replacement("Team 1")
-            if new_ship_class is None:
-                self.end_game(winner="Team 2")
-                return
-            else:
-                sx, sy = spawn_ship()
-                self.ship1 = new_ship_class(sx, sy, (255, 100, 100))
-                if self.config["settings"]["Team 1"]["control"] == "Human":
-                    self.wait_for_key("Team 1 replacement selected. Press any key to continue round.")
-        if self.ship2 and self.ship2.dead:
-            new_ship_class = self.get_replacement("Team 2")
-            if new_ship_class is None:
-                self.end_game(winner="Team 1")
-                return
-            else:
-                sx, sy = spawn_ship()
-                self.ship2 = new_ship_class(sx, sy, (100, 200, 255))
-                if self.config["settings"]["Team 2"]["control"] == "Human":
-                    self.wait_for_key("Team 2 replacement selected. Press any key to continue round.")
-
-    # Изменения: Новый метод get_replacement с использованием нового меню выбора
-    def get_replacement(self, team):
-        if team == "Team 1":
-            if self.team1_remaining:
-                if self.config["settings"]["Team 1"]["control"] == "Human":
-                    new_ship_class = self.select_replacement_ship("Team 1", self.team1_remaining, is_cyborg=False)
-                    self.team1_remaining.remove(new_ship_class)
-                    return new_ship_class
-                else:
-                    new_ship_class = self.select_replacement_ship("Team 1", self.team1_remaining, is_cyborg=True)
-                    self.team1_remaining.remove(new_ship_class)
-                    return new_ship_class
-            else:
-                return None
-        elif team == "Team 2":
-            if self.team2_remaining:
-                if self.config["settings"]["Team 2"]["control"] == "Human":
-                    new_ship_class = self.select_replacement_ship("Team 2", self.team2_remaining, is_cyborg=False)
-                    self.team2_remaining.remove(new_ship_class)
-                    return new_ship_class
-                else:
-                    new_ship_class = self.select_replacement_ship("Team 2", self.team2_remaining, is_cyborg=True)
-                    self.team2_remaining.remove(new_ship_class)
-                    return new_ship_class
-            else:
-                return None
+    # Выбор корабля на замену погибшему – вызывается из Simulation
+    def choose_replacement(self, team, remaining):
+        self.hud.invalidate()  # экраны выбора рисуются поверх панели
+        if is_human(self.config["settings"][team]):
+            new_ship_class = self.select_replacement_ship(team, remaining, is_cyborg=False)
+            self.wait_for_key(f"{team} replacement selected. Press any key to continue round.")
+            return new_ship_class
+        return self.select_replacement_ship(team, remaining, is_cyborg=True)
 
     # Изменения: Новая функция для выбора корабля замены
     def select_replacement_ship(self, team, available_ships, is_cyborg):
@@ -561,74 +460,126 @@ class Game:
 
     # Изменения: Новая версия функции draw_hud с добавлением энергии, скорости и сложности для Cyborg
     def draw_hud(self, zoom=1.0):
-        hud_rect = pygame.Rect(GAME_SCREEN_W, 0, PANEL_WIDTH, SCREEN_H)
-        pygame.draw.rect(self.screen, (50, 50, 50), hud_rect)  # Фон HUD
-        font = pygame.font.SysFont("Arial", 24)
-
-        # Информация для Team 1
-        team1_name = self.config["team_names"]["Team 1"]
-        team1_control = self.config["settings"]["Team 1"]["control"]
-        team1_crew = self.ship1.crew if self.ship1 else 0
-        team1_energy = self.ship1.energy if self.ship1 else 0
-        team1_speed = int(math.hypot(self.ship1.vx, self.ship1.vy)) if self.ship1 else 0
-        text1 = font.render(f"Team 1: {team1_name}", True, (255, 255, 255))
-        text2 = font.render(f"Crew: {team1_crew}", True, (255, 255, 255))
-        text3 = font.render(f"Energy: {team1_energy}", True, (255, 255, 255))
-        text4 = font.render(f"Speed: {team1_speed}", True, (255, 255, 255))
-        text5 = font.render(f"Ctrl: {team1_control}", True, (255, 255, 255))
-        self.screen.blit(text1, (GAME_SCREEN_W + 10, 10))
-        self.screen.blit(text2, (GAME_SCREEN_W + 10, 40))
-        self.screen.blit(text3, (GAME_SCREEN_W + 10, 70))
-        self.screen.blit(text4, (GAME_SCREEN_W + 10, 100))
-        self.screen.blit(text5, (GAME_SCREEN_W + 10, 130))
-        if team1_control != "Human Control":
-            team1_diff = self.config["settings"]["Team 1"].get("cyborg_difficulty", "N/A")
-            text6 = font.render(f"Diff: {team1_diff}", True, (255, 255, 255))
-            self.screen.blit(text6, (GAME_SCREEN_W + 10, 160))
-
-        # Информация для Team 2
-        team2_name = self.config["team_names"]["Team 2"]
-        team2_control = self.config["settings"]["Team 2"]["control"]
-        team2_crew = self.ship2.crew if self.ship2 else 0
-        team2_energy = self.ship2.energy if self.ship2 else 0
-        team2_speed = int(math.hypot(self.ship2.vx, self.ship2.vy)) if self.ship2 else 0
-        text7 = font.render(f"Team 2: {team2_name}", True, (255, 255, 255))
-        text8 = font.render(f"Crew: {team2_crew}", True, (255, 255, 255))
-        text9 = font.render(f"Energy: {team2_energy}", True, (255, 255, 255))
-        text10 = font.render(f"Speed: {team2_speed}", True, (255, 255, 255))
-        text11 = font.render(f"Ctrl: {team2_control}", True, (255, 255, 255))
-        self.screen.blit(text7, (GAME_SCREEN_W + 10, 220))
-        self.screen.blit(text8, (GAME_SCREEN_W + 10, 250))
-        self.screen.blit(text9, (GAME_SCREEN_W + 10, 280))
-        self.screen.blit(text10, (GAME_SCREEN_W + 10, 310))
-        self.screen.blit(text11, (GAME_SCREEN_W + 10, 340))
-        if team2_control != "Human Control":
-            team2_diff = self.config["settings"]["Team 2"].get("cyborg_difficulty", "N/A")
-            text12 = font.render(f"Diff: {team2_diff}", True, (255, 255, 255))
-            self.screen.blit(text12, (GAME_SCREEN_W + 10, 370))
+        """Выводит панель, если её строки изменились. Возвращает обновлённую область экрана или None."""
+        lines = []
+        for team, ship, top in (("Team 1", self.ship1, 10), ("Team 2", self.ship2, 220)):
+            control = self.config["settings"][team]["control"]
+            crew = ship.crew if ship else 0
+            energy = ship.energy if ship else 0
+            speed = int(math.hypot(ship.vx, ship.vy)) if ship else 0
+            lines.append((f"{team}: {self.config['team_names'][team]}", top))
+            lines.append((f"Crew: {crew}", top + 30))
+            lines.append((f"Energy: {energy}", top + 60))
+            lines.append((f"Speed: {speed}", top + 90))
+            lines.append((f"Ctrl: {control}", top + 120))
+            difficulty = cyborg_difficulty(self.config["settings"][team])
+            if difficulty is not None:
+                lines.append((f"Diff: {difficulty}", top + 150))
+        return self.hud.draw(self.screen, tuple(lines))
+
+    def render_objects(self):
+        return [self.ship1, self.ship2, self.cam] + self.asteroids + self.missiles
+
+    def remember_positions(self):
+        # Положения перед шагом – отрисовка показывает промежуточное состояние между двумя шагами
+        self.previous = {id(obj): (obj, obj.x, obj.y, getattr(obj, "angle", None))
+                         for obj in self.render_objects()}
+
+    def interpolate(self, alpha):
+        """
+        Временно ставит объекты в положение между предыдущим и текущим шагом (с учётом заворота поля).
+        Возвращает сохранённые значения для restore_positions().
+        """
+        saved = []
+        for obj in self.render_objects():
+            prev = self.previous.get(id(obj))
+            if prev is None or prev[0] is not obj:
+                continue  # объект появился на последнем шаге
+            _, px, py, pangle = prev
+            angle = getattr(obj, "angle", None)
+            saved.append((obj, obj.x, obj.y, angle))
+            obj.x = (px + wrap_delta(px, obj.x, FIELD_W) * alpha) % FIELD_W
+            obj.y = (py + wrap_delta(py, obj.y, FIELD_H) * alpha) % FIELD_H
+            if angle is not None and pangle is not None:
+                obj.angle = (pangle + (((angle - pangle + 180) % 360) - 180) * alpha) % 360
+        return saved
+
+    def restore_positions(self, saved):
+        for obj, x, y, angle in saved:
+            obj.x = x
+            obj.y = y
+            if angle is not None:
+                obj.angle = angle
 
     def render(self):
-        from project.stars import draw_star_layer_colored
+        saved = self.interpolate(self.alpha)
+        try:
+            self.draw_frame()
+        finally:
+            self.restore_positions(saved)
+        if self.profile_overlay is not None:
+            self.profile_overlay.draw(self.screen, profiler.PROFILER)
+        with profiler.scope("hud"):
+            hud_rect = self.draw_hud()
+        pygame.display.update([self.game_rect, hud_rect] if hud_rect else [self.game_rect])
+
+    def draw_frame(self):
+        # Игровое поле рисуется только в своей области – панель справа обновляется отдельно
+        self.screen.set_clip(self.game_rect)
         self.screen.fill((0, 0, 0))
-        zoom = 1.0
-        draw_star_layer_colored(self.screen, self.star_layer_far, self.globalCamX, self.globalCamY, 0.3, zoom)
-        draw_star_layer_colored(self.screen, self.star_layer_mid, self.globalCamX, self.globalCamY, 0.6, zoom)
-        draw_star_layer_colored(self.screen, self.star_layer_near, self.globalCamX, self.globalCamY, 0.9, zoom)
-
-        self.planet.draw(self.screen, self.cam, zoom)
-        for asteroid in self.asteroids:
-            asteroid.draw(self.screen, self.cam, zoom)
-        self.ship1.draw(self.screen, self.cam, zoom)
-        self.ship2.draw(self.screen, self.cam, zoom)
-        for projectile in self.missiles:
-            projectile.draw(self.screen, self.cam, zoom)
-        self.draw_hud(zoom)
-        pygame.display.flip()
+        zoom = self.prevZoom + (self.zoom - self.prevZoom) * self.alpha
+        camx = self.prevGlobalCamX + (self.globalCamX - self.prevGlobalCamX) * self.alpha
+        camy = self.prevGlobalCamY + (self.globalCamY - self.prevGlobalCamY) * self.alpha
+        with profiler.scope("starfield"):
+            self.star_layer_far.draw(self.screen, camx, camy, zoom)
+            self.star_layer_mid.draw(self.screen, camx, camy, zoom)
+            self.star_layer_near.draw(self.screen, camx, camy, zoom)
+
+        # Рисуются только объекты, попадающие на экран – стоимость кадра зависит от видимого, а не от всего поля
+        with profiler.scope("draw"):
+            for planet in self.cam.visible([self.planet], zoom):
+                planet.draw(self.screen, self.cam, zoom)
+            for asteroid in self.cam.visible(self.asteroids, zoom):
+                asteroid.draw(self.screen, self.cam, zoom)
+            self.ship1.draw(self.screen, self.cam, zoom)
+            self.ship2.draw(self.screen, self.cam, zoom)
+            for projectile in self.cam.visible(self.missiles, zoom):
+                projectile.draw(self.screen, self.cam, zoom)
+        self.screen.set_clip(None)
 
     def run(self):
         while self.running:
-            dt = self.clock.tick(60) / 1000.0
-            self.handle_input()
-            self.update(dt)
-            self.render()
+            frame_time = self.clock.tick(FRAME_RATE) / 1000.0
+            # Ожидание в clock.tick в "frame" не входит – это работа кадра без простоя
+            with profiler.scope("frame"):
+                with profiler.scope("input"):
+                    self.handle_input()
+                self.advance(frame_time)
+                if self.running:
+                    self.render()
+            profiler.end_frame()
+        self.finish_recording()
         pygame.quit()
+
+    def finish_recording(self):
+        if self.net is not None:
+            if self.net.desync is not None:
+                print(f"Desync with the other player at tick {self.net.desync}")
+            elif self.net.peer_left:
+                print("The other player left the match")
+            elif self.net.timed_out:
+                print("Connection lost")
+            self.net.close()
+            print("Net:", self.net.stats())
+        if self.ai_worker is not None:
+            print("AI worker:", self.ai_worker.summary())
+            self.ai_worker.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.replay is not None:
+            self.replay.finish()
+            mismatch = self.replay.verify(self.sim)
+            if mismatch:
+                print("Replay DIVERGED:", mismatch)
+            elif self.replay.outcome is not None:
+                print("Replay matches the recording.")
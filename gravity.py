@@ -1,26 +1,122 @@
+"""
+Гравитация: N тел против M гравитационных колодцев (планет) за один проход.
+
+Сила притяжения от расстояния не вычисляется по формуле на каждый вызов, а берётся из
+таблицы спада, построенной один раз для выбранной модели (linear или inverse_square),
+с линейной интерполяцией между соседними отсчётами. При большом числе пар тело-колодец
+проход выполняется NumPy над всеми телами сразу, иначе – скалярно; оба пути выполняют
+одни и те же операции в том же порядке, поэтому результат побитно совпадает.
+"""
 import math
-from project.config import GRAVITY_RANGE, GRAVITY_STRENGTH, FIELD_W, FIELD_H, GRAVITY_MODEL
-from project.utils import wrap_delta, wrap_position
+from project.config import (GRAVITY_RANGE, GRAVITY_STRENGTH, GRAVITY_MODEL, GRAVITY_TABLE_SIZE,
+                            FIELD_W, FIELD_H)
+from project.utils import wrap_delta
+from project.torus import wrap_array
 
-def apply_gravity(ship, planet, dt):
-    dx = wrap_delta(ship.x, planet.x, FIELD_W)
-    dy = wrap_delta(ship.y, planet.y, FIELD_H)
-    distance = math.hypot(dx, dy)
-    if distance < GRAVITY_RANGE and distance != 0:
-        nx = dx / distance
-        ny = dy / distance
-        if GRAVITY_MODEL == "inverse_square":
-            # Новый подход: закон обратного квадрата.
-            # Используем epsilon для предотвращения слишком сильного ускорения при малых расстояниях.
-            epsilon = 1.0
-            accel = GRAVITY_STRENGTH / ((distance + epsilon) ** 2)
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен – без него тела обрабатываются по одному
+    np = None
+
+# Ниже этого числа пар (тела x колодцы) накладные расходы NumPy превышают выигрыш.
+# По bench_gravity пути сравниваются около 400 пар (100 x 4), при 200 парах (50 x 4) NumPy
+# вдвое медленнее, поэтому обычный бой (несколько кораблей и снарядов у одной-двух планет) скалярный
+MIN_VECTOR_PAIRS = 512
+
+
+def falloff(model, strength, radius):
+    """Ускорение на расстоянии d для модели гравитации."""
+    if model == "linear":
+        # Старая модель: линейное уменьшение силы с расстоянием
+        return lambda d: strength * (1 - d / radius) * 3
+    if model == "inverse_square":
+        # Закон обратного квадрата; +1 к расстоянию не даёт ускорению расти без предела у центра
+        return lambda d: strength / ((d + 1.0) ** 2)
+    raise ValueError(f"Unknown gravity model '{model}'")
+
+
+class GravityField:
+    """
+    Таблица спада для одной модели и применение её к телам.
+    Тело – любой объект с x, y, vx, vy и in_gravity_field, колодец – любой объект с x, y.
+    """
+    def __init__(self, model=GRAVITY_MODEL, strength=GRAVITY_STRENGTH, radius=GRAVITY_RANGE,
+                 samples=GRAVITY_TABLE_SIZE):
+        self.model = model
+        self.radius = radius
+        self.samples = samples
+        self.scale = samples / radius  # отсчётов таблицы на единицу расстояния
+        accel = falloff(model, strength, radius)
+        # Два лишних отсчёта: d чуть меньше radius после округления может дать индекс samples
+        self.table = [accel(i * radius / samples) for i in range(samples + 2)]
+        self.array = np.array(self.table) if np is not None else None
+
+    def accel(self, distance):
+        u = distance * self.scale
+        i = int(u)
+        f = u - i
+        a = self.table[i]
+        return a + (self.table[i + 1] - a) * f
+
+    def apply(self, bodies, wells, dt):
+        """
+        Добавляет к скоростям тел притяжение всех колодцев. Телам внутри радиуса
+        хотя бы одного колодца ставится in_gravity_field = True (сбрасывает флаг вызывающий код).
+        """
+        if not bodies or not wells:
+            return
+        if np is None or len(bodies) * len(wells) < MIN_VECTOR_PAIRS:
+            self.apply_scalar(bodies, wells, dt)
         else:
-            # Старая модель: линейное уменьшение силы с расстоянием.
-            factor = (1 - distance / GRAVITY_RANGE)
-            accel = GRAVITY_STRENGTH * factor * 3
-        ship.vx += nx * accel * dt
-        ship.vy += ny * accel * dt
-        # --- Изменено: устанавливаем флаг гравитационного манёвра,
-        # что позволяет кораблю превышать max_thrust в этом кадре ---
-        ship.in_gravity_field = True
-        # --- Конец изменений ---
+            self.apply_vector(bodies, wells, dt)
+
+    def apply_scalar(self, bodies, wells, dt):
+        radius = self.radius
+        for body in bodies:
+            for well in wells:
+                dx = wrap_delta(body.x, well.x, FIELD_W)
+                dy = wrap_delta(body.y, well.y, FIELD_H)
+                distance = math.sqrt(dx * dx + dy * dy)
+                if distance < radius and distance != 0:
+                    a = self.accel(distance)
+                    body.vx += dx / distance * a * dt
+                    body.vy += dy / distance * a * dt
+                    # Флаг гравитационного манёвра позволяет кораблю превышать max_thrust в этом кадре
+                    body.in_gravity_field = True
+
+    def apply_vector(self, bodies, wells, dt):
+        x = np.array([body.x for body in bodies], dtype=float)
+        y = np.array([body.y for body in bodies], dtype=float)
+        vx = np.array([body.vx for body in bodies], dtype=float)
+        vy = np.array([body.vy for body in bodies], dtype=float)
+        touched = np.zeros(len(bodies), dtype=bool)
+        table = self.array
+        # Колодцы по очереди, как в скалярном пути: порядок сложения вкладов тот же
+        for well in wells:
+            dx = wrap_array(well.x - x, FIELD_W)
+            dy = wrap_array(well.y - y, FIELD_H)
+            distance = np.sqrt(dx * dx + dy * dy)
+            inside = (distance < self.radius) & (distance != 0)
+            if not inside.any():
+                continue
+            distance = np.where(inside, distance, 1.0)
+            u = distance * self.scale
+            i = np.minimum(u.astype(np.intp), self.samples)
+            f = u - i
+            a = table[i] + (table[i + 1] - table[i]) * f
+            vx = np.where(inside, vx + dx / distance * a * dt, vx)
+            vy = np.where(inside, vy + dy / distance * a * dt, vy)
+            touched |= inside
+        for body, new_vx, new_vy, hit in zip(bodies, vx.tolist(), vy.tolist(), touched.tolist()):
+            if hit:
+                body.vx = new_vx
+                body.vy = new_vy
+                body.in_gravity_field = True
+
+
+FIELD = GravityField()
+
+
+def apply_gravity(ship, planet, dt):
+    """Притяжение одного тела к одной планете (совместимость со старым вызовом)."""
+    FIELD.apply_scalar([ship], [planet], dt)
@@ -0,0 +1,93 @@
+import time
+import pygame
+
+TEXT_COLOR = (255, 255, 255)
+PANEL_COLOR = (50, 50, 50)
+# Не больше стольких отрисованных строк в кэше – значения скорости и энергии со временем повторяются
+MAX_CACHED_TEXTS = 512
+
+
+class Hud:
+    """
+    Панель характеристик справа от игрового поля.
+    Шрифт создаётся один раз, отрисованные строки кэшируются по тексту, а сама панель
+    перерисовывается и выводится на экран только когда меняется хотя бы одна строка.
+    Время работы draw() за последний кадр и в среднем – в frame_time и average_time (секунды).
+    """
+    def __init__(self, rect, font_name="Arial", font_size=24, padding=10):
+        self.rect = pygame.Rect(rect)
+        self.padding = padding
+        self.font = pygame.font.SysFont(font_name, font_size)
+        self.panel = pygame.Surface(self.rect.size)
+        self.texts = {}
+        self.lines = None
+        self.frames = 0
+        self.redraws = 0
+        self.frame_time = 0.0
+        self.total_time = 0.0
+
+    def text(self, string):
+        surface = self.texts.get(string)
+        if surface is None:
+            if len(self.texts) >= MAX_CACHED_TEXTS:
+                del self.texts[next(iter(self.texts))]  # самая старая строка
+            surface = self.texts[string] = self.font.render(string, True, TEXT_COLOR)
+        return surface
+
+    def invalidate(self):
+        """Панель на экране была затёрта (меню, экран выбора) – при следующем draw() она выводится заново."""
+        self.lines = None
+
+    def draw(self, screen, lines):
+        """
+        lines – кортеж пар (текст, y). Выводит панель на экран, если строки изменились с прошлого кадра.
+        Возвращает прямоугольник обновлённой области экрана или None.
+        """
+        start = time.perf_counter()
+        updated = None
+        if lines != self.lines:
+            self.lines = lines
+            self.panel.fill(PANEL_COLOR)
+            for string, y in lines:
+                self.panel.blit(self.text(string), (self.padding, y))
+            screen.blit(self.panel, self.rect)
+            self.redraws += 1
+            updated = self.rect
+        self.frame_time = time.perf_counter() - start
+        self.total_time += self.frame_time
+        self.frames += 1
+        return updated
+
+    @property
+    def average_time(self):
+        return self.total_time / self.frames if self.frames else 0.0
+
+
+class ProfilerOverlay:
+    """
+    Таблица перцентилей профилировщика поверх игрового поля (F3).
+    Строки перерисовываются раз в refresh кадров – текст, меняющийся каждый кадр, не читается и стоит дорого.
+    """
+    def __init__(self, pos=(10, 10), font_name="Consolas", font_size=16, refresh=30):
+        self.pos = pos
+        self.font = pygame.font.SysFont(font_name, font_size)
+        self.refresh = refresh
+        self.surface = None
+        self.frames = 0
+
+    def build(self, rows):
+        lines = [f"{'scope':<22}{'p50':>7}{'p95':>7}{'p99':>7}  ms"]
+        lines += [f"{name:<22}{p50:>7.2f}{p95:>7.2f}{p99:>7.2f}" for name, p50, p95, p99, _, _ in rows]
+        texts = [self.font.render(line, True, TEXT_COLOR) for line in lines]
+        height = self.font.get_linesize()
+        surface = pygame.Surface((max(t.get_width() for t in texts) + 8, height * len(texts) + 8), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 160))
+        for i, text in enumerate(texts):
+            surface.blit(text, (4, 4 + i * height))
+        return surface
+
+    def draw(self, screen, profiler):
+        if self.surface is None or self.frames % self.refresh == 0:
+            self.surface = self.build(profiler.stats())
+        self.frames += 1
+        screen.blit(self.surface, self.pos)
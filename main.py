@@ -1,15 +1,95 @@
+import argparse
+import sys
 import pygame
 from menu import SuperMeleeMenu
 from game import Game
-from project.config import SCREEN_W, SCREEN_H
+from project.config import (SCREEN_W, SCREEN_H, PROFILER_ENABLED, PROFILER_DUMP_FILE, NET_PORT, NET_INPUT_DELAY,
+                            NET_ROLLBACK_DELAY, NET_ROLLBACK_WINDOW)
+from project import profiler
 
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Super Melee")
+    parser.add_argument("--record", metavar="FILE",
+                        help="записывать матчи в FILE (следующие матчи – FILE-2, FILE-3, ...)")
+    parser.add_argument("--replay", metavar="FILE", help="воспроизвести записанный матч")
+    parser.add_argument("--speed", type=float, default=1.0, help="скорость воспроизведения (1.0 – реальное время)")
+    parser.add_argument("--headless", action="store_true",
+                        help="воспроизвести без отрисовки с максимальной скоростью и сверить итог")
+    parser.add_argument("--profile", nargs="?", const="", metavar="FILE",
+                        help="замерять подсистемы кадра (F3 – таблица); с FILE (.csv или .json) периодически писать статистику")
+    parser.add_argument("--host", nargs="?", const=NET_PORT, type=int, metavar="PORT",
+                        help="сетевая игра: выбрать флоты в меню и ждать второго игрока на PORT")
+    parser.add_argument("--join", metavar="HOST[:PORT]", help="сетевая игра: подключиться к хосту")
+    parser.add_argument("--input-delay", type=int,
+                        help=f"сетевая игра: через сколько шагов применяется управление (задаёт хост, "
+                             f"по умолчанию {NET_INPUT_DELAY}, с откатом {NET_ROLLBACK_DELAY})")
+    parser.add_argument("--rollback", nargs="?", type=int, const=NET_ROLLBACK_WINDOW, metavar="WINDOW",
+                        help="сетевая игра с откатом: предсказывать управление партнёра не дальше WINDOW шагов")
+    return parser.parse_args(argv)
+
+
+def record_path(base, match_number):
+    if base is None or match_number == 1:
+        return base
+    stem, dot, ext = base.rpartition(".")
+    if not dot:
+        return f"{base}-{match_number}"
+    return f"{stem}-{match_number}.{ext}"
+
+
+def replay(args):
+    from project.replay import ReplayReader, main as replay_main
+    if args.headless:
+        return replay_main([args.replay])
+    pygame.init()
+    game = Game(replay=ReplayReader(args.replay), speed=args.speed)
+    game.run()
+    return 0
+
+
+def netplay(args):
+    """Один сетевой матч: хост выбирает флоты в меню, второй игрок получает их при подключении."""
+    from project import netplay as net
+    pygame.init()
+    try:
+        if args.join:
+            print(f"Connecting to {args.join}...")
+            session = net.join(net.parse_address(args.join))
+        else:
+            screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
+            config = SuperMeleeMenu(screen, pygame.time.Clock()).display()
+            if config is None:
+                return 0
+            input_delay = args.input_delay
+            if input_delay is None:
+                input_delay = NET_ROLLBACK_DELAY if args.rollback else NET_INPUT_DELAY
+            start = net.match_start(config, input_delay=input_delay, rollback_window=args.rollback)
+            print(f"Waiting for a player on port {args.host}...")
+            session = net.host(args.host, start)
+    except (net.NetError, OSError) as e:
+        print("Network error:", e)
+        return 1
+    game = Game(net=session, record=record_path(args.record, 1))
+    game.run()
+    return 0
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.profile is not None or PROFILER_ENABLED:
+        profiler.enable(dump_path=args.profile or PROFILER_DUMP_FILE)
+    if args.replay:
+        return replay(args)
+    if args.host is not None or args.join:
+        return netplay(args)
+
     pygame.init()
     screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
     clock = pygame.time.Clock()
 
     running = True
+    match_number = 0
     while running:
         # Создаем и ждем меню
         menu = SuperMeleeMenu(screen, clock)
@@ -20,7 +100,8 @@ def main():
         print("Loaded config:", config)
 
         # Запускаем игру
-        game = Game(config)
+        match_number += 1
+        game = Game(config, record=record_path(args.record, match_number))
         game.run()  # Важно: внутри game.run() не должно быть pygame.quit()
 
         # Переинициализируем дисплей и шрифты
@@ -37,4 +118,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
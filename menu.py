@@ -1,9 +1,10 @@
 import pygame
 import sys
-import json
 import random
 from project.ships.registry import SHIP_CLASSES
-from project.config import SCREEN_W, SCREEN_H, PANEL_WIDTH, GAME_SCREEN_W
+from project.ships.metadata import SHIP_INFO, fleet_cost
+from project.config import SCREEN_W, SCREEN_H, PANEL_WIDTH, GAME_SCREEN_W, MENU_REDRAW_MODE, SAVES_JOURNAL
+from project.profiles import ProfileStore
 
 # Цвета
 WHITE = (255, 255, 255)
@@ -17,13 +18,68 @@ CONTROL_OPTIONS = ["Human Control", "Weak Cyborg", "Good Cyborg", "Awesome Cybor
 
 LEFT_PANEL_COLS = 7
 
-# CACHING ADDED: глобальная переменная для кэширования загруженной конфигурации
-_CACHED_CONFIG = None
+# Хранилище профилей общее для всех меню: файл сохранений читается один раз за запуск
+_PROFILE_STORE = None
+
+# События, после которых окно нужно вывести целиком (его перекрывали другие окна)
+EXPOSE_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED)
+
+
+def profile_store():
+    global _PROFILE_STORE
+    if _PROFILE_STORE is None:
+        _PROFILE_STORE = ProfileStore(SAVES_FILE, journal=SAVES_JOURNAL)
+    return _PROFILE_STORE
+
+
+class ScreenUpdater:
+    """
+    Вывод кадров меню на экран.
+    Режим "events": цикл меню спит в ожидании ввода, а после перерисовки на экран выводятся
+    только виджеты, чей вид изменился (pygame.display.update(rects)).
+    Режим "continuous": прежнее поведение – опрос ввода и полный flip() каждый кадр.
+    Виджет – прямоугольник экрана и значения, от которых зависит его вид (текст, выделение).
+    """
+    def __init__(self, mode=MENU_REDRAW_MODE):
+        self.event_driven = mode == "events"
+        self.screen_name = None
+        self.previous = {}
+        self.current = {}
+
+    def widget(self, rect, *state):
+        self.current[tuple(rect)] = state
+
+    def invalidate(self):
+        """Экран был затёрт (другое окно, вложенный диалог) – следующий кадр выводится целиком."""
+        self.screen_name = None
+
+    def present(self, screen_name):
+        """Выводит нарисованный кадр экрана screen_name."""
+        widgets, self.current = self.current, {}
+        if not self.event_driven or screen_name != self.screen_name:
+            pygame.display.flip()
+        else:
+            changed = [rect for rect, state in widgets.items() if self.previous.get(rect) != state]
+            changed += [rect for rect in self.previous if rect not in widgets]
+            if changed:
+                pygame.display.update([pygame.Rect(rect) for rect in changed])
+        self.screen_name = screen_name
+        self.previous = widgets
+
+    def events(self):
+        """События ввода. В режиме "events" ждёт первого события, не занимая процессор."""
+        events = pygame.event.get()
+        if self.event_driven and not events:
+            events = [pygame.event.wait()] + pygame.event.get()
+        if any(event.type in EXPOSE_EVENTS for event in events):
+            self.invalidate()
+        return events
 
 class SuperMeleeMenu:
-    def __init__(self, screen, clock):
+    def __init__(self, screen, clock, redraw_mode=MENU_REDRAW_MODE):
         self.screen = screen
         self.clock = clock
+        self.updater = ScreenUpdater(redraw_mode)
 
         self.font_title = pygame.font.SysFont("Arial", 48)
         self.font_menu = pygame.font.SysFont("Arial", 36)
@@ -71,30 +127,18 @@ class SuperMeleeMenu:
 
         self.confirm_team1 = False
         self.confirm_team2 = False
-
-        # CACHING ADDED: Используем глобальный кэш конфигурации, чтобы минимизировать чтение файла
-        global _CACHED_CONFIG
-        if _CACHED_CONFIG is not None:
-            # Если конфигурация уже загружена ранее – используем её
-            self.last_config = _CACHED_CONFIG
-            self.teams = _CACHED_CONFIG.get("teams", self.teams)
-            self.team_names = _CACHED_CONFIG.get("team_names", self.team_names)
-            self.settings = _CACHED_CONFIG.get("settings", self.settings)
-        else:
-            try:
-                with open(SAVES_FILE, "r") as f:
-                    saves = json.load(f)
-                if saves and "last_config" in saves:
-                    config = saves["last_config"]
-                    self.teams = config.get("teams", self.teams)
-                    self.team_names = config.get("team_names", self.team_names)
-                    self.settings = config.get("settings", self.settings)
-                    if "mode" not in config:
-                        config["mode"] = f"{self.settings['Team 1']['control']} vs {self.settings['Team 2']['control']}"
-                    self.last_config = config
-                    _CACHED_CONFIG = config  # Сохраняем в кэш
-            except Exception as e:
-                pass
+        # Очки команд: {команда: (флот, сумма)} – пересчитываются, только когда флот изменился
+        self.points_cache = {}
+
+        self.store = profile_store()
+        config = self.store.last_config()
+        if config:
+            self.teams = config.get("teams", self.teams)
+            self.team_names = config.get("team_names", self.team_names)
+            self.settings = config.get("settings", self.settings)
+            if "mode" not in config:
+                config["mode"] = f"{self.settings['Team 1']['control']} vs {self.settings['Team 2']['control']}"
+            self.last_config = config
 
         self.normalize_teams()
 
@@ -131,6 +175,9 @@ class SuperMeleeMenu:
 
     def draw_team_panel(self, team, area):
         name = self.team_names.get(team, team)
+        header_selected = self.selected_right == -1 and self.selected_team == team and self.selected_slot == -1
+        self.updater.widget((area.x + 2, area.y + 2, area.width - 4, 52), name, header_selected,
+                            header_selected and self.editing_team, self.editing_team_name)
         if self.selected_right == -1 and self.selected_team == team and self.selected_slot == -1 and self.editing_team:
             edit_text = self.font_menu.render(self.editing_team_name, True, YELLOW)
             self.screen.blit(edit_text, (area.x + 10, area.y + 10))
@@ -146,7 +193,6 @@ class SuperMeleeMenu:
         slot_width = (area.width - 20 - (cols - 1) * slot_margin) // cols
         slot_height = 40
         start_y = area.y + 60
-        points = 0
         for idx in range(self.team_slots):
             row = idx // cols
             col = idx % cols
@@ -155,19 +201,24 @@ class SuperMeleeMenu:
             slot_rect = pygame.Rect(slot_x, slot_y, slot_width, slot_height)
             pygame.draw.rect(self.screen, GRAY, slot_rect, 1)
             ship_name = self.teams[team][idx] if self.teams[team][idx] is not None else "---"
-            if self.selected_right == -1 and self.selected_team == team and self.selected_slot == idx:
+            slot_selected = self.selected_right == -1 and self.selected_team == team and self.selected_slot == idx
+            self.updater.widget(slot_rect, ship_name, slot_selected)
+            if slot_selected:
                 pygame.draw.rect(self.screen, YELLOW, slot_rect, 2)
             slot_text = self.font_small.render(ship_name, True, WHITE)
             self.screen.blit(slot_text, (slot_rect.x + 5, slot_rect.y + 10))
-            if ship_name != "---" and ship_name in SHIP_CLASSES:
-                try:
-                    dummy = SHIP_CLASSES[ship_name](0, 0, WHITE)
-                    points += getattr(dummy, "cost", 0)
-                except:
-                    pass
+        points = self.team_points(team)
+        self.updater.widget((area.x + 10, area.bottom - 30, area.width - 20, 28), points)
         points_text = self.font_small.render(f"Points: {points}", True, WHITE)
         self.screen.blit(points_text, (area.x + 10, area.bottom - 30))
 
+    def team_points(self, team):
+        fleet = tuple(self.teams[team])
+        cached = self.points_cache.get(team)
+        if cached is None or cached[0] != fleet:
+            cached = self.points_cache[team] = (fleet, fleet_cost(fleet))
+        return cached[1]
+
     def draw_right_panel(self, area):
         current_y = 20
         for idx, (team_option, action) in enumerate(self.right_options):
@@ -190,10 +241,10 @@ class SuperMeleeMenu:
                         battle_text = "Team name"
                     else:
                         ship_name = self.teams[self.selected_team][self.selected_slot]
-                        if ship_name and ship_name in SHIP_CLASSES:
-                            dummy = SHIP_CLASSES[ship_name](0, 0, WHITE)
-                            battle_text = (f"{dummy.name} C:{dummy.crew}/{dummy.max_crew} "
-                                           f"E:{dummy.energy}/{dummy.max_energy} ${dummy.cost}")
+                        if ship_name and ship_name in SHIP_INFO:
+                            info = SHIP_INFO[ship_name]
+                            battle_text = (f"{info.name} C:{info.crew}/{info.max_crew} "
+                                           f"E:{info.energy}/{info.max_energy} ${info.cost}")
                         else:
                             battle_text = "Empty slot"
                 else:
@@ -208,6 +259,7 @@ class SuperMeleeMenu:
                 battle_text = "Quit"
             else:
                 battle_text = ""
+            self.updater.widget(rect, battle_text, self.selected_right == idx)
             if team_option == "Battle" or action == "quit":
                 txt_surf = self.font_small.render(battle_text, True, WHITE)
             elif action == "control":
@@ -227,6 +279,7 @@ class SuperMeleeMenu:
         list_y = 100
         for i, ship in enumerate(self.ship_list):
             color = YELLOW if i == self.selected_ship_index else GRAY
+            self.updater.widget((list_x, list_y + i * 40, SCREEN_W - list_x, 40), ship, color)
             ship_text = self.font_menu.render(ship, True, color)
             self.screen.blit(ship_text, (list_x, list_y + i * 40))
 
@@ -260,6 +313,7 @@ class SuperMeleeMenu:
                 text = "?"
             else:
                 text = "X"
+            self.updater.widget(cell_rect, text, idx == sel1)
             txt_surf = self.font_small.render(str(text), True, WHITE)
             self.screen.blit(txt_surf, (cell_rect.x + 5, cell_rect.y + 10))
         # Таблица для Team 2
@@ -279,12 +333,14 @@ class SuperMeleeMenu:
                 text = "?"
             else:
                 text = "X"
+            self.updater.widget(cell_rect, text, idx == sel2)
             txt_surf = self.font_small.render(str(text), True, WHITE)
             self.screen.blit(txt_surf, (cell_rect.x + 5, cell_rect.y + 10))
         if active_team == "Team 1":
             instr = "Team1: Use E(up), D(down), S(left), F(right), A(confirm)"
         else:
             instr = "Team2: Use Arrow keys, RCTRL(confirm)"
+        self.updater.widget((0, SCREEN_H - 30, SCREEN_W, 30), instr)
         instr_surf = self.font_small.render(instr, True, WHITE)
         self.screen.blit(instr_surf, (10, SCREEN_H - 30))
 
@@ -304,7 +360,9 @@ class SuperMeleeMenu:
             confirmed["Team 2"] = True
 
         while not (confirmed["Team 1"] and confirmed["Team 2"]):
-            for event in pygame.event.get():
+            self.draw_battle_select(battle_sel["Team 1"], battle_sel["Team 2"], active_team)
+            self.updater.present("battle_select")
+            for event in self.updater.events():
                 if event.type == pygame.QUIT:
                     pygame.quit(); sys.exit()
                 elif event.type == pygame.KEYDOWN:
@@ -342,8 +400,6 @@ class SuperMeleeMenu:
                             confirmed["Team 2"] = True
                     if event.key == pygame.K_TAB:
                         active_team = "Team 2" if active_team == "Team 1" else "Team 1"
-            self.draw_battle_select(battle_sel["Team 1"], battle_sel["Team 2"], active_team)
-            pygame.display.flip()
             self.clock.tick(30)
 
         sel1 = battle_sel["Team 1"]
@@ -385,7 +441,7 @@ class SuperMeleeMenu:
         }
 
     def handle_main_events(self):
-        for event in pygame.event.get():
+        for event in self.updater.events():
             if event.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
             elif event.type == pygame.KEYDOWN:
@@ -501,23 +557,11 @@ class SuperMeleeMenu:
             "team_names": self.team_names,
             "settings": self.settings
         }
-        global _CACHED_CONFIG  # CACHING ADDED: обновляем кэш
-        try:
-            with open(SAVES_FILE, "r") as f:
-                saves = json.load(f)
-        except Exception as e:
-            saves = {}
-        saves["last_config"] = config
-        _CACHED_CONFIG = config  # Обновляем кэш
-        try:
-            with open(SAVES_FILE, "w") as f:
-                json.dump(saves, f)
-            print("Last configuration saved.")
-        except Exception as e:
-            print("Error saving last configuration:", e)
+        self.store.set_last_config(config)
+        print("Last configuration saved.")
 
     def handle_ship_select_events(self):
-        for event in pygame.event.get():
+        for event in self.updater.events():
             if event.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
             elif event.type == pygame.KEYDOWN:
@@ -538,6 +582,7 @@ class SuperMeleeMenu:
         pass
 
     def universal_save(self, team):
+        self.updater.invalidate()  # диалоги рисуются поверх главного меню
         option = self.choose_save_option()
         if option is None:
             return
@@ -553,38 +598,20 @@ class SuperMeleeMenu:
             "fleet": self.teams[team],
             "team_name": self.team_names[team]
         }
-        try:
-            with open(SAVES_FILE, "r") as f:
-                saves = json.load(f)
-        except Exception as e:
-            print("Read error:", e)
-            saves = {}
-        profiles = saves.get("profiles", {})
-        profiles[name] = config
-        saves["profiles"] = profiles
-        try:
-            with open(SAVES_FILE, "w") as f:
-                json.dump(saves, f)
-            print(f"Profile '{name}' saved.")
-        except Exception as e:
-            print("Write error:", e)
+        self.store.put(name, config)
+        print(f"Profile '{name}' saved.")
 
     def universal_load(self, team):
+        self.updater.invalidate()
         profile_name = self.choose_profile()
         if not profile_name:
             return
-        try:
-            with open(SAVES_FILE, "r") as f:
-                saves = json.load(f)
-            profiles = saves.get("profiles", {})
-            if profile_name in profiles:
-                config = profiles[profile_name]
-                self.teams[team] = config.get("fleet", self.teams[team])
-                self.team_names[team] = config.get("team_name", self.team_names[team])
-                self.normalize_teams()
-                print(f"Profile '{profile_name}' loaded into {team}.")
-        except Exception as e:
-            print(e)
+        config = self.store.get(profile_name)
+        if config is not None:
+            self.teams[team] = config.get("fleet", self.teams[team])
+            self.team_names[team] = config.get("team_name", self.team_names[team])
+            self.normalize_teams()
+            print(f"Profile '{profile_name}' loaded into {team}.")
 
     def prompt_for_save_name(self, prompt_msg):
         save_name = ""
@@ -594,7 +621,7 @@ class SuperMeleeMenu:
             text = self.font_menu.render(prompt_msg + save_name, True, WHITE)
             self.screen.blit(text, (50, SCREEN_H // 2))
             pygame.display.flip()
-            for event in pygame.event.get():
+            for event in self.updater.events():
                 if event.type == pygame.QUIT:
                     pygame.quit(); sys.exit()
                 elif event.type == pygame.KEYDOWN:
@@ -618,7 +645,7 @@ class SuperMeleeMenu:
             prompt = self.font_menu.render(f"Profile '{profile_name}' exists. Overwrite? (Y/N)", True, WHITE)
             self.screen.blit(prompt, (50, SCREEN_H // 2))
             pygame.display.flip()
-            for event in pygame.event.get():
+            for event in self.updater.events():
                 if event.type == pygame.QUIT:
                     pygame.quit(); sys.exit()
                 elif event.type == pygame.KEYDOWN:
@@ -639,7 +666,7 @@ class SuperMeleeMenu:
             prompt = self.font_menu.render(f"Delete profile '{profile_name}'? (Y/N)", True, WHITE)
             self.screen.blit(prompt, (50, SCREEN_H // 2))
             pygame.display.flip()
-            for event in pygame.event.get():
+            for event in self.updater.events():
                 if event.type == pygame.QUIT:
                     pygame.quit(); sys.exit()
                 elif event.type == pygame.KEYDOWN:
@@ -653,29 +680,11 @@ class SuperMeleeMenu:
         return confirm
 
     def delete_profile(self, profile_name):
-        try:
-            with open(SAVES_FILE, "r") as f:
-                saves = json.load(f)
-            profiles = saves.get("profiles", {})
-            if profile_name in profiles:
-                del profiles[profile_name]
-                saves["profiles"] = profiles
-                with open(SAVES_FILE, "w") as f:
-                    json.dump(saves, f)
-                print(f"Profile '{profile_name}' deleted.")
-        except Exception as e:
-            print("Error deleting profile:", e)
+        if self.store.delete(profile_name):
+            print(f"Profile '{profile_name}' deleted.")
 
     def choose_save_option(self):
-        try:
-            with open(SAVES_FILE, "r") as f:
-                saves = json.load(f)
-            profiles = saves.get("profiles", {})
-            keys = list(profiles.keys())
-            keys.sort()
-            keys.append("New Save")
-        except Exception as e:
-            keys = ["New Save"]
+        keys = self.store.names() + ["New Save"]
         selected_index = 0
         waiting = True
         while waiting:
@@ -687,7 +696,7 @@ class SuperMeleeMenu:
                 text = self.font_small.render(key, True, color)
                 self.screen.blit(text, (50, 150 + i * 40))
             pygame.display.flip()
-            for event in pygame.event.get():
+            for event in self.updater.events():
                 if event.type == pygame.QUIT:
                     pygame.quit(); sys.exit()
                 elif event.type == pygame.KEYDOWN:
@@ -704,16 +713,8 @@ class SuperMeleeMenu:
             self.clock.tick(30)
 
     def choose_profile(self):
-        try:
-            with open(SAVES_FILE, "r") as f:
-                saves = json.load(f)
-            profiles = saves.get("profiles", {})
-            keys = list(profiles.keys())
-            if not keys:
-                return None
-            keys.sort()
-        except Exception as e:
-            print(e)
+        keys = self.store.names()
+        if not keys:
             return None
         selected_index = 0
         waiting = True
@@ -726,7 +727,7 @@ class SuperMeleeMenu:
                 text = self.font_small.render(key, True, color)
                 self.screen.blit(text, (50, 150 + i * 40))
             pygame.display.flip()
-            for event in pygame.event.get():
+            for event in self.updater.events():
                 if event.type == pygame.QUIT:
                     pygame.quit(); sys.exit()
                 elif event.type == pygame.KEYDOWN:
@@ -738,20 +739,11 @@ class SuperMeleeMenu:
                         profile_to_delete = keys[selected_index]
                         if self.prompt_confirm_delete(profile_to_delete):
                             self.delete_profile(profile_to_delete)
-                            try:
-                                with open(SAVES_FILE, "r") as f:
-                                    saves = json.load(f)
-                                profiles = saves.get("profiles", {})
-                                keys = list(profiles.keys())
-                                keys.sort()
-                                if not keys:
-                                    waiting = False
-                                    return None
-                                selected_index = 0
-                            except Exception as e:
-                                print(e)
+                            keys = self.store.names()
+                            if not keys:
                                 waiting = False
                                 return None
+                            selected_index = 0
                     elif event.key == pygame.K_RETURN:
                         waiting = False
                         return keys[selected_index]
@@ -762,12 +754,15 @@ class SuperMeleeMenu:
 
     def display_loop(self):
         while True:
+            # Кадр выводится до обработки ввода: в режиме "events" меню ждёт ввода с готовым экраном
             if self.state == "main_menu":
-                self.handle_main_events()
                 self.draw_main_menu()
+                self.updater.present("main_menu")
+                self.handle_main_events()
             elif self.state == "ship_select":
-                self.handle_ship_select_events()
                 self.draw_ship_select()
+                self.updater.present("ship_select")
+                self.handle_ship_select_events()
             elif self.state == "team_name_edit":
                 pass
             elif self.state == "battle_select":
@@ -782,7 +777,6 @@ class SuperMeleeMenu:
                 }
                 self.save_last_config()
                 return config
-            pygame.display.flip()
             self.clock.tick(30)
 
     def display(self):
@@ -790,9 +784,10 @@ class SuperMeleeMenu:
 
 
 class PauseMenu:
-    def __init__(self, screen, clock):
+    def __init__(self, screen, clock, redraw_mode=MENU_REDRAW_MODE):
         self.screen = screen
         self.clock = clock
+        self.updater = ScreenUpdater(redraw_mode)
         self.font_title = pygame.font.SysFont("Arial",48)
         self.font_menu = pygame.font.SysFont("Arial",36)
         self.font_small = pygame.font.SysFont("Arial",24)
@@ -813,14 +808,15 @@ class PauseMenu:
             start_y = 100
             for idx, option in enumerate(self.options):
                 rect = pygame.Rect(right_rect.x+10, start_y+idx*(option_height+spacing), right_rect.width-20, option_height)
+                self.updater.widget(rect, option, idx == self.selected)
                 if idx == self.selected:
                     pygame.draw.rect(self.screen, YELLOW, rect, 2)
                 else:
                     pygame.draw.rect(self.screen, GRAY, rect, 1)
                 text_surface = self.font_menu.render(option, True, WHITE)
                 self.screen.blit(text_surface, (rect.x+5, rect.y+10))
-            pygame.display.flip()
-            for event in pygame.event.get():
+            self.updater.present("pause")
+            for event in self.updater.events():
                 if event.type == pygame.QUIT:
                     pygame.quit(); sys.exit()
                 elif event.type == pygame.KEYDOWN:
@@ -839,7 +835,7 @@ def fast_load_menu(screen, clock):
     """
     Быстрый переход в главное меню после завершения битвы:
     создаёт новый экземпляр SuperMeleeMenu, сбрасывает его состояние и немедленно генерирует конфигурацию главного меню.
-    При этом кэширование конфигурации применяется для минимизации операций с файлами.
+    Последняя конфигурация берётся из хранилища профилей в памяти, файл сохранений повторно не читается.
     """
     menu = SuperMeleeMenu(screen, clock)
     menu.reset()  # Сброс состояния меню в "main_menu"
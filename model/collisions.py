@@ -40,8 +40,6 @@ def handle_planet_collision(ship, planet, game_time):
         # --- Конец изменений ---
 
         # Обеспечиваем, чтобы урон наносился не чаще, чем раз в 0.5 секунды
-        if not hasattr(ship, "last_planet_collision"):
-            ship.last_planet_collision = 0
         if game_time - ship.last_planet_collision > 0.5:
             ship.take_damage(1)
             ship.last_planet_collision = game_time
@@ -0,0 +1,621 @@
+"""
+Сетевая игра двух человек по UDP в режиме lockstep.
+
+Каждый из двух узлов считает весь матч сам, по сети передаются только биты управления
+(те же, что в записи матча, см. replay.encode_controls). Управление, нажатое на шаге t,
+применяется на шаге t + input_delay, поэтому при задержке сети меньше input_delay шагов
+игра не ждёт. Шаг выполняется, только когда известно управление обоих игроков.
+
+Пакет (little-endian): magic b"LS", версия (u8), тип (u8), затем для INPUTS –
+    ack (u16) – первый шаг партнёра, которого у нас ещё нет (младшие 16 бит номера шага);
+    first (u16) и число серий (u8), серии (повтор u8, биты u8) – наше управление начиная с first;
+    контрольная сумма состояния: шаг (u16) и CRC32 (u32).
+Пакет повторяет всё управление, которое партнёр ещё не подтвердил, поэтому потерянный
+пакет восполняется следующим. Пакеты уходят раз в send_interval шагов (при ожидании партнёра –
+раз в то же время), так что поток – несколько сотен байт в секунду. Номера шагов передаются
+младшими 16 битами и восстанавливаются относительно текущего шага.
+Контрольная сумма состояния считается после каждого шага; совпадение с партнёром
+проверяется для шагов, суммы которых пришли в пакетах, – расхождение означает рассинхронизацию.
+
+С откатом (RollbackSession, как в GGPO) шаг не ждёт партнёра: его управление предсказывается
+повтором последних удерживаемых клавиш, а когда настоящее управление расходится с предсказанием,
+мир загружается из состояния перед этим шагом (snapshot.load_state) и шаги пересчитываются
+в том же кадре. Задержка ввода при этом небольшая (NET_ROLLBACK_DELAY), предсказание уходит
+вперёд не больше чем на NET_ROLLBACK_WINDOW шагов. Контрольные суммы считаются только
+для подтверждённых шагов.
+
+Проверка на одной машине – два процесса и ретранслятор с потерями и задержкой:
+    python -m project.netplay relay 47001 127.0.0.1:47000 --loss 0.2 --latency 0.06 --jitter 0.02
+    python -m project.netplay host 47000 --ticks 1800
+    python -m project.netplay join 127.0.0.1:47001 --ticks 1800
+С откатом – host с --rollback.
+"""
+import argparse
+import heapq
+import json
+import random
+import select
+import socket
+import struct
+import sys
+import time
+import zlib
+from array import array
+from project.config import (TICK_RATE, NET_PORT, NET_INPUT_DELAY, NET_SEND_INTERVAL, NET_TIMEOUT,
+                            NET_ROLLBACK_DELAY, NET_ROLLBACK_WINDOW)
+from project.replay import (encode_controls, decode_controls, state_hash, TURN_LEFT, TURN_RIGHT, THRUST,
+                            HOLD_PRIMARY)
+from project.snapshot import save_state, load_state
+from project.ships import SHIP_CLASSES
+from project.simulation import Simulation, ShipControls, TEAMS
+
+MAGIC = b"LS"
+VERSION = 1
+HELLO = 1
+START = 2
+INPUTS = 3
+BYE = 4
+HEADER = struct.Struct("<2sBB")
+INPUTS_HEADER = struct.Struct("<HHB")
+RUN = struct.Struct("<BB")
+CHECKSUM = struct.Struct("<HI")
+MAX_PACKET = 1400
+# Больше стольких неподтверждённых шагов в пакет не кладётся
+MAX_REDUNDANCY = 240
+# Сколько последних контрольных сумм своих шагов хранится для сравнения
+CHECKSUM_HISTORY = 600
+HELLO_INTERVAL = 0.25
+LINGER = 1.0
+# Предсказание управления партнёра: удерживаемые клавиши повторяются, нажатия – нет
+HELD_BITS = TURN_LEFT | TURN_RIGHT | THRUST | HOLD_PRIMARY
+
+
+class NetError(Exception):
+    pass
+
+
+def unwrap(tick16, near):
+    """Полный номер шага по младшим 16 битам – ближайший к near."""
+    return near + ((tick16 - near + 0x8000) & 0xFFFF) - 0x8000
+
+
+def state_checksum(sim):
+    """CRC32 состояния мира после шага: дешевле state_hash, считается на каждом шаге."""
+    values = array("d", (sim.game_time, len(sim.missiles), len(sim.asteroids)))
+    for ship in (sim.ship1, sim.ship2):
+        values.extend((ship.x, ship.y, ship.vx, ship.vy, ship.angle, ship.crew, ship.energy))
+    for m in sim.missiles:
+        values.extend((m.x, m.y))
+    for a in sim.asteroids:
+        values.extend((a.x, a.y))
+    return zlib.crc32(values.tobytes())
+
+
+def encode_runs(bits):
+    runs = []
+    for value in bits:
+        if runs and runs[-1][1] == value and runs[-1][0] < 255:
+            runs[-1][0] += 1
+        else:
+            runs.append([1, value])
+    return runs
+
+
+def match_start(config, input_delay=NET_INPUT_DELAY, send_interval=NET_SEND_INTERVAL, seed=None,
+                rollback_window=None):
+    """
+    Параметры матча, которые хост отправляет второму игроку: флоты, зерно, задержка ввода.
+    rollback_window – игра с откатом и предсказанием не дальше стольких шагов, None – lockstep.
+    """
+    fleets = {team: [name for name in config["teams"][team] if name is not None] for team in TEAMS}
+    for team in TEAMS:
+        if not fleets[team]:
+            raise NetError(f"{team} fleet is empty")
+    config = dict(config, mode="Net", settings={team: {"control": "Human Control"} for team in TEAMS})
+    return {"seed": seed if seed is not None else random.randrange(2 ** 32), "tick_rate": TICK_RATE,
+            "input_delay": input_delay, "send_interval": send_interval, "rollback_window": rollback_window,
+            "fleets": fleets, "config": config}
+
+
+class LockstepSession:
+    """
+    Обмен управлением с партнёром. Цикл шага:
+        poll() – принять пакеты; add_local(bits) – своё управление на шаг tick + input_delay;
+        если ready() – step(sim, dt); send(). Матч окончен, когда over(sim).
+    """
+    def __init__(self, sock, peer, local_team, start, timeout=NET_TIMEOUT, start_packet=None):
+        self.sock = sock
+        self.sock.setblocking(False)
+        self.peer = peer
+        self.local_team = local_team
+        self.remote_team = TEAMS[1] if local_team == TEAMS[0] else TEAMS[0]
+        self.start = start
+        self.start_packet = start_packet  # у хоста: START повторяется на каждый HELLO
+        self.input_delay = start["input_delay"]
+        self.send_interval = start["send_interval"]
+        self.resend_period = self.send_interval / start["tick_rate"]
+        self.timeout = timeout
+        self.tick = 0
+        # Первые input_delay шагов у обоих игроков без управления
+        self.local = {t: 0 for t in range(self.input_delay)}
+        self.remote = {t: 0 for t in range(self.input_delay)}
+        self.local_next = self.input_delay
+        self.remote_next = self.input_delay
+        self.peer_ack = self.input_delay
+        self.sent_until = self.input_delay
+        self.own_checksums = {}
+        self.remote_checksums = {}
+        self.last_checksum = None
+        self.desync = None
+        self.peer_left = False
+        self.last_send = 0.0
+        self.last_heard = time.monotonic()
+        self.started = time.monotonic()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.packets_sent = 0
+        self.packets_received = 0
+        self.stalls = 0
+
+    # ---------- шаги ----------
+
+    def add_local(self, bits):
+        """Своё управление на следующий незаполненный шаг; False, если он уже заполнен."""
+        if self.local_next > self.tick + self.input_delay:
+            return False
+        self.local[self.local_next] = bits
+        self.local_next += 1
+        return True
+
+    def ready(self):
+        return self.tick in self.remote and self.tick in self.local
+
+    def inputs(self):
+        return {self.local_team: decode_controls(self.local[self.tick]),
+                self.remote_team: decode_controls(self.remote[self.tick])}
+
+    def step(self, sim, dt):
+        sim.step(dt, self.inputs())
+        self.advance(state_checksum(sim))
+
+    def over(self, sim):
+        return sim.finished
+
+    def settle(self, sim, dt):
+        """Дожидается подтверждения всех посчитанных шагов – в lockstep они подтверждены сразу."""
+
+    def advance(self, checksum):
+        tick = self.tick
+        self.own_checksums[tick] = checksum
+        self.last_checksum = (tick, checksum)
+        self.compare(tick)
+        self.remote.pop(tick, None)
+        self.own_checksums.pop(tick - CHECKSUM_HISTORY, None)
+        for t in [t for t in self.local if t < min(self.peer_ack, tick)]:
+            del self.local[t]
+        self.tick += 1
+
+    def compare(self, tick):
+        remote = self.remote_checksums.pop(tick, None)
+        if remote is not None and tick in self.own_checksums and remote != self.own_checksums[tick]:
+            if self.desync is None:
+                self.desync = tick
+
+    @property
+    def timed_out(self):
+        return time.monotonic() - self.last_heard > self.timeout
+
+    @property
+    def finished(self):
+        return self.peer_left or self.timed_out or self.desync is not None
+
+    # ---------- сеть ----------
+
+    def send_raw(self, packet):
+        try:
+            self.sock.sendto(packet, self.peer)
+        except OSError:
+            return  # сеть временно недоступна – повтор уйдёт следующим пакетом
+        self.bytes_sent += len(packet)
+        self.packets_sent += 1
+
+    def send(self, force=False):
+        """Отправляет пакет, если накопилось send_interval новых шагов или партнёр давно не получал пакетов."""
+        now = time.monotonic()
+        due = self.local_next - self.sent_until >= self.send_interval or now - self.last_send >= self.resend_period
+        if not (due or force):
+            return
+        first = max(self.peer_ack, self.local_next - MAX_REDUNDANCY)
+        runs = encode_runs(self.local[t] for t in range(first, self.local_next))[:255]
+        packet = bytearray(HEADER.pack(MAGIC, VERSION, INPUTS))
+        packet += INPUTS_HEADER.pack(self.remote_next & 0xFFFF, first & 0xFFFF, len(runs))
+        for count, bits in runs:
+            packet += RUN.pack(count, bits)
+        if self.last_checksum is not None:
+            tick, checksum = self.last_checksum
+            packet += CHECKSUM.pack(tick & 0xFFFF, checksum)
+        self.send_raw(bytes(packet))
+        self.last_send = now
+        self.sent_until = self.local_next
+
+    def poll(self):
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(MAX_PACKET)
+            except (BlockingIOError, InterruptedError):
+                return
+            except ConnectionResetError:
+                continue  # Windows сообщает так о недоставленном пакете
+            if addr != self.peer or len(data) < HEADER.size:
+                continue
+            magic, version, kind = HEADER.unpack_from(data)
+            if magic != MAGIC or version != VERSION:
+                continue
+            self.last_heard = time.monotonic()
+            self.bytes_received += len(data)
+            self.packets_received += 1
+            if kind == INPUTS:
+                self.receive_inputs(data, HEADER.size)
+            elif kind == HELLO and self.start_packet is not None:
+                self.send_raw(self.start_packet)
+            elif kind == BYE:
+                self.peer_left = True
+
+    def receive_inputs(self, data, pos):
+        ack, first, count = INPUTS_HEADER.unpack_from(data, pos)
+        pos += INPUTS_HEADER.size
+        self.peer_ack = max(self.peer_ack, unwrap(ack, self.local_next))
+        tick = unwrap(first, self.remote_next)
+        for _ in range(count):
+            repeat, bits = RUN.unpack_from(data, pos)
+            pos += RUN.size
+            for t in range(tick, tick + repeat):
+                if t >= self.remote_next and t not in self.remote:
+                    self.remote[t] = bits
+            tick += repeat
+        while self.remote_next in self.remote:
+            self.remote_next += 1
+        if len(data) - pos >= CHECKSUM.size:
+            tick16, checksum = CHECKSUM.unpack_from(data, pos)
+            tick = unwrap(tick16, self.tick)
+            if tick > self.tick - CHECKSUM_HISTORY:
+                self.remote_checksums[tick] = checksum
+                self.compare(tick)
+
+    def wait(self, seconds):
+        """Ждёт пакет партнёра не дольше seconds."""
+        select.select([self.sock], [], [], max(0.0, seconds))
+
+    def close(self, linger=LINGER):
+        """
+        Ещё linger секунд досылает управление (партнёру могут быть нужны последние шаги),
+        затем сообщает о выходе и закрывает сокет.
+        """
+        end = time.monotonic() + linger
+        while linger and not self.peer_left and time.monotonic() < end:
+            self.poll()
+            self.send()
+            self.wait(self.resend_period)
+        self.send_raw(HEADER.pack(MAGIC, VERSION, BYE))
+        self.sock.close()
+
+    def stats(self):
+        seconds = max(self.tick / self.start["tick_rate"], 1e-9)
+        return {"ticks": self.tick, "stalls": self.stalls, "desync": self.desync,
+                "sent_bps": round(self.bytes_sent / seconds), "received_bps": round(self.bytes_received / seconds),
+                "packets_sent": self.packets_sent, "packets_received": self.packets_received}
+
+    def build_simulation(self):
+        fleets = self.start["fleets"]
+        return Simulation([SHIP_CLASSES[name] for name in fleets["Team 1"]],
+                          [SHIP_CLASSES[name] for name in fleets["Team 2"]], seed=self.start["seed"])
+
+
+class RollbackSession(LockstepSession):
+    """
+    Сетевая игра с откатом. step(sim, dt) сначала сверяет пришедшее управление партнёра
+    с предсказанным и при расхождении откатывает мир, затем считает новый шаг с предсказанием.
+    Шаги до verified посчитаны с настоящим управлением и больше не откатываются.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.window = self.start["rollback_window"]
+        self.verified = 0
+        self.states = {}       # шаг -> состояние мира перед шагом (save_state)
+        self.predicted = {}    # шаг -> биты партнёра, с которыми шаг посчитан
+        self.provisional = {}  # шаг -> (контрольная сумма, матч окончен) после шага
+        self.last_remote = 0
+        self.match_over = False
+        self.rollbacks = 0
+        self.resimulated = 0
+        self.max_depth = 0
+
+    def ready(self):
+        return self.tick in self.local and self.tick - self.remote_next < self.window
+
+    def predict(self, tick):
+        bits = self.remote.get(tick)
+        return bits if bits is not None else self.last_remote & HELD_BITS
+
+    def simulate(self, sim, dt):
+        tick = self.tick
+        self.states[tick] = save_state(sim)
+        bits = self.predict(tick)
+        self.predicted[tick] = bits
+        sim.step(dt, {self.local_team: decode_controls(self.local[tick]), self.remote_team: decode_controls(bits)})
+        self.provisional[tick] = (state_checksum(sim), sim.finished)
+        self.tick += 1
+
+    def step(self, sim, dt):
+        self.reconcile(sim, dt)
+        self.simulate(sim, dt)
+
+    def reconcile(self, sim, dt):
+        """Откат к первому шагу, где пришедшее управление не совпало с предсказанным, и пересчёт до текущего."""
+        self.last_remote = self.remote.get(self.remote_next - 1, self.last_remote)
+        end = min(self.remote_next, self.tick)
+        t = self.verified
+        while t < end and self.remote[t] == self.predicted[t]:
+            t += 1
+        if t < end:
+            target = self.tick
+            load_state(sim, self.states[t])
+            self.tick = t
+            while self.tick < target:
+                self.simulate(sim, dt)
+            self.rollbacks += 1
+            self.resimulated += target - t
+            self.max_depth = max(self.max_depth, target - t)
+        self.confirm(end)
+
+    def confirm(self, end):
+        for t in range(self.verified, end):
+            checksum, finished = self.provisional.pop(t)
+            del self.states[t]
+            del self.predicted[t]
+            self.remote.pop(t, None)
+            self.own_checksums[t] = checksum
+            self.own_checksums.pop(t - CHECKSUM_HISTORY, None)
+            self.last_checksum = (t, checksum)
+            self.compare(t)
+            self.match_over = self.match_over or finished
+        self.verified = max(self.verified, end)
+        for t in [t for t in self.local if t < min(self.peer_ack, self.verified)]:
+            del self.local[t]
+
+    def over(self, sim):
+        # Конец матча на предсказанных шагах может отмениться откатом
+        return self.match_over
+
+    def settle(self, sim, dt):
+        while self.verified < self.tick and not self.finished:
+            self.poll()
+            self.reconcile(sim, dt)
+            self.send()
+            if self.verified < self.tick:
+                self.wait(self.resend_period)
+
+    def stats(self):
+        return dict(super().stats(), rollbacks=self.rollbacks, resimulated=self.resimulated,
+                    max_depth=self.max_depth)
+
+
+def session_class(start):
+    return RollbackSession if start.get("rollback_window") else LockstepSession
+
+
+def host(port, start, bind="0.0.0.0", timeout=None):
+    """Ждёт второго игрока на port и отправляет ему параметры матча. Хост играет за Team 1."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((bind, port))
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    while True:
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            sock.close()
+            raise NetError("No player joined")
+        ready, _, _ = select.select([sock], [], [], remaining)
+        if not ready:
+            continue
+        data, addr = sock.recvfrom(MAX_PACKET)
+        if len(data) >= HEADER.size and HEADER.unpack_from(data) == (MAGIC, VERSION, HELLO):
+            break
+    packet = HEADER.pack(MAGIC, VERSION, START) + json.dumps(start).encode("utf-8")
+    if len(packet) > MAX_PACKET:
+        sock.close()
+        raise NetError("Match parameters do not fit in one packet")
+    session = session_class(start)(sock, addr, TEAMS[0], start, start_packet=packet)
+    session.send_raw(packet)
+    return session
+
+
+def join(address, timeout=NET_TIMEOUT):
+    """Подключается к хосту (или ретранслятору) по address = (host, port). Играет за Team 2."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+    deadline = time.monotonic() + timeout
+    hello = HEADER.pack(MAGIC, VERSION, HELLO)
+    while time.monotonic() < deadline:
+        sock.sendto(hello, address)
+        ready, _, _ = select.select([sock], [], [], HELLO_INTERVAL)
+        if not ready:
+            continue
+        try:
+            data, addr = sock.recvfrom(MAX_PACKET)
+        except (BlockingIOError, ConnectionResetError):
+            continue
+        if addr != address or len(data) < HEADER.size:
+            continue
+        magic, version, kind = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            continue
+        if version != VERSION:
+            sock.close()
+            raise NetError(f"Host uses protocol version {version}, expected {VERSION}")
+        if kind == START:
+            start = json.loads(data[HEADER.size:].decode("utf-8"))
+            if start["tick_rate"] != TICK_RATE:
+                sock.close()
+                raise NetError(f"Host runs at {start['tick_rate']} ticks per second, expected {TICK_RATE}")
+            return session_class(start)(sock, address, TEAMS[1], start, timeout=timeout)
+    sock.close()
+    raise NetError(f"No answer from {address[0]}:{address[1]}")
+
+
+def parse_address(text, default_port=NET_PORT):
+    hostname, _, port = text.rpartition(":")
+    if not hostname:
+        return text, default_port
+    return hostname, int(port)
+
+
+class Relay:
+    """
+    Ретранслятор для проверки на одной машине: пересылает пакеты между первым обратившимся
+    клиентом и target, теряя долю loss и задерживая на latency ± jitter секунд (с перестановкой).
+    """
+    def __init__(self, port, target, loss=0.0, latency=0.0, jitter=0.0, seed=None):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", port))
+        self.target = target
+        self.loss = loss
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.client = None
+        self.queue = []
+        self.sequence = 0
+        self.forwarded = 0
+        self.dropped = 0
+
+    def run(self, duration=None):
+        end = time.monotonic() + duration if duration is not None else None
+        while end is None or time.monotonic() < end:
+            now = time.monotonic()
+            while self.queue and self.queue[0][0] <= now:
+                _, _, data, dest = heapq.heappop(self.queue)
+                self.sock.sendto(data, dest)
+            timeout = self.queue[0][0] - now if self.queue else 0.1
+            ready, _, _ = select.select([self.sock], [], [], max(0.0, timeout))
+            if not ready:
+                continue
+            try:
+                data, addr = self.sock.recvfrom(MAX_PACKET)
+            except ConnectionResetError:
+                continue
+            if addr == self.target:
+                if self.client is None:
+                    continue
+                dest = self.client
+            else:
+                self.client = addr
+                dest = self.target
+            if self.rng.random() < self.loss:
+                self.dropped += 1
+                continue
+            delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+            self.sequence += 1
+            heapq.heappush(self.queue, (time.monotonic() + delay, self.sequence, data, dest))
+            self.forwarded += 1
+
+
+def scripted_controls(team, tick, seed=0):
+    """Управление бота для проверки без клавиатуры: новая комбинация клавиш каждые 15 шагов."""
+    rng = random.Random(f"{seed}:{team}:{tick // 15}")
+    return ShipControls(turn=rng.choice((-1, 0, 1)), thrust=rng.random() < 0.6,
+                        fire_primary=tick % 15 == 0 and rng.random() < 0.5,
+                        fire_secondary=tick % 15 == 0 and rng.random() < 0.1,
+                        hold_primary=rng.random() < 0.3, release_mine=tick % 15 == 7)
+
+
+def run_headless(session, ticks, realtime=True):
+    """Играет матч ботом scripted_controls до ticks шагов или конца матча; возвращает sim."""
+    sim = session.build_simulation()
+    dt = 1.0 / session.start["tick_rate"]
+    next_tick_at = time.monotonic()
+    try:
+        while session.tick < ticks and not session.over(sim) and not session.finished:
+            session.poll()
+            if realtime and time.monotonic() < next_tick_at:
+                session.send()
+                session.wait(next_tick_at - time.monotonic())
+                continue
+            session.add_local(encode_controls(scripted_controls(session.local_team, session.local_next)))
+            if session.ready():
+                session.step(sim, dt)
+                next_tick_at += dt
+            else:
+                session.stalls += 1
+                session.send()
+                session.wait(dt)
+                next_tick_at = max(next_tick_at, time.monotonic())
+                continue
+            session.send()
+        session.settle(sim, dt)
+    finally:
+        session.close()
+    return sim
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lockstep-матч двух ботов по UDP и ретранслятор для проверки")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("host", help="ждать второго игрока")
+    p.add_argument("port", type=int, nargs="?", default=NET_PORT)
+    p.add_argument("--input-delay", type=int, help=f"по умолчанию {NET_INPUT_DELAY}, с откатом {NET_ROLLBACK_DELAY}")
+    p.add_argument("--rollback", nargs="?", type=int, const=NET_ROLLBACK_WINDOW, metavar="WINDOW",
+                   help="откат с предсказанием не дальше WINDOW шагов вместо lockstep")
+    p.add_argument("--send-interval", type=int, default=NET_SEND_INTERVAL)
+    p.add_argument("--seed", type=int)
+    p.add_argument("--fleet", nargs=2, metavar=("TEAM1", "TEAM2"), default=("Earthling Cruiser", "KOHR-AH MARAUDER"),
+                   help="корабли команд через запятую")
+    p = sub.add_parser("join", help="подключиться к хосту или ретранслятору")
+    p.add_argument("address")
+    for name in ("host", "join"):
+        sp = sub.choices[name]
+        sp.add_argument("--ticks", type=int, default=1800)
+        sp.add_argument("--fast", action="store_true", help="не ждать реального времени между шагами")
+    p = sub.add_parser("relay", help="ретранслятор с потерями и задержкой")
+    p.add_argument("port", type=int)
+    p.add_argument("target")
+    p.add_argument("--loss", type=float, default=0.0)
+    p.add_argument("--latency", type=float, default=0.0, help="задержка в одну сторону, с")
+    p.add_argument("--jitter", type=float, default=0.0)
+    p.add_argument("--seed", type=int)
+    p.add_argument("--duration", type=float)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "relay":
+            relay = Relay(args.port, parse_address(args.target), args.loss, args.latency, args.jitter, args.seed)
+            try:
+                relay.run(args.duration)
+            except KeyboardInterrupt:
+                pass
+            print(f"forwarded {relay.forwarded}, dropped {relay.dropped}")
+            return 0
+        if args.command == "host":
+            teams = {team: fleet.split(",") for team, fleet in zip(TEAMS, args.fleet)}
+            config = {"teams": teams, "team_names": {team: team for team in TEAMS}}
+            input_delay = args.input_delay
+            if input_delay is None:
+                input_delay = NET_ROLLBACK_DELAY if args.rollback else NET_INPUT_DELAY
+            start = match_start(config, input_delay, args.send_interval, args.seed, args.rollback)
+            print(f"Waiting for a player on port {args.port}...")
+            session = host(args.port, start)
+        else:
+            session = join(parse_address(args.address))
+    except (NetError, OSError, KeyError) as e:
+        print("Error:", e)
+        return 1
+    sim = run_headless(session, args.ticks, realtime=not args.fast)
+    print(f"Ticks: {session.tick}  Winner: {sim.winner}  State: {state_hash(sim)}")
+    print("Net:", session.stats())
+    if session.desync is not None:
+        print(f"DESYNC at tick {session.desync}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
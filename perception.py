@@ -0,0 +1,156 @@
+"""
+Восприятие AI: общий для всех контроллеров снимок мира на один шаг симуляции.
+
+Simulation создаёт Perception один раз за шаг, контроллеры получают из него ShipView своего
+корабля. Все смещения считаются на торе (wrap_delta), поэтому враг, препятствие или снаряд
+по ту сторону шва видны так же, как рядом. ShipView строится при первом запросе и кэшируется
+до конца шага: контроллеры принимают решения раз в reaction_time, и в остальные шаги
+восприятие ничего не стоит. Координаты снарядов собираются из хранилища один раз на шаг
+для всех контроллеров, так же один раз собираются препятствия (астероиды и колодцы) и их
+координаты; отбор по дальности при большом числе снарядов выполняется NumPy.
+"""
+import math
+from collections import namedtuple
+from project.config import FIELD_W, FIELD_H
+from project.utils import wrap_delta
+from project.entities.projectile_bank import BANK
+from project import torus
+from project.torus import wrap_array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен – без него кандидаты проверяются все подряд
+    np = None
+
+# Дальше этого снаряды не попадают в список угроз
+THREAT_RANGE = 400.0
+# Препятствия с зазором до корпуса больше этого не попадают в список препятствий
+OBSTACLE_RANGE = 200.0
+
+# Смещения (dx, dy) – от корабля к объекту
+Obstacle = namedtuple("Obstacle", "body dx dy distance clearance")
+# heading_error – угол между курсом снаряда и направлением от снаряда на корабль, градусы.
+# time_to_impact – время до наибольшего сближения при нынешних скоростях (inf, если снаряд удаляется),
+# miss_distance – расстояние между центрами в этот момент
+Threat = namedtuple("Threat", "projectile dx dy distance heading_error time_to_impact miss_distance")
+
+
+def bearing(dx, dy):
+    """Направление смещения в градусах, как его считают контроллеры (atan2(dy, dx))."""
+    return math.degrees(math.atan2(dy, dx))
+
+
+def nearby(x, y, xs, ys, reach):
+    """
+    Индексы точек не дальше reach от (x, y) на торе вместе с их смещениями и расстоянием:
+    [(i, dx, dy, distance)]. Расстояние всегда считается math.hypot, поэтому результат
+    не зависит от того, отбирались ли кандидаты NumPy.
+    """
+    n = len(xs)
+    if np is None or n < torus.MIN_VECTOR_PAIRS:
+        candidates = range(n)
+    else:
+        dx = wrap_array(np.asarray(xs, dtype=float) - x, FIELD_W)
+        dy = wrap_array(np.asarray(ys, dtype=float) - y, FIELD_H)
+        limit = reach * (1.0 + torus.TOLERANCE)
+        candidates = np.flatnonzero(dx * dx + dy * dy <= limit * limit).tolist()
+    found = []
+    for i in candidates:
+        dx = wrap_delta(x, xs[i], FIELD_W)
+        dy = wrap_delta(y, ys[i], FIELD_H)
+        distance = math.hypot(dx, dy)
+        if distance <= reach:
+            found.append((i, dx, dy, distance))
+    return found
+
+
+class ShipView:
+    """То, что видит контроллер одного корабля: враг, ближайшие препятствия и угрозы."""
+    __slots__ = ("ship", "enemy", "enemy_dx", "enemy_dy", "enemy_distance", "enemy_bearing",
+                 "obstacles", "threats")
+
+    def __init__(self, ship, enemy, obstacles, threats):
+        self.ship = ship
+        self.enemy = enemy
+        self.enemy_dx = wrap_delta(ship.x, enemy.x, FIELD_W)
+        self.enemy_dy = wrap_delta(ship.y, enemy.y, FIELD_H)
+        self.enemy_distance = math.hypot(self.enemy_dx, self.enemy_dy)
+        self.enemy_bearing = bearing(self.enemy_dx, self.enemy_dy)
+        self.obstacles = obstacles  # по возрастанию зазора
+        self.threats = threats      # по возрастанию времени до сближения
+
+    def nearest_obstacle(self):
+        return self.obstacles[0] if self.obstacles else None
+
+
+class Perception:
+    def __init__(self, asteroids, wells, projectiles, bank=BANK):
+        self.asteroids = asteroids
+        self.wells = wells
+        self.projectiles = projectiles
+        self.bank = bank
+        self.views = {}
+        self.projectile_columns = None
+        self.obstacle_columns = None
+
+    def view(self, ship, enemy):
+        view = self.views.get(ship.id)
+        if view is None or view.enemy is not enemy:
+            view = self.views[ship.id] = ShipView(ship, enemy, self.obstacles_near(ship), self.threats_to(ship))
+        return view
+
+    def gather_obstacles(self):
+        # Список препятствий, их координаты и наибольший радиус – один раз на шаг для всех контроллеров
+        if self.obstacle_columns is None:
+            bodies = self.asteroids + self.wells
+            self.obstacle_columns = (bodies, [b.x for b in bodies], [b.y for b in bodies],
+                                     max((b.radius for b in bodies), default=0))
+        return self.obstacle_columns
+
+    def obstacles_near(self, ship):
+        bodies, xs, ys, max_radius = self.gather_obstacles()
+        if not bodies:
+            return []
+        reach = OBSTACLE_RANGE + ship.radius + max_radius
+        obstacles = []
+        for i, dx, dy, distance in nearby(ship.x, ship.y, xs, ys, reach):
+            clearance = distance - bodies[i].radius - ship.radius
+            if clearance < OBSTACLE_RANGE:
+                obstacles.append(Obstacle(bodies[i], dx, dy, distance, clearance))
+        obstacles.sort(key=lambda o: o.clearance)
+        return obstacles
+
+    def gather_projectiles(self):
+        # Один сбор столбцов хранилища на шаг для всех контроллеров
+        if self.projectile_columns is None:
+            slots = [p.slot for p in self.projectiles]
+            self.projectile_columns = tuple(self.bank.gather(slots, name)
+                                            for name in ("x", "y", "vx", "vy", "owner_id"))
+        return self.projectile_columns
+
+    def threats_to(self, ship):
+        if not self.projectiles:
+            return []
+        xs, ys, vxs, vys, owners = self.gather_projectiles()
+        threats = []
+        for i, dx, dy, distance in nearby(ship.x, ship.y, xs, ys, THREAT_RANGE):
+            if owners[i] == ship.id or not self.projectiles[i].active:
+                continue
+            vx = vxs[i]
+            vy = vys[i]
+            heading_error = abs((bearing(vx, vy) - bearing(-dx, -dy) + 180) % 360 - 180)
+            # Сближение в системе отсчёта корабля: снаряд в точке (dx, dy) со скоростью (rvx, rvy)
+            rvx = vx - ship.vx
+            rvy = vy - ship.vy
+            speed_sq = rvx * rvx + rvy * rvy
+            closing = -(dx * rvx + dy * rvy)
+            if speed_sq == 0 or closing <= 0:
+                time_to_impact = math.inf
+                miss_distance = distance
+            else:
+                time_to_impact = closing / speed_sq
+                miss_distance = math.hypot(dx + rvx * time_to_impact, dy + rvy * time_to_impact)
+            threats.append(Threat(self.projectiles[i], dx, dy, distance, heading_error,
+                                  time_to_impact, miss_distance))
+        threats.sort(key=lambda t: (t.time_to_impact, t.distance))
+        return threats
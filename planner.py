@@ -0,0 +1,288 @@
+"""
+Планировщик с просмотром вперёд для AI высшей сложности (Awesome Cyborg).
+
+Из текущего положения перебирается небольшой набор последовательностей управления
+(поворот и тяга на первые PHASE секунд, затем – держать то же или доворачивать на врага
+с тягой), и для каждой дешёвая копия мира прогоняется вперёд крупными шагами ROLLOUT_DT.
+Копия – только два корабля, планеты, снаряды-угрозы из восприятия и свои выстрелы основным
+оружием (модель оружия своего класса корабля из WEAPONS); гравитация,
+тяга и столкновения с планетой и кораблём считаются теми же функциями, что и в игре.
+Оценка – нанесённый и полученный урон экипажу и близость к планете.
+
+Поиск «в любой момент»: горизонты HORIZONS проходятся по очереди, и результатом служит
+лучшая последовательность последнего полностью оценённого горизонта. Работа делится на
+порции по шагам прогноза и, если задано, по времени, поэтому поиск можно продолжать в
+нескольких шагах симуляции подряд и прервать в любой момент (прогон, не успевший до срока,
+отбрасывается и начинается заново в следующей порции). Search – самостоятельная
+копия, поэтому его можно выполнить и в другом потоке или процессе (project.ai_worker).
+"""
+import math
+import time
+from collections import namedtuple
+from project.config import FIELD_W, FIELD_H
+from project.utils import wrap_delta
+from project.gravity import FIELD as GRAVITY
+from project.collisions import handle_planet_collision, handle_ship_ship_collision
+from project.ships.base_ship import apply_thrust
+from project.ships.ship_a import ShipA
+from project.ships.ship_b import ShipB
+from project.ships.ship_terminator import ShipTerminator
+
+ROLLOUT_DT = 0.1                   # шаг прогноза, с
+HORIZONS = (0.5, 1.0, 1.5, 2.0)    # горизонты углубления, с
+PHASE = 0.5                        # длительность первой части последовательности, с
+FIRE_CONE = 30.0                   # стрельба в прогнозе, если враг в этом конусе по курсу, градусы
+FIRE_RANGE = 700.0
+PLANET_DANGER = 60.0               # зазор до планеты, с которого начинается штраф за близость
+MAX_THREATS = 8                    # сколько ближайших по времени угроз участвует в прогнозе
+THREAT_MARGIN = 120.0              # угрозы, пролетающие дальше этого от корабля, не учитываются
+
+THREAT_LIFETIME = 3.0              # сколько живут чужие снаряды в прогнозе, с
+
+# Веса оценки
+DEALT_WEIGHT = 10.0
+TAKEN_WEIGHT = 12.0
+PLANET_WEIGHT = 20.0
+DISTANCE_WEIGHT = 0.002            # слабая тяга к сближению, когда урона в прогнозе нет
+
+Candidate = namedtuple("Candidate", "turn thrust pursue")
+Plan = namedtuple("Plan", "turn thrust fire score horizon")
+# Копия планеты для прогноза: поиск не держит ссылок на объекты симуляции
+Well = namedtuple("Well", "x y radius")
+# Основное оружие в прогнозе: снаряды вылетают с носа со сдвигом spread (в радиусах корабля) вбок,
+# с наведением homing > 0 доворачивают к врагу со скоростью speed; single – одновременно только один
+Weapon = namedtuple("Weapon", "launch_speed speed homing damage radius lifetime spread single")
+
+# Как стреляют классы кораблей (см. их fire_primary). Корабли без записи в прогнозе не стреляют
+WEAPONS = {
+    ShipA: Weapon(50.0, 300.0, 2.0, 4, 5.0, 3.0, (0.0,), False),            # самонаводящаяся ракета
+    ShipTerminator: Weapon(50.0, 0.0, 0.0, 1, 5.0, 3.0, (-1.0, 1.0), False),  # две ракеты без цели
+    # Мина в режиме запуска летит прямо, пока её не отпустят; планировщик её не отпускает
+    ShipB: Weapon(150.0, 0.0, 0.0, 4, 5.0, math.inf, (0.0,), True),
+}
+
+# Доворот на врага с тягой с самого начала и шесть постоянных управлений с доворотом или без
+CANDIDATES = ([Candidate(0, True, True)] +
+              [Candidate(turn, thrust, pursue) for pursue in (True, False)
+               for thrust in (True, False) for turn in (0, -1, 1)])
+
+
+def heading(dx, dy):
+    """Курс на смещение (dx, dy) в системе корабля: 0° – вверх, по часовой стрелке."""
+    return math.degrees(math.atan2(dx, -dy)) % 360
+
+
+class Body:
+    """Корабль в прогнозе: только то, что нужно тяге, гравитации и столкновениям."""
+    __slots__ = ("x", "y", "vx", "vy", "angle", "radius", "crew", "in_gravity_field", "thrust_timer",
+                 "last_planet_collision", "max_thrust", "thrust_increment", "thrust_wait", "turn_speed")
+
+    @classmethod
+    def from_ship(cls, ship):
+        body = cls()
+        for field in cls.__slots__:
+            setattr(body, field, getattr(ship, field))
+        return body
+
+    def copy(self):
+        body = Body()
+        for field in self.__slots__:
+            setattr(body, field, getattr(self, field))
+        return body
+
+    def take_damage(self, amount):
+        self.crew -= amount
+
+
+class Shot:
+    __slots__ = ("x", "y", "vx", "vy", "radius", "damage", "lifetime", "homing")
+
+    def __init__(self, x, y, vx, vy, radius, damage, lifetime, homing):
+        self.x = x
+        self.y = y
+        self.vx = vx
+        self.vy = vy
+        self.radius = radius
+        self.damage = damage
+        self.lifetime = lifetime
+        self.homing = homing
+
+    def copy(self):
+        return Shot(self.x, self.y, self.vx, self.vy, self.radius, self.damage, self.lifetime, self.homing)
+
+
+def hits(shot, body):
+    dx = wrap_delta(shot.x, body.x, FIELD_W)
+    dy = wrap_delta(shot.y, body.y, FIELD_H)
+    return dx * dx + dy * dy < (shot.radius + body.radius) ** 2
+
+
+class Search:
+    """
+    Поиск плана из положения на момент создания. run() продвигает его порциями,
+    result() в любой момент отдаёт лучший план последнего завершённого горизонта.
+    """
+    def __init__(self, ship, view, wells, game_time, commit_time, step_cost=0.0):
+        self.me = Body.from_ship(ship)
+        self.enemy = Body.from_ship(view.enemy)
+        self.wells = [Well(well.x, well.y, well.radius) for well in wells]
+        self.start_time = game_time
+        self.commit_time = commit_time  # выстрел в это время от начала попадает в план
+        self.weapon_timer = ship.weapon_timer
+        self.energy = ship.energy
+        self.weapon_energy_cost = ship.weapon_energy_cost
+        self.weapon_wait = ship.weapon_wait
+        self.weapon = WEAPONS.get(type(ship))
+        self.shot_out = getattr(ship, "current_mine", None) is not None
+        # Чужие снаряды летят по прямой – наведение угроз в прогнозе не моделируется.
+        # Угрозы в виде уже отсортированы по времени сближения: берутся те, что успевают
+        # долететь за горизонт и пройти рядом с кораблём
+        threats = [t for t in view.threats
+                   if t.time_to_impact <= HORIZONS[-1] and t.miss_distance < THREAT_MARGIN][:MAX_THREATS]
+        self.threats = [Shot(ship.x + t.dx, ship.y + t.dy, float(t.projectile.vx), float(t.projectile.vy),
+                             float(t.projectile.radius), t.projectile.damage, THREAT_LIFETIME, False)
+                        for t in threats]
+        self.step_cost = step_cost  # оценка времени одного шага прогноза, с
+        self.level = 0
+        self.index = 0
+        self.level_results = []
+        self.best = None
+        self.steps = 0
+        self.aborted_at = 0  # на каком шаге прерван последний прогон
+
+    @property
+    def done(self):
+        return self.level >= len(HORIZONS)
+
+    def result(self):
+        return self.best
+
+    def run(self, max_steps, deadline=None):
+        """Оценивает последовательности, пока хватает max_steps шагов прогноза и времени до deadline."""
+        budget = self.steps + max_steps
+        while not self.done:
+            steps = round(HORIZONS[self.level] / ROLLOUT_DT)
+            if self.steps + steps > budget:
+                return
+            if deadline is not None:
+                # Прогон не начинается, если по оценке не успеет до deadline
+                started = time.perf_counter()
+                if started + steps * self.step_cost >= deadline:
+                    return
+            candidate = CANDIDATES[self.index]
+            result = self.rollout(candidate, steps, deadline)
+            if deadline is not None:
+                # Прерванный прогон тоже уточняет оценку: до срока успело столько шагов
+                done = steps if result is not None else max(1, self.aborted_at)
+                cost = (time.perf_counter() - started) / done
+                self.step_cost = cost if self.step_cost == 0.0 else 0.8 * self.step_cost + 0.2 * cost
+            if result is None:
+                return
+            score, fire = result
+            self.steps += steps
+            self.level_results.append(Plan(candidate.turn, candidate.thrust, fire, score, HORIZONS[self.level]))
+            self.index += 1
+            if self.index == len(CANDIDATES):
+                # Горизонт оценён полностью; при равенстве выигрывает более ранний кандидат
+                self.best = max(self.level_results, key=lambda plan: plan.score)
+                self.level_results = []
+                self.index = 0
+                self.level += 1
+
+    def rollout(self, candidate, steps, deadline=None):
+        """(оценка, выстрел в ближайшее commit_time) для candidate или None, если наступил deadline."""
+        dt = ROLLOUT_DT
+        weapon = self.weapon
+        me = self.me.copy()
+        enemy = self.enemy.copy()
+        shots = [shot.copy() for shot in self.threats]
+        missiles = []
+        shot_out = self.shot_out
+        weapon_timer = self.weapon_timer
+        energy = self.energy
+        start_crew = me.crew
+        start_enemy_crew = enemy.crew
+        danger = 0.0
+        fire_now = False
+        for k in range(steps):
+            if deadline is not None and time.perf_counter() >= deadline:
+                self.aborted_at = k
+                return None
+            t = k * dt
+            dx = wrap_delta(me.x, enemy.x, FIELD_W)
+            dy = wrap_delta(me.y, enemy.y, FIELD_H)
+            if t < PHASE or not candidate.pursue:
+                me.angle = (me.angle + candidate.turn * me.turn_speed * dt) % 360
+                thrust = candidate.thrust
+            else:
+                diff = ((heading(dx, dy) - me.angle + 180) % 360) - 180
+                me.angle = (me.angle + math.copysign(min(abs(diff), me.turn_speed * dt), diff)) % 360
+                thrust = True
+            if thrust:
+                apply_thrust(me, dt)
+
+            weapon_timer -= dt
+            if (weapon is not None and not shot_out and weapon_timer <= 0
+                    and energy >= self.weapon_energy_cost):
+                aim = abs(((heading(dx, dy) - me.angle + 180) % 360) - 180)
+                if aim < FIRE_CONE and math.hypot(dx, dy) <= FIRE_RANGE:
+                    rad = math.radians(me.angle)
+                    sin_a = math.sin(rad)
+                    cos_a = math.cos(rad)
+                    for side in weapon.spread:
+                        missiles.append(Shot(me.x + me.radius * (sin_a + side * cos_a),
+                                             me.y - me.radius * (cos_a - side * sin_a),
+                                             me.vx + weapon.launch_speed * sin_a, me.vy - weapon.launch_speed * cos_a,
+                                             weapon.radius, weapon.damage, weapon.lifetime, weapon.homing > 0))
+                    shot_out = weapon.single
+                    weapon_timer = self.weapon_wait
+                    energy -= self.weapon_energy_cost
+                    if t < self.commit_time:
+                        fire_now = True
+
+            me.in_gravity_field = False
+            enemy.in_gravity_field = False
+            GRAVITY.apply([me, enemy], self.wells, dt)
+            for body in (me, enemy):
+                body.x = (body.x + body.vx * dt) % FIELD_W
+                body.y = (body.y + body.vy * dt) % FIELD_H
+
+            for shot in shots:
+                if not shot.damage:
+                    continue
+                shot.x = (shot.x + shot.vx * dt) % FIELD_W
+                shot.y = (shot.y + shot.vy * dt) % FIELD_H
+                if hits(shot, me):
+                    me.take_damage(shot.damage)
+                    shot.damage = 0
+            for shot in missiles:
+                shot.lifetime -= dt
+                if shot.lifetime <= 0 or not shot.damage:
+                    continue
+                if shot.homing:
+                    mx = wrap_delta(shot.x, enemy.x, FIELD_W)
+                    my = wrap_delta(shot.y, enemy.y, FIELD_H)
+                    distance = math.hypot(mx, my)
+                    if distance != 0:
+                        shot.vx += (weapon.speed * mx / distance - shot.vx) * weapon.homing * dt
+                        shot.vy += (weapon.speed * my / distance - shot.vy) * weapon.homing * dt
+                shot.x = (shot.x + shot.vx * dt) % FIELD_W
+                shot.y = (shot.y + shot.vy * dt) % FIELD_H
+                if hits(shot, enemy):
+                    enemy.take_damage(shot.damage)
+                    shot.damage = 0
+
+            game_time = self.start_time + t
+            for well in self.wells:
+                handle_planet_collision(me, well, game_time)
+                handle_planet_collision(enemy, well, game_time)
+                clearance = math.hypot(wrap_delta(me.x, well.x, FIELD_W),
+                                       wrap_delta(me.y, well.y, FIELD_H)) - well.radius - me.radius
+                if clearance < PLANET_DANGER:
+                    danger += (1.0 - max(clearance, 0.0) / PLANET_DANGER) * dt
+            handle_ship_ship_collision(me, enemy)
+
+        distance = math.hypot(wrap_delta(me.x, enemy.x, FIELD_W), wrap_delta(me.y, enemy.y, FIELD_H))
+        score = (DEALT_WEIGHT * (start_enemy_crew - enemy.crew) - TAKEN_WEIGHT * (start_crew - me.crew)
+                 - PLANET_WEIGHT * danger - DISTANCE_WEIGHT * distance)
+        return score, fire_now
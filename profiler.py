@@ -0,0 +1,151 @@
+"""
+Профилировщик кадра: именованные области замера вокруг подсистем игры.
+
+    from project import profiler
+    with profiler.scope("gravity"):
+        ...
+
+Пока профилировщик не включён, profiler.scope() возвращает один и тот же пустой контекстный
+менеджер – замеров нет, цена вызова – поиск атрибута модуля и вызов функции. enable() подменяет
+scope на замер через FrameProfiler. Время областей за кадр суммируется (за кадр бывает
+несколько шагов симуляции), end_frame() кладёт суммы в скользящее окно последних кадров,
+по которому считаются перцентили p50/p95/p99. С dump_path статистика окна периодически
+записывается в файл: .csv – строки дописываются, .json – файл заменяется последним замером.
+"""
+import atexit
+import csv
+import json
+import os
+import time
+from collections import deque
+from contextlib import nullcontext
+from project.config import PROFILER_WINDOW, PROFILER_DUMP_INTERVAL
+from project.profiles import atomic_write
+
+PERCENTILES = (50, 95, 99)
+CSV_FIELDS = ("time", "frames", "scope", "p50_ms", "p95_ms", "p99_ms", "mean_ms", "max_ms")
+
+
+class Scope:
+    """Замер одной области; объект на имя один и переиспользуется, чтобы не создавать его каждый кадр."""
+    __slots__ = ("totals", "name", "start")
+
+    def __init__(self, totals, name):
+        self.totals = totals
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.totals[self.name] += time.perf_counter() - self.start
+        return False
+
+
+def percentile(ordered, p):
+    """Перцентиль p (ближайший ранг) отсортированного непустого списка."""
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[rank - 1]
+
+
+class FrameProfiler:
+    def __init__(self, window=PROFILER_WINDOW, dump_path=None, dump_interval=PROFILER_DUMP_INTERVAL):
+        self.window = window
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+        self.scopes = {}
+        self.totals = {}   # имя -> время за текущий кадр, с
+        self.history = {}  # имя -> deque времени за последние window кадров
+        self.frames = 0
+        self.last_dump = time.monotonic()
+
+    def scope(self, name):
+        scope = self.scopes.get(name)
+        if scope is None:
+            # Области выводятся в порядке первого появления
+            self.totals[name] = 0.0
+            self.history[name] = deque([0.0] * min(self.frames, self.window), maxlen=self.window)
+            scope = self.scopes[name] = Scope(self.totals, name)
+        return scope
+
+    def end_frame(self):
+        """Закрывает кадр: суммы областей уходят в окно (не встретившиеся в кадре – нулём)."""
+        totals = self.totals
+        for name, samples in self.history.items():
+            samples.append(totals[name])
+            totals[name] = 0.0
+        self.frames += 1
+        if self.dump_path is not None and time.monotonic() - self.last_dump >= self.dump_interval:
+            self.dump()
+
+    def stats(self):
+        """[(имя, p50, p95, p99, среднее, максимум)] в миллисекундах по окну последних кадров."""
+        rows = []
+        for name, samples in self.history.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            values = [percentile(ordered, p) for p in PERCENTILES]
+            values += [sum(ordered) / len(ordered), ordered[-1]]
+            rows.append((name, *(value * 1000.0 for value in values)))
+        return rows
+
+    def dump(self, path=None):
+        path = path or self.dump_path
+        self.last_dump = time.monotonic()
+        now = round(time.time(), 3)
+        rows = self.stats()
+        try:
+            if path.endswith(".json"):
+                data = {"time": now, "frames": self.frames, "window": self.window,
+                        "scopes": {name: dict(zip(CSV_FIELDS[3:], values)) for name, *values in rows}}
+                atomic_write(path, json.dumps(data, indent=2).encode("utf-8"))
+            else:
+                header = not os.path.exists(path) or os.path.getsize(path) == 0
+                with open(path, "a", newline="", encoding="utf-8") as f:
+                    writer = csv.writer(f)
+                    if header:
+                        writer.writerow(CSV_FIELDS)
+                    for name, *values in rows:
+                        writer.writerow([now, self.frames, name, *(f"{value:.4f}" for value in values)])
+        except OSError as e:
+            print("Error writing profile:", e)
+
+
+NULL_SCOPE = nullcontext()
+
+
+def null_scope(name):
+    return NULL_SCOPE
+
+
+# Подменяется в enable(); вызывающий код обращается к нему как profiler.scope(...)
+scope = null_scope
+PROFILER = None
+
+
+def enable(dump_path=None, window=PROFILER_WINDOW, dump_interval=PROFILER_DUMP_INTERVAL):
+    global PROFILER, scope
+    if PROFILER is None:
+        PROFILER = FrameProfiler(window, dump_path, dump_interval)
+        scope = PROFILER.scope
+        if dump_path is not None:
+            atexit.register(disable)
+    return PROFILER
+
+
+def disable():
+    """Возвращает пустые области; перед этим записывает последний замер, если задан файл."""
+    global PROFILER, scope
+    if PROFILER is not None and PROFILER.dump_path is not None:
+        PROFILER.dump()
+        atexit.unregister(disable)
+    PROFILER = None
+    scope = null_scope
+
+
+def end_frame():
+    if PROFILER is not None:
+        PROFILER.end_frame()
@@ -0,0 +1,304 @@
+"""
+Хранилище профилей команд (saved_teams.json).
+
+Файл читается один раз, дальше меню работает с индексом в памяти. Изменения пишутся
+отложенно фоновым потоком: несколько правок подряд дают одну запись. Файл всегда
+заменяется целиком через временный файл и os.replace, поэтому падение посреди записи
+оставляет на диске прежнюю или новую версию, но не обрывок. Запись защищена файловой
+блокировкой, и под ней файл (и журнал) перечитываются с диска, а поверх накладываются ещё
+не записанные свои правки – два запущенных экземпляра игры не стирают профили друг друга.
+
+С journal=True каждая правка сразу дописывается строкой в журнал рядом с файлом
+(saved_teams.json.journal), а полная перезапись выполняется только раз в
+JOURNAL_COMPACT_ENTRIES правок – для тысяч профилей это дешевле, чем переписывать файл на каждое сохранение.
+"""
+import atexit
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+# Через сколько секунд после последней правки она записывается на диск
+FLUSH_DELAY = 0.5
+# После стольких строк журнала он сворачивается в основной файл
+JOURNAL_COMPACT_ENTRIES = 1000
+
+
+class FileLock:
+    """Межпроцессная блокировка на отдельном файле path (fcntl или msvcrt, иначе только внутри процесса)."""
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, "a+b")
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        elif msvcrt is not None:
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        self.file.close()
+        self.file = None
+
+
+def atomic_write(path, data):
+    """Записывает bytes в path: временный файл в том же каталоге, fsync, затем os.replace."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix="." + os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        # Переименование тоже должно пережить отключение питания
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def apply_entry(data, entry):
+    """Применяет правку (строку журнала) к данным файла."""
+    op = entry["op"]
+    if op == "put":
+        data["profiles"][entry["name"]] = entry["profile"]
+    elif op == "delete":
+        data["profiles"].pop(entry["name"], None)
+    elif op == "last_config":
+        data["last_config"] = entry["config"]
+
+
+class ProfileStore:
+    """
+    Профили {имя: {"fleet": [...], "team_name": ...}} и последняя конфигурация меню.
+    Чтение – из памяти; get() и last_config() отдают копии, чтобы правки меню не меняли хранилище без put().
+    """
+    def __init__(self, path, journal=False, flush_delay=FLUSH_DELAY):
+        self.path = path
+        self.journal_path = path + ".journal" if journal else None
+        self.lock_path = path + ".lock"
+        self.flush_delay = flush_delay
+        self.data = {}
+        self.sorted_names = None
+        self.journal_entries = 0
+        # Правки, которых ещё нет ни в файле, ни в журнале (накладываются на перечитанный файл)
+        self.pending = []
+        self.dirty = False
+        self.changed_at = 0.0
+        self.closed = False
+        self.cond = threading.Condition()
+        self.write_lock = threading.Lock()  # порядок записей на диск совпадает с порядком правок
+        self.writer = None
+        self.load()
+
+    # ---------- чтение ----------
+
+    def load(self):
+        self.data, self.journal_entries = self.read_saved()
+
+    def read_saved(self, locked=False):
+        """Файл с применённым журналом, как они лежат на диске, и число строк журнала. locked – FileLock уже взят."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {}
+        except (OSError, ValueError) as e:
+            # Испорченный файл не перезаписывается молча – он откладывается в сторону
+            print(f"Saves file {self.path} is unreadable ({e}), moved to {self.path}.bad")
+            os.replace(self.path, self.path + ".bad")
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+        data.setdefault("profiles", {})
+        entries = 0
+        if self.journal_path is not None:
+            entries = self.replay_journal(data, locked)
+        return data, entries
+
+    def replay_journal(self, data, locked=False):
+        try:
+            with open(self.journal_path, "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return 0
+        # Всё после последнего перевода строки – оборванная при падении запись
+        complete = raw[:raw.rfind(b"\n") + 1]
+        if len(complete) != len(raw):
+            if not locked:
+                # Строку мог дописывать другой экземпляр – решение принимается под блокировкой
+                with FileLock(self.lock_path):
+                    return self.replay_journal(data, locked=True)
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(len(complete))
+        # Правки идемпотентны: журнал, уже свёрнутый в файл, можно применить повторно
+        lines = complete.decode("utf-8").splitlines()
+        for line in lines:
+            apply_entry(data, json.loads(line))
+        return len(lines)
+
+    def names(self):
+        """Имена профилей по алфавиту."""
+        with self.cond:
+            if self.sorted_names is None:
+                self.sorted_names = sorted(self.data["profiles"])
+            return list(self.sorted_names)
+
+    def get(self, name):
+        with self.cond:
+            profile = self.data["profiles"].get(name)
+            return copy.deepcopy(profile)
+
+    def __contains__(self, name):
+        with self.cond:
+            return name in self.data["profiles"]
+
+    def __len__(self):
+        with self.cond:
+            return len(self.data["profiles"])
+
+    def last_config(self):
+        with self.cond:
+            return copy.deepcopy(self.data.get("last_config"))
+
+    # ---------- правки ----------
+
+    def put(self, name, profile):
+        self.change({"op": "put", "name": name, "profile": copy.deepcopy(profile)})
+
+    def delete(self, name):
+        """Удаляет профиль; возвращает False, если его не было."""
+        if name not in self:
+            return False
+        self.change({"op": "delete", "name": name})
+        return True
+
+    def set_last_config(self, config):
+        self.change({"op": "last_config", "config": copy.deepcopy(config)})
+
+    def apply(self, entry):
+        apply_entry(self.data, entry)
+        self.sorted_names = None
+
+    def change(self, entry):
+        with self.cond:
+            if self.closed:
+                raise ValueError("Profile store is closed")
+            self.apply(entry)
+            self.pending.append(entry)
+        if self.journal_path is not None:
+            line = (json.dumps(entry) + "\n").encode("utf-8")
+            with self.write_lock, FileLock(self.lock_path):
+                with open(self.journal_path, "ab") as f:
+                    f.write(line)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.journal_entries += 1
+                with self.cond:
+                    # Правка в журнале – при слиянии она придёт из него
+                    self.pending.remove(entry)
+            if self.journal_entries < JOURNAL_COMPACT_ENTRIES:
+                return
+        with self.cond:
+            self.dirty = True
+            self.changed_at = time.monotonic()
+            if self.writer is None:
+                self.writer = threading.Thread(target=self.write_behind, name="profile-store", daemon=True)
+                self.writer.start()
+                atexit.register(self.close)
+            self.cond.notify()
+
+    # ---------- запись ----------
+
+    def write_behind(self):
+        with self.cond:
+            while not self.closed:
+                if not self.dirty:
+                    self.cond.wait()
+                    continue
+                # Правки, пришедшие подряд, дают одну запись
+                remaining = self.changed_at + self.flush_delay - time.monotonic()
+                if remaining > 0:
+                    self.cond.wait(remaining)
+                    continue
+                self.cond.release()
+                try:
+                    self.flush()
+                except OSError as e:
+                    print("Error saving profiles:", e)
+                finally:
+                    self.cond.acquire()
+
+    def flush(self):
+        """
+        Сразу записывает накопленные правки в основной файл (и очищает журнал). Под блокировкой
+        файл и журнал перечитываются: правки другого экземпляра игры сохраняются и видны этому.
+        """
+        with self.write_lock:
+            with self.cond:
+                if not self.dirty:
+                    return
+                # В режиме журнала свои правки уже в журнале (или попадут в него после этой записи)
+                pending = list(self.pending) if self.journal_path is None else []
+                self.dirty = False
+            try:
+                with FileLock(self.lock_path):
+                    merged, _ = self.read_saved(locked=True)
+                    for entry in pending:
+                        apply_entry(merged, entry)
+                    atomic_write(self.path, json.dumps(merged).encode("utf-8"))
+                    if self.journal_path is not None:
+                        # Падение до этой строки безопасно – журнал применится к новому файлу повторно
+                        open(self.journal_path, "wb").close()
+                        self.journal_entries = 0
+            except OSError:
+                with self.cond:
+                    self.dirty = True
+                raise
+            with self.cond:
+                # Правки, сделанные во время записи, остаются поверх слитых данных
+                del self.pending[:len(pending)]
+                self.data = merged
+                for entry in self.pending:
+                    apply_entry(self.data, entry)
+                self.sorted_names = None
+
+    def close(self):
+        """Дописывает отложенные правки и останавливает фоновый поток."""
+        with self.cond:
+            if self.closed:
+                return
+            self.closed = True
+            self.cond.notify()
+        if self.writer is not None:
+            self.writer.join()
+            atexit.unregister(self.close)
+        self.flush()
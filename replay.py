@@ -0,0 +1,295 @@
+"""
+Запись матча и детерминированный повтор.
+
+Формат файла (little-endian):
+    заголовок  – magic b"UQMR", версия (u16), зерно матча (u64), частота шагов (u16),
+                 длина метаданных (u32) и сами метаданные в JSON (флоты, киборги, настройки игры);
+    шаги       – по два байта на шаг: биты управления Team 1 и Team 2 (см. CONTROL_BITS);
+    события    – байт 0x80 | номер команды и индекс выбранного корабля в списке оставшихся,
+                 записывается сразу после шага, в котором погиб корабль;
+    ключевые кадры – байт 0xFE, длина (u32) и снимок состояния (см. snapshot.py), записываются
+                 перед каждым REPLAY_KEYFRAME_INTERVAL-м шагом, начиная с нулевого (с версии 2);
+    итог       – байт 0xFF, длина (u32) и JSON с числом шагов, победителем и хешем состояния.
+Байты управления никогда не содержат старший бит, поэтому шаги и события различимы.
+Ключевые кадры позволяют перейти к любому моменту матча (ReplayReader.seek), пересчитав
+не больше интервала шагов от ближайшего снимка.
+
+Повтор без отрисовки: python -m project.replay файл.rpl
+"""
+import hashlib
+import json
+import struct
+import sys
+from project import snapshot
+from project.config import REPLAY_KEYFRAME_INTERVAL
+from project.ships import SHIP_CLASSES
+from project.simulation import Simulation, ShipControls, TEAMS
+
+MAGIC = b"UQMR"
+VERSION = 2
+READABLE_VERSIONS = (1, 2)
+HEADER = struct.Struct("<4sHQHI")
+LENGTH = struct.Struct("<I")
+CHOICE_MARKER = 0x80
+KEYFRAME_MARKER = 0xFE
+OUTCOME_MARKER = 0xFF
+
+TURN_LEFT = 0x01
+TURN_RIGHT = 0x02
+THRUST = 0x04
+FIRE_PRIMARY = 0x08
+FIRE_SECONDARY = 0x10
+HOLD_PRIMARY = 0x20
+RELEASE_MINE = 0x40
+CONTROL_BITS = (("thrust", THRUST), ("fire_primary", FIRE_PRIMARY), ("fire_secondary", FIRE_SECONDARY),
+                ("hold_primary", HOLD_PRIMARY), ("release_mine", RELEASE_MINE))
+
+
+class ReplayError(Exception):
+    pass
+
+
+def encode_controls(controls):
+    if controls is None:
+        return 0
+    bits = 0
+    if controls.turn < 0:
+        bits |= TURN_LEFT
+    elif controls.turn > 0:
+        bits |= TURN_RIGHT
+    for name, bit in CONTROL_BITS:
+        if getattr(controls, name):
+            bits |= bit
+    return bits
+
+
+def decode_controls(bits):
+    controls = ShipControls()
+    if bits & TURN_LEFT:
+        controls.turn = -1
+    elif bits & TURN_RIGHT:
+        controls.turn = 1
+    for name, bit in CONTROL_BITS:
+        setattr(controls, name, bool(bits & bit))
+    return controls
+
+
+def ship_name(ship_class):
+    for name, cls in SHIP_CLASSES.items():
+        if cls is ship_class:
+            return name
+    raise ReplayError(f"Ship class {ship_class.__name__} is not registered")
+
+
+def state_hash(sim):
+    """Короткий хеш состояния мира – для проверки, что повтор совпал с записью."""
+    state = [sim.game_time, sim.winner]
+    for ship in (sim.ship1, sim.ship2):
+        state.append((ship.name, ship.x, ship.y, ship.vx, ship.vy, ship.angle, ship.crew, ship.energy))
+    state.extend((m.x, m.y, m.vx, m.vy, m.active) for m in sim.missiles)
+    state.extend((a.x, a.y, a.vx, a.vy) for a in sim.asteroids)
+    return hashlib.sha256(repr(state).encode()).hexdigest()[:16]
+
+
+class ReplayWriter:
+    def __init__(self, path, sim, tick_rate, meta=None, keyframe_interval=REPLAY_KEYFRAME_INTERVAL):
+        """
+        Открывает файл записи для симуляции sim, которая ещё не сделала ни одного шага.
+        meta – дополнительные сведения (например, настройки игры для отрисовки повтора).
+        keyframe_interval – через сколько шагов записывается снимок состояния (0 – без снимков).
+        """
+        self.sim = sim
+        self.ticks = 0
+        self.keyframe_interval = keyframe_interval
+        meta = dict(meta or {})
+        meta["fleets"] = {
+            "Team 1": [ship_name(type(sim.ship1))] + [ship_name(cls) for cls in sim.team1_remaining],
+            "Team 2": [ship_name(type(sim.ship2))] + [ship_name(cls) for cls in sim.team2_remaining],
+        }
+        meta["cyborgs"] = sim.cyborgs
+        blob = json.dumps(meta).encode("utf-8")
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, sim.seed, tick_rate, len(blob)))
+        self.file.write(blob)
+        sim.recorder = self
+
+    def record_tick(self, inputs):
+        if self.keyframe_interval and self.ticks % self.keyframe_interval == 0:
+            blob = snapshot.capture(self.sim)
+            self.file.write(bytes((KEYFRAME_MARKER,)) + LENGTH.pack(len(blob)) + blob)
+        self.file.write(bytes((encode_controls(inputs.get("Team 1")), encode_controls(inputs.get("Team 2")))))
+        self.ticks += 1
+
+    def record_choice(self, team, index):
+        self.file.write(bytes((CHOICE_MARKER | TEAMS.index(team), index)))
+
+    def close(self):
+        if self.file.closed:
+            return
+        outcome = {"ticks": self.ticks, "winner": self.sim.winner, "hash": state_hash(self.sim)}
+        blob = json.dumps(outcome).encode("utf-8")
+        self.file.write(bytes((OUTCOME_MARKER,)) + LENGTH.pack(len(blob)) + blob)
+        self.file.close()
+        self.sim.recorder = None
+
+
+class ReplayReader:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = f.read()
+        if len(self.data) < HEADER.size:
+            raise ReplayError(f"{path}: file is too short")
+        magic, version, self.seed, self.tick_rate, meta_len = HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            raise ReplayError(f"{path}: not a replay file")
+        if version not in READABLE_VERSIONS:
+            raise ReplayError(f"{path}: unsupported replay version {version}")
+        start = HEADER.size
+        self.meta = json.loads(self.data[start:start + meta_len].decode("utf-8"))
+        self.pos = start + meta_len
+        self.ticks = 0
+        self.outcome = None
+        self.keyframes = self.index_keyframes()
+
+    def index_keyframes(self):
+        """Список (шаг, смещение снимка, смещение после снимка) всех ключевых кадров файла."""
+        keyframes = []
+        data = self.data
+        pos = self.pos
+        ticks = 0
+        while pos < len(data):
+            marker = data[pos]
+            if marker == OUTCOME_MARKER:
+                break
+            if marker == KEYFRAME_MARKER:
+                (length,) = LENGTH.unpack_from(data, pos + 1)
+                start = pos + 1 + LENGTH.size
+                keyframes.append((ticks, start, start + length))
+                pos = start + length
+                continue
+            if not marker & CHOICE_MARKER:
+                ticks += 1
+            pos += 2
+        return keyframes
+
+    def build_simulation(self):
+        fleets = self.meta["fleets"]
+        return Simulation([SHIP_CLASSES[name] for name in fleets["Team 1"]],
+                          [SHIP_CLASSES[name] for name in fleets["Team 2"]],
+                          cyborgs=self.meta.get("cyborgs"), select_replacement=self.next_choice,
+                          seed=self.seed)
+
+    def read_outcome(self):
+        (length,) = LENGTH.unpack_from(self.data, self.pos + 1)
+        start = self.pos + 1 + LENGTH.size
+        self.outcome = json.loads(self.data[start:start + length].decode("utf-8"))
+        self.pos = len(self.data)
+
+    def skip_keyframe(self):
+        (length,) = LENGTH.unpack_from(self.data, self.pos + 1)
+        self.pos += 1 + LENGTH.size + length
+
+    def next_inputs(self):
+        """Управление следующего шага или None, если запись закончилась."""
+        while self.pos < len(self.data) and self.data[self.pos] == KEYFRAME_MARKER:
+            self.skip_keyframe()
+        if self.pos < len(self.data) and self.data[self.pos] == OUTCOME_MARKER:
+            self.read_outcome()
+        if self.pos + 2 > len(self.data):
+            return None
+        team1, team2 = self.data[self.pos], self.data[self.pos + 1]
+        if team1 & CHOICE_MARKER:
+            raise ReplayError(f"Unexpected ship choice at tick {self.ticks}")
+        self.pos += 2
+        self.ticks += 1
+        return {"Team 1": decode_controls(team1), "Team 2": decode_controls(team2)}
+
+    def seek(self, sim, tick):
+        """
+        Переводит sim (построенную build_simulation) к шагу tick: восстанавливает ближайший
+        предшествующий ключевой кадр и досчитывает оставшиеся шаги. Без подходящего кадра
+        (запись версии 1) вперёд считается от текущего шага. Возвращает достигнутый шаг.
+        """
+        keyframe = None
+        for frame in self.keyframes:
+            if frame[0] > tick:
+                break
+            keyframe = frame
+        if keyframe is not None and (tick < self.ticks or keyframe[0] > self.ticks):
+            ticks, start, end = keyframe
+            snapshot.restore(sim, self.data[start:end])
+            self.ticks = ticks
+            self.pos = end
+            self.outcome = None
+        elif tick < self.ticks:
+            raise ReplayError(f"Cannot seek back to tick {tick}: the replay has no keyframes")
+        dt = 1.0 / self.tick_rate
+        while self.ticks < tick and not sim.finished:
+            inputs = self.next_inputs()
+            if inputs is None:
+                break
+            sim.step(dt, inputs)
+        return self.ticks
+
+    def next_choice(self, team, remaining):
+        if self.pos + 2 > len(self.data) or self.data[self.pos] != CHOICE_MARKER | TEAMS.index(team):
+            raise ReplayError(f"Replay diverged: no ship choice for {team} at tick {self.ticks}")
+        index = self.data[self.pos + 1]
+        self.pos += 2
+        return remaining[index]
+
+    def finish(self):
+        """Дочитывает записанный итог, если он остался после последнего шага."""
+        if self.outcome is None and self.pos < len(self.data) and self.data[self.pos] == OUTCOME_MARKER:
+            self.read_outcome()
+
+    def verify(self, sim):
+        """Сравнивает итог повтора с записанным. Возвращает текст расхождения или None."""
+        if self.outcome is None:
+            return None
+        actual = {"ticks": self.ticks, "winner": sim.winner, "hash": state_hash(sim)}
+        if actual != self.outcome:
+            return f"recorded {self.outcome}, replayed {actual}"
+        return None
+
+
+def play_headless(path):
+    """Пересчитывает матч без отрисовки с максимальной скоростью, возвращает (reader, sim)."""
+    reader = ReplayReader(path)
+    sim = reader.build_simulation()
+    dt = 1.0 / reader.tick_rate
+    while not sim.finished:
+        inputs = reader.next_inputs()
+        if inputs is None:
+            break
+        sim.step(dt, inputs)
+    reader.finish()
+    return reader, sim
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("usage: python -m project.replay FILE [--seek TICK]")
+        return 2
+    if "--seek" in argv:
+        # Переход к шагу через ключевые кадры, без пересчёта матча с начала
+        tick = int(argv[argv.index("--seek") + 1])
+        reader = ReplayReader(argv[0])
+        sim = reader.build_simulation()
+        reader.seek(sim, tick)
+        print(f"Tick: {reader.ticks}  Time: {sim.game_time:.1f}s  State: {state_hash(sim)}")
+        return 0
+    reader, sim = play_headless(argv[0])
+    print(f"Ticks: {reader.ticks}  Winner: {sim.winner}  State: {state_hash(sim)}")
+    mismatch = reader.verify(sim)
+    if mismatch:
+        print("Replay DIVERGED:", mismatch)
+        return 1
+    if reader.outcome is not None:
+        print("Replay matches the recording.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,2 +1,3 @@
 # project/ships/__init__.py
-from .registry import SHIP_CLASSES
\ No newline at end of file
+from .registry import SHIP_CLASSES
+from .metadata import SHIP_INFO, ShipInfo, fleet_cost
\ No newline at end of file
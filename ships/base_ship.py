@@ -1,11 +1,58 @@
 import math
-import pygame  # Добавлено для отрисовки
 from project.config import FIELD_W, FIELD_H
 from project.utils import wrap_position, wrap_delta
 
+def apply_thrust(ship, dt):
+    """
+    Тяга с удержанием клавиши: импульс thrust_increment раз в thrust_wait секунд.
+    Выше max_thrust тяга вперёд не разгоняет (кроме гравитационного манёвра), торможение вдвое сильнее.
+    Работает с любым объектом с полями корабля – им пользуется и прогноз планировщика AI.
+    """
+    ship.thrust_timer += dt
+    while ship.thrust_timer >= ship.thrust_wait:
+        rad = math.radians(ship.angle)
+        thrust_dx = math.sin(rad)
+        thrust_dy = -math.cos(rad)
+        speed = math.hypot(ship.vx, ship.vy)
+        if speed > ship.max_thrust and (speed > 0 and (
+                ship.vx * thrust_dx + ship.vy * thrust_dy) / speed > 0) and not ship.in_gravity_field:
+            ship.thrust_timer -= ship.thrust_wait
+            continue
+        if (ship.vx * thrust_dx + ship.vy * thrust_dy) / max(speed, 1) < 0:
+            braking_multiplier = 2.0
+            ship.vx += braking_multiplier * ship.thrust_increment * thrust_dx
+            ship.vy += braking_multiplier * ship.thrust_increment * thrust_dy
+        else:
+            ship.vx += ship.thrust_increment * thrust_dx
+            ship.vy += ship.thrust_increment * thrust_dy
+        ship.thrust_timer -= ship.thrust_wait
+
+
 class BaseShip:
+    # Все поля экземпляра объявлены заранее: без __dict__ корабль меньше, а доступ к полям быстрее
+    __slots__ = ("id", "x", "y", "vx", "vy", "color", "radius", "angle", "spawn_timer", "active_lasers",
+                 "crew", "energy", "energy_timer", "weapon_timer", "special_timer", "thrust_timer",
+                 "in_gravity_field", "accelerating", "dead", "last_planet_collision", "ai_controller")
     next_id = 1  # Статическая переменная для уникального идентификатора
 
+    # Характеристики по умолчанию; у настоящих кораблей их заменяет запись из ship_stats.json
+    # (см. project.ships.stats.apply_stats) – общая для всех экземпляров класса
+    stats = None
+    name = "BaseShip"
+    cost = 10
+    max_crew = 10
+    max_energy = 10
+    energy_regeneration = 1
+    energy_wait = 1.0
+    weapon_energy_cost = 1
+    weapon_wait = 1.0
+    special_energy_cost = 1
+    special_wait = 1.0
+    max_thrust = 20.0
+    thrust_increment = 3.0
+    thrust_wait = 0.1
+    turn_speed = 90.0
+
     def __init__(self, x, y, color):
         # Присваиваем уникальный ID каждому кораблю
         self.id = BaseShip.next_id
@@ -21,28 +68,13 @@ class BaseShip:
         self.spawn_timer = 1.0
         self.active_lasers = []
 
-        # Общие параметры (будут переопределяться в наследниках)
-        self.name = "BaseShip"
-        self.max_crew = 10
-        self.crew = 10
-        self.max_energy = 10
-        self.energy = 10
-        self.energy_regeneration = 1
-        self.energy_wait = 1.0
+        # Изменяемое состояние; постоянные характеристики – атрибуты класса
+        self.crew = self.max_crew
+        self.energy = self.max_energy
         self.energy_timer = self.energy_wait
-
-        self.weapon_energy_cost = 1
-        self.weapon_wait = 1.0
         self.weapon_timer = 0
-
-        self.special_energy_cost = 1
-        self.special_wait = 1.0
         self.special_timer = 0
-
-        self.max_thrust = 20.0
-        self.thrust_increment = 3.0
-        self.thrust_wait = 0.1
-        self.turn_speed = 90.0
+        self.thrust_timer = 0
 
         # Флаг гравитационного манёвра (разрешает превышение max_thrust)
         self.in_gravity_field = False
@@ -53,6 +85,10 @@ class BaseShip:
         # Новый атрибут, указывающий на смерть корабля
         self.dead = False
 
+        # Время последнего урона от планеты и контроллер AI (назначает Simulation)
+        self.last_planet_collision = 0
+        self.ai_controller = None
+
     def update(self, dt):
         # Обновляем положение
         self.x += self.vx * dt
@@ -110,22 +146,21 @@ class BaseShip:
     def active(self):
         return not self.dead
 
+    def keeps(self, projectile):
+        """Держит ли корабль ссылку на свой снаряд (такой погибший снаряд нельзя вернуть в пул)."""
+        return False
+
     # Новый метод: отрисовка корабля с носом.
     def draw(self, screen, cam, zoom):
         from project.utils import world_to_screen
+        from project.sprites import ship_sprite
         # Получаем экранные координаты
         sx, sy = world_to_screen(self.x, self.y, cam.x, cam.y, zoom)
         # Вычисляем радиус с учётом зума
         radius = int(self.radius * zoom)
-        # Отрисовываем тело корабля (круг)
-        pygame.draw.circle(screen, self.color, (sx, sy), radius)
-        # Вычисляем позицию носа (направление, заданное углом корабля)
-        rad = math.radians(self.angle)
-        nose_length = radius  # можно увеличить, если хочется более длинный нос
-        nose_x = sx + int(nose_length * math.sin(rad))
-        nose_y = sy - int(nose_length * math.cos(rad))
-        # Отрисовываем нос (линия)
-        pygame.draw.line(screen, (255, 255, 255), (sx, sy), (nose_x, nose_y), 2)
+        # Тело корабля (круг) и нос по направлению угла – готовый спрайт из общего кэша
+        sprite, half = ship_sprite(radius, self.color, self.angle)
+        screen.blit(sprite, (sx - half, sy - half))
 
     # Унифицированные методы вооружения – должны быть переопределены в наследниках
     def fire_primary(self, enemy, game_time):
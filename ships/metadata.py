@@ -0,0 +1,25 @@
+# project/ships/metadata.py
+from collections import namedtuple
+from project.ships.registry import SHIP_CLASSES
+
+# Характеристики корабля, нужные меню и инструментам, без создания корабля
+ShipInfo = namedtuple("ShipInfo", ["name", "cost", "crew", "max_crew", "energy", "max_energy",
+                                   "energy_regeneration", "energy_wait", "weapon_energy_cost",
+                                   "special_energy_cost", "max_thrust", "thrust_increment",
+                                   "thrust_wait", "turn_speed"])
+
+
+def describe(ship_class):
+    """Характеристики класса корабля по его записи ShipStats; корабль начинает бой с полным экипажем и энергией."""
+    stats = ship_class.stats
+    return ShipInfo(crew=stats.max_crew, energy=stats.max_energy,
+                    **{field: getattr(stats, field) for field in ShipInfo._fields if field not in ("crew", "energy")})
+
+
+# Таблица строится один раз при импорте: {имя корабля: ShipInfo}
+SHIP_INFO = {name: describe(ship_class) for name, ship_class in SHIP_CLASSES.items()}
+
+
+def fleet_cost(fleet):
+    """Сумма стоимостей кораблей флота (пустые слоты и неизвестные имена не считаются)."""
+    return sum(SHIP_INFO[name].cost for name in fleet if name in SHIP_INFO)
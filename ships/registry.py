@@ -2,9 +2,13 @@
 from project.ships.ship_a import ShipA
 from project.ships.ship_b import ShipB
 from project.ships.ship_terminator import ShipTerminator
+from project.ships.stats import load_stats, apply_stats
 
 SHIP_CLASSES = {
     "Earthling Cruiser": ShipA,
     "KOHR-AH MARAUDER": ShipB,
     "YEHAT TERMINATOR": ShipTerminator,
 }
+
+# Характеристики кораблей – из ship_stats.json рядом с реестром
+apply_stats(SHIP_CLASSES, load_stats())
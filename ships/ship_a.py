@@ -1,35 +1,13 @@
 import math
-import pygame
 from project.ships.base_ship import BaseShip
-from project.config import FIELD_W, FIELD_H
-from project.utils import wrap_delta, wrap_position, world_to_screen
+from project.utils import wrap_position, world_to_screen
+from project.torus import offsets
 
 class ShipA(BaseShip):
+    __slots__ = ()
+
     def __init__(self, x, y, color):
         super().__init__(x, y, color)
-        self.name = "Earthling Cruiser"
-        self.max_crew = 18
-        self.crew = 18
-        self.max_energy = 18
-        self.energy = 18
-        self.energy_regeneration = 1
-        self.energy_wait = 8 / 60.0
-        self.energy_timer = self.energy_wait
-
-        self.weapon_energy_cost = 9
-        self.weapon_wait = 10 / 60.0
-        self.weapon_timer = 0
-
-        self.special_energy_cost = 4
-        self.special_wait = 9 / 60.0
-        self.special_timer = 0
-
-        self.max_thrust = 70.0
-        self.thrust_increment = 4.0
-        self.thrust_wait = 11 / 60.0
-        self.turn_speed = 180.0
-
-        self.cost = self.max_crew  # Устанавливаем стоимость
 
     def fire_primary(self, enemy, game_time):
         # Запуск ракеты (старый fire_missile)
@@ -42,7 +20,7 @@ class ShipA(BaseShip):
             missile_vx = self.vx + 50 * math.sin(rad)
             missile_vy = self.vy - 50 * math.cos(rad)
             from project.entities.missile import Missile
-            missile = Missile(front_x, front_y, missile_vx, missile_vy, enemy, game_time)
+            missile = Missile.spawn(front_x, front_y, missile_vx, missile_vy, enemy, game_time)
             missile.owner = self
             return missile
         return None
@@ -51,9 +29,8 @@ class ShipA(BaseShip):
         # Лазерная защита (старый fire_laser_defense)
         laser_range = self.radius * 2.2 * 2
         valid_targets = []
-        for target in targets:
-            dx = wrap_delta(self.x, target.x, FIELD_W)
-            dy = wrap_delta(self.y, target.y, FIELD_H)
+        dxs, dys = offsets(self.x, self.y, [target.x for target in targets], [target.y for target in targets])
+        for target, dx, dy in zip(targets, dxs, dys):
             distance = math.hypot(dx, dy)
             effective_distance = distance - getattr(target, 'radius', 0)
             if effective_distance <= laser_range:
@@ -84,6 +61,7 @@ class ShipA(BaseShip):
         Лазер рисуется от текущего положения корабля до точки попадания.
         Используется функция world_to_screen для преобразования координат.
         """
+        import pygame
         for (tx, ty, t) in self.active_lasers:
             # Отрисовываем луч только, если время жизни (t) больше нуля
             if t > 0:
@@ -5,35 +5,13 @@ from project.utils import wrap_delta, wrap_position
 from project.entities.mine import Mine, Plasmoid
 
 class ShipB(BaseShip):
+    __slots__ = ("deployed_mines", "current_mine")
+
     def __init__(self, x, y, color):
         super().__init__(x, y, color)
-        self.name = "KOHR-AH MARAUDER"
-        self.max_crew = 42
-        self.crew = 42
-        self.max_energy = 42
-        self.energy = 42
-        self.energy_regeneration = 1
-        self.energy_wait = 4 / 60.0
-        self.energy_timer = self.energy_wait
-
-        self.weapon_energy_cost = 6
-        self.weapon_wait = 6 / 60.0
-        self.weapon_timer = 0
-
-        self.special_energy_cost = 21
-        self.special_wait = 9 / 60.0
-        self.special_timer = 0
-
-        self.max_thrust = 70.0
-        self.thrust_increment = 3.0
-        self.thrust_wait = 11 / 60.0
-        self.turn_speed = 90.0
-
         self.deployed_mines = []  # Фиксированные мины
         self.current_mine = None  # Мина в режиме запуска
 
-        self.cost = self.max_crew  # Стоимость корабля
-
     def start_mine_launch(self, enemy, game_time):
         if self.current_mine is None and self.weapon_timer <= 0 and self.energy >= self.weapon_energy_cost:
             self.energy -= self.weapon_energy_cost
@@ -43,7 +21,7 @@ class ShipB(BaseShip):
             front_y = self.y - self.radius * math.cos(rad)
             mine_vx = self.vx + 150 * math.sin(rad)
             mine_vy = self.vy - 150 * math.cos(rad)
-            mine = Mine(front_x, front_y, mine_vx, mine_vy, enemy, game_time, launching=True)
+            mine = Mine.spawn(front_x, front_y, mine_vx, mine_vy, enemy, game_time, launching=True)
             mine.owner = self
             self.current_mine = mine
             return mine
@@ -78,11 +56,14 @@ class ShipB(BaseShip):
         for i in range(16):
             angle_deg = i * 22.5
             rad = math.radians(angle_deg)
-            p = Plasmoid(rad, ring_start_time, orbit_speed=50.0, lifetime=1.0)
+            p = Plasmoid.spawn(rad, ring_start_time, orbit_speed=50.0, lifetime=1.0)
             p.owner = self
             plasmoids.append(p)
         return plasmoids
 
+    def keeps(self, projectile):
+        return projectile is self.current_mine or projectile in self.deployed_mines
+
     def update(self, dt):
         super().update(dt)
         if self.current_mine and not self.current_mine.active:
@@ -4,34 +4,12 @@ from project.config import FIELD_W, FIELD_H
 from project.utils import wrap_position, wrap_delta
 
 class ShipTerminator(BaseShip):
+    __slots__ = ("shield_timer",)
+
     def __init__(self, x, y, color):
         super().__init__(x, y, color)
-        self.name = "YEHAT TERMINATOR"
-        self.max_crew = 20
-        self.crew = 20
-        self.max_energy = 10
-        self.energy = 10
-        self.energy_regeneration = 2
-        self.energy_wait = 6 / 60.0
-        self.energy_timer = self.energy_wait
-
-        self.weapon_energy_cost = 1
-        self.weapon_wait = 0 / 60.0
-        self.weapon_timer = 0
-
-        self.special_energy_cost = 3
-        self.special_wait = 2 / 60.0
-        self.special_timer = 0
-
-        self.max_thrust = 30.0
-        self.thrust_increment = 6.0
-        self.thrust_wait = 2 / 60.0
-        self.turn_speed = 90.0
-
         self.shield_timer = 0
 
-        self.cost = self.max_crew  # Стоимость корабля
-
     def fire_primary(self, enemy, game_time):
         if self.weapon_timer <= 0 and self.energy >= self.weapon_energy_cost:
             self.energy -= self.weapon_energy_cost
@@ -51,10 +29,10 @@ class ShipTerminator(BaseShip):
             missile_vx = self.vx + forward_x * missile_speed
             missile_vy = self.vy + forward_y * missile_speed
             from project.entities.missile import Missile
-            missile_left = Missile(left_x, left_y, missile_vx, missile_vy, None, game_time)
+            missile_left = Missile.spawn(left_x, left_y, missile_vx, missile_vy, None, game_time)
             missile_left.damage = 1
             missile_left.owner = self
-            missile_right = Missile(right_tip_x, right_tip_y, missile_vx, missile_vy, None, game_time)
+            missile_right = Missile.spawn(right_tip_x, right_tip_y, missile_vx, missile_vy, None, game_time)
             missile_right.damage = 1
             missile_right.owner = self
             return [missile_left, missile_right]
@@ -0,0 +1,80 @@
+# project/ships/stats.py
+"""
+Характеристики кораблей из ship_stats.json.
+
+Для каждого корабля собирается одна запись ShipStats, общая для всех его экземпляров.
+Запись и её поля становятся атрибутами класса корабля, поэтому экземпляр хранит только
+изменяемое состояние (экипаж, энергию, таймеры), а код кораблей читает self.max_thrust как раньше.
+Задержки в файле – в кадрах исходной игры (1/60 с), в записи – в секундах.
+"""
+import json
+import os
+
+STATS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ship_stats.json")
+FRAMES_PER_SECOND = 60.0
+WAIT_FIELDS = ("energy_wait", "weapon_wait", "special_wait", "thrust_wait")
+
+
+class StatsError(Exception):
+    pass
+
+
+class ShipStats:
+    __slots__ = ("name", "cost", "max_crew", "max_energy", "energy_regeneration", "energy_wait",
+                 "weapon_energy_cost", "weapon_wait", "special_energy_cost", "special_wait",
+                 "max_thrust", "thrust_increment", "thrust_wait", "turn_speed")
+
+    def __init__(self, **fields):
+        missing = set(self.__slots__) - set(fields)
+        if missing:
+            raise StatsError(f"Ship '{fields.get('name')}': missing stats {sorted(missing)}")
+        for field, value in fields.items():
+            setattr(self, field, value)
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def replace(self, **changes):
+        """Копия записи с изменёнными полями (для подбора баланса)."""
+        return ShipStats(**{**self.as_dict(), **changes})
+
+    def __repr__(self):
+        return f"ShipStats({', '.join(f'{k}={v!r}' for k, v in self.as_dict().items())})"
+
+
+def read_stats_file(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        raise StatsError(f"Cannot read ship stats from {path}: {e}")
+
+
+def parse_stats(data):
+    """{имя корабля: поля как в ship_stats.json} -> {имя корабля: ShipStats}."""
+    stats = {}
+    for name, fields in data.items():
+        unknown = set(fields) - set(ShipStats.__slots__)
+        if unknown:
+            raise StatsError(f"Ship '{name}': unknown stats {sorted(unknown)}")
+        fields = dict(fields, name=name)
+        for field in WAIT_FIELDS:
+            if field in fields:
+                fields[field] = fields[field] / FRAMES_PER_SECOND
+        stats[name] = ShipStats(**fields)
+    return stats
+
+
+def load_stats(path=STATS_FILE):
+    return parse_stats(read_stats_file(path))
+
+
+def apply_stats(ship_classes, stats):
+    """Назначает классам кораблей ({имя: класс}) их записи характеристик."""
+    for name, ship_class in ship_classes.items():
+        if name not in stats:
+            raise StatsError(f"No stats for ship '{name}'")
+        record = stats[name]
+        ship_class.stats = record
+        for field in ShipStats.__slots__:
+            setattr(ship_class, field, getattr(record, field))
@@ -0,0 +1,400 @@
+import math
+import random
+
+from project.config import FIELD_W, FIELD_H, GAME_SCREEN_W, SCREEN_H
+from project.utils import spawn_ship, wrap_delta, world_to_screen
+from project.gravity import FIELD as GRAVITY
+from project import profiler
+from project.perception import Perception
+from project.entities.planet import Planet
+from project.entities.asteroid import Asteroid
+from project.entities.camera import Camera
+from project.entities.mine import Plasmoid
+from project.entities.projectile import POOL
+from project.entities.projectile_bank import BANK
+from project.collisions import (handle_planet_collision, handle_ship_asteroid_collision,
+                                handle_ship_ship_collision, handle_asteroid_collision)
+from project.ai_controller import EarthlingAIController, PlannerAIController
+from project.ships.base_ship import apply_thrust
+from project import torus
+
+TEAMS = ("Team 1", "Team 2")
+TEAM_COLORS = {"Team 1": (255, 100, 100), "Team 2": (100, 200, 255)}
+
+
+def remove_inactive(items, retired=None):
+    """
+    Убирает неактивные объекты из списка на месте, без нового списка. Порядок оставшихся сохраняется:
+    от него зависит порядок обработки столкновений, а значит и исход матча.
+    Для каждого убранного объекта вызывается retired(obj).
+    """
+    kept = 0
+    for item in items:
+        if item.active:
+            items[kept] = item
+            kept += 1
+        elif retired is not None:
+            retired(item)
+    del items[kept:]
+
+
+class ShipControls:
+    """
+    Управляющие сигналы одного корабля на один шаг симуляции.
+    turn: -1 – поворот влево, 1 – вправо, 0 – без поворота.
+    fire_primary / fire_secondary – клавиша оружия нажата в этом шаге,
+    hold_primary – клавиша основного оружия удерживается,
+    release_mine – клавиша основного оружия отпущена (сброс мины).
+    """
+    def __init__(self, turn=0, thrust=False, fire_primary=False, fire_secondary=False,
+                 hold_primary=False, release_mine=False):
+        self.turn = turn
+        self.thrust = thrust
+        self.fire_primary = fire_primary
+        self.fire_secondary = fire_secondary
+        self.hold_primary = hold_primary
+        self.release_mine = release_mine
+
+    def held(self):
+        """Копия только с удерживаемыми клавишами – для следующих шагов того же кадра."""
+        return ShipControls(turn=self.turn, thrust=self.thrust, hold_primary=self.hold_primary)
+
+    def take_edges(self, other):
+        """Добавляет нажатия и отпускания из other, которые ещё не попали ни в один шаг."""
+        self.fire_primary = self.fire_primary or other.fire_primary
+        self.fire_secondary = self.fire_secondary or other.fire_secondary
+        self.release_mine = self.release_mine or other.release_mine
+
+
+class Simulation:
+    def __init__(self, team1_fleet, team2_fleet, cyborgs=None, select_replacement=None, seed=None,
+                 ai_time_budget=None, ai_worker=None):
+        """
+        Игровой мир без pygame: корабли, астероиды, снаряды, планета и игровое время.
+        team1_fleet / team2_fleet – списки классов кораблей, первый корабль списка выходит в бой первым.
+        cyborgs – словарь {команда: сложность} для команд под управлением AI.
+        select_replacement(team, remaining) – выбор класса корабля на замену погибшему,
+        по умолчанию выбирается случайный корабль из оставшихся.
+        seed – зерно матча. Все случайные решения (позиции кораблей, астероиды, уклонения AI)
+        выводятся из него через next_rng(), поэтому матч с тем же зерном и тем же управлением
+        повторяется в точности.
+        ai_time_budget – предел времени планировщика Hard за шаг, секунды. С ним решения AI
+        зависят от скорости машины, поэтому задаётся только для игры без записи.
+        ai_worker – AIWorker: планировщик Hard работает вне основного потока (тоже только без записи).
+        """
+        self.cyborgs = dict(cyborgs or {})
+        self.ai_time_budget = ai_time_budget
+        self.ai_worker = ai_worker
+        self.select_replacement = select_replacement or self.random_replacement
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng_events = {}
+        rng = self.next_rng("setup")
+        self.rotation_axis = rng.choice((-1, 1))
+        # Запись матча (ReplayWriter), получает управление каждого шага и выборы кораблей
+        self.recorder = None
+
+        self.team1_remaining = list(team1_fleet)
+        self.team2_remaining = list(team2_fleet)
+        self.ship1 = self.spawn_team_ship("Team 1", self.team1_remaining.pop(0))
+        self.ship2 = self.spawn_team_ship("Team 2", self.team2_remaining.pop(0))
+
+        self.planet = Planet(FIELD_W / 2, FIELD_H / 2, 30, (180, 180, 180))
+        self.cam = Camera(FIELD_W / 2, FIELD_H / 2)
+        self.cam.zoom = self.cam.framing_zoom(self.ship1, self.ship2)
+
+        self.asteroids = []
+        for _ in range(5):
+            x = rng.uniform(0, FIELD_W)
+            y = rng.uniform(0, FIELD_H)
+            radius = rng.randint(8, 12)
+            vx = rng.uniform(-50, 50)
+            vy = rng.uniform(-50, 50)
+            color = (200, 200, 200)
+            self.asteroids.append(Asteroid(x, y, radius, vx, vy, color, rng, self.rotation_axis))
+
+        self.missiles = []
+        self.game_time = 0
+        self.winner = None
+        self.finished = False
+
+        # Общее хранилище снарядов: пакетное обновление (NumPy, если доступен)
+        self.projectile_bank = BANK
+        # Куда возвращаются погибшие снаряды; None – не переиспользовать (так делает save_state)
+        self.projectile_pool = POOL
+
+    def next_rng(self, stream):
+        """
+        Генератор для одного случайного события. Он выводится из зерна матча, имени потока
+        и номера события в потоке, поэтому снимку состояния достаточно счётчиков rng_events.
+        Выбор замены идёт отдельным потоком: при повторе выбор берётся из записи
+        и не сдвигает остальные потоки.
+        """
+        count = self.rng_events.get(stream, 0) + 1
+        self.rng_events[stream] = count
+        return random.Random(f"{self.seed}:{stream}:{count}")
+
+    def spawn_team_ship(self, team, ship_class):
+        rng = self.next_rng("spawn")
+        sx, sy = spawn_ship(rng)
+        ship = ship_class(sx, sy, TEAM_COLORS[team])
+        if team in self.cyborgs and self.cyborgs[team] == "Hard":
+            ship.ai_controller = PlannerAIController(ship, seed=rng.getrandbits(32),
+                                                     time_budget=self.ai_time_budget)
+        elif team in self.cyborgs:
+            ship.ai_controller = EarthlingAIController(ship, difficulty=self.cyborgs[team],
+                                                       seed=rng.getrandbits(32))
+        else:
+            ship.ai_controller = None
+        return ship
+
+    def random_replacement(self, team, remaining):
+        return self.next_rng("replacement").choice(remaining)
+
+    def add_projectiles(self, fired):
+        if not fired:
+            return
+        if isinstance(fired, list):
+            self.missiles.extend(fired)
+        else:
+            self.missiles.append(fired)
+
+    def apply_controls(self, ship, enemy, controls, dt):
+        # Управление игроком; кораблями под управлением AI занимается их контроллер
+        if controls is None or ship.ai_controller is not None:
+            return
+        if controls.fire_primary:
+            self.add_projectiles(ship.fire_primary(enemy, self.game_time))
+        if controls.fire_secondary:
+            self.add_projectiles(ship.fire_secondary([enemy] + self.asteroids + self.missiles, self.game_time))
+        if controls.release_mine and hasattr(ship, 'release_mine'):
+            mine = ship.release_mine()
+            if mine and mine not in self.missiles:
+                self.missiles.append(mine)
+        if controls.hold_primary and getattr(ship, 'current_mine', None) is not None:
+            if ship.current_mine not in self.missiles:
+                self.missiles.append(ship.current_mine)
+        if controls.turn:
+            ship.angle = (ship.angle + controls.turn * ship.turn_speed * dt) % 360
+        if controls.thrust:
+            self.apply_thrust(ship, dt)
+
+    def apply_thrust(self, ship, dt):
+        apply_thrust(ship, dt)
+
+    def gravity_wells(self):
+        """Тела, притягивающие корабли и запускаемые мины."""
+        return [self.planet]
+
+    def step(self, dt, inputs=None):
+        """
+        Продвигает симуляцию на dt секунд.
+        inputs – словарь {команда: ShipControls} для кораблей под управлением игроков.
+        """
+        if self.finished:
+            return
+        inputs = inputs or {}
+        if self.recorder is not None:
+            self.recorder.record_tick(inputs)
+        self.apply_controls(self.ship1, self.ship2, inputs.get("Team 1"), dt)
+        self.apply_controls(self.ship2, self.ship1, inputs.get("Team 2"), dt)
+
+        self.game_time += dt
+
+        self.ship1.in_gravity_field = False
+        self.ship2.in_gravity_field = False
+
+        with profiler.scope("ai"):
+            # Один снимок восприятия на шаг для обоих контроллеров
+            perception = Perception(self.asteroids, self.gravity_wells(), self.missiles, self.projectile_bank)
+            if self.ship1.ai_controller is not None:
+                self.add_projectiles(self.ship1.ai_controller.update(dt, self.ship2, perception, self.game_time,
+                                                                     self.ai_worker))
+            if self.ship2.ai_controller is not None:
+                self.add_projectiles(self.ship2.ai_controller.update(dt, self.ship1, perception, self.game_time,
+                                                                     self.ai_worker))
+
+        with profiler.scope("gravity"):
+            bodies = [self.ship1, self.ship2]
+            bodies.extend(p for p in self.missiles if getattr(p, 'launching', False))
+            GRAVITY.apply(bodies, self.gravity_wells(), dt)
+
+        with profiler.scope("update"):
+            self.ship1.update(dt)
+            self.ship2.update(dt)
+            for asteroid in self.asteroids:
+                asteroid.update(dt)
+            self.projectile_bank.update(self.missiles, dt, self.game_time)
+
+        with profiler.scope("projectile collisions"):
+            self.handle_projectile_collisions()
+
+        # Списки сжимаются на месте; погибшие снаряды возвращаются в пул для следующих выстрелов
+        remove_inactive(self.missiles, self.retire_projectile)
+        remove_inactive(self.asteroids)
+
+        with profiler.scope("ship collisions"):
+            handle_planet_collision(self.ship1, self.planet, self.game_time)
+            handle_planet_collision(self.ship2, self.planet, self.game_time)
+            for asteroid in self.asteroids:
+                handle_ship_asteroid_collision(self.ship1, asteroid)
+                handle_ship_asteroid_collision(self.ship2, asteroid)
+            handle_ship_ship_collision(self.ship1, self.ship2)
+            for i in range(len(self.asteroids)):
+                for j in range(i + 1, len(self.asteroids)):
+                    handle_asteroid_collision(self.asteroids[i], self.asteroids[j])
+            for i, asteroid in enumerate(self.asteroids):
+                dx = wrap_delta(asteroid.x, self.planet.x, FIELD_W)
+                dy = wrap_delta(asteroid.y, self.planet.y, FIELD_H)
+                if math.hypot(dx, dy) < (self.planet.radius + asteroid.radius):
+                    self.asteroids[i] = self.generate_offscreen_asteroid(self.cam, self.cam.zoom)
+
+        with profiler.scope("camera"):
+            self.cam.update_center_on_two_ships(self.ship1, self.ship2)
+            self.cam.update_zoom(self.ship1, self.ship2, dt)
+
+        self.check_ship_replacement()
+
+    def handle_projectile_collisions(self):
+        missiles = self.missiles
+        asteroids = self.asteroids
+        planet = self.planet
+        bank = self.projectile_bank
+        # Координаты, радиусы и владельцы снарядов берутся из хранилища одним проходом;
+        # за время проверки они не меняются, меняются только флаги active
+        slots = [m.slot for m in missiles]
+        xs = bank.gather(slots, "x")
+        ys = bank.gather(slots, "y")
+        radii = bank.gather(slots, "radius")
+        owners = bank.gather(slots, "owner_id")
+        active = [m.active for m in missiles]
+
+        # Broad-phase: кандидаты на столкновение за один вызов векторного ядра тора
+        near_projectiles = torus.neighbours(xs, ys, radii)
+        near_asteroids = torus.neighbours(xs, ys, radii, [a.x for a in asteroids],
+                                          [a.y for a in asteroids], [a.radius for a in asteroids])
+        ship1_id = self.ship1.id
+
+        for i, projectile in enumerate(missiles):
+            if not active[i]:
+                continue
+            px = xs[i]
+            py = ys[i]
+            pr = radii[i]
+            target = getattr(projectile, "target", None)
+            if target is not None:
+                d_x = wrap_delta(px, target.x, FIELD_W)
+                d_y = wrap_delta(py, target.y, FIELD_H)
+                target_radius = getattr(target, 'radius', 0)
+                if math.hypot(d_x, d_y) < (pr + target_radius):
+                    target.take_damage(projectile.damage)
+                    projectile.active = active[i] = False
+                    continue
+            elif owners[i] != -1:
+                if owners[i] == ship1_id:
+                    enemy = self.ship2
+                else:
+                    enemy = self.ship1
+                d_x = wrap_delta(px, enemy.x, FIELD_W)
+                d_y = wrap_delta(py, enemy.y, FIELD_H)
+                if math.hypot(d_x, d_y) < (pr + enemy.radius):
+                    enemy.take_damage(projectile.damage)
+                    projectile.active = active[i] = False
+                    continue
+            if isinstance(projectile, Plasmoid):
+                for k in near_projectiles[i]:
+                    if k == i or not active[k]:
+                        continue
+                    if owners[k] != -1 and owners[k] != owners[i]:
+                        dx = wrap_delta(px, xs[k], FIELD_W)
+                        dy = wrap_delta(py, ys[k], FIELD_H)
+                        if math.hypot(dx, dy) < (pr + radii[k]):
+                            projectile.active = active[i] = False
+                            missiles[k].active = active[k] = False
+                            break
+                if not active[i]:
+                    continue
+            for k in near_asteroids[i]:
+                asteroid = asteroids[k]
+                if abs(px - asteroid.x) > (pr + asteroid.radius) or abs(
+                        py - asteroid.y) > (pr + asteroid.radius):
+                    continue
+                dx = wrap_delta(px, asteroid.x, FIELD_W)
+                dy = wrap_delta(py, asteroid.y, FIELD_H)
+                if math.hypot(dx, dy) < (pr + asteroid.radius):
+                    asteroid.active = False
+                    projectile.active = active[i] = False
+                    break
+            dx = wrap_delta(px, planet.x, FIELD_W)
+            dy = wrap_delta(py, planet.y, FIELD_H)
+            if math.hypot(dx, dy) < (pr + planet.radius):
+                projectile.active = active[i] = False
+
+        # Снаряды разных владельцев уничтожают друг друга; снаряд без владельца пар не образует
+        for i in range(len(missiles)):
+            if not active[i] or owners[i] == -1:
+                continue
+            for j in near_projectiles[i]:
+                if j <= i or not active[j]:
+                    continue
+                if owners[j] != -1 and owners[j] != owners[i]:
+                    dx = wrap_delta(xs[i], xs[j], FIELD_W)
+                    dy = wrap_delta(ys[i], ys[j], FIELD_H)
+                    if math.hypot(dx, dy) <= (radii[i] + radii[j]):
+                        missiles[i].active = active[i] = False
+                        missiles[j].active = active[j] = False
+                        break
+
+    def retire_projectile(self, projectile):
+        owner = projectile.owner
+        # Мины, которые корабль ещё помнит (текущая и выставленные), в пул не попадают
+        if self.projectile_pool is not None and (owner is None or not owner.keeps(projectile)):
+            self.projectile_pool.release(projectile)
+
+    def generate_offscreen_asteroid(self, cam, zoom):
+        margin = 20
+        rng = self.next_rng("asteroid")
+        # При малом зуме всё поле на экране – точки за его краем нет, астероид появляется где угодно
+        hidden = FIELD_W * zoom > GAME_SCREEN_W + 2 * margin or FIELD_H * zoom > SCREEN_H + 2 * margin
+        while True:
+            x = rng.uniform(0, FIELD_W)
+            y = rng.uniform(0, FIELD_H)
+            if not hidden:
+                break
+            sx, sy = world_to_screen(x, y, cam.x, cam.y, zoom)
+            if sx < -margin or sx > GAME_SCREEN_W + margin or sy < -margin or sy > SCREEN_H + margin:
+                break
+        radius = rng.randint(8, 12)
+        vx = rng.uniform(-50, 50)
+        vy = rng.uniform(-50, 50)
+        color = (200, 200, 200)
+        new_ast = Asteroid(x, y, radius, vx, vy, color, rng, self.rotation_axis)
+        new_ast.angular_velocity = self.rotation_axis * rng.uniform(50, 180)
+        return new_ast
+
+    def next_ship(self, team):
+        remaining = self.team1_remaining if team == "Team 1" else self.team2_remaining
+        if not remaining:
+            return None
+        ship_class = self.select_replacement(team, remaining)
+        if self.recorder is not None:
+            self.recorder.record_choice(team, remaining.index(ship_class))
+        remaining.remove(ship_class)
+        return ship_class
+
+    def check_ship_replacement(self):
+        if self.ship1.dead:
+            new_ship_class = self.next_ship("Team 1")
+            if new_ship_class is None:
+                self.finish(winner="Team 2")
+                return
+            self.ship1 = self.spawn_team_ship("Team 1", new_ship_class)
+        if self.ship2.dead:
+            new_ship_class = self.next_ship("Team 2")
+            if new_ship_class is None:
+                self.finish(winner="Team 1")
+                return
+            self.ship2 = self.spawn_team_ship("Team 2", new_ship_class)
+
+    def finish(self, winner):
+        self.winner = winner
+        self.finished = True
@@ -0,0 +1,385 @@
+"""
+Снимки состояния симуляции: корабли (с таймерами, энергией, active_lasers и AI), астероиды,
+снаряды (включая флаг launching мин и ring_start_time плазмоидов), камера и игровое время.
+
+Снимок – граф объектов в компактном двоичном виде: таблица классов объектов, затем значения
+с однобайтовыми тегами и числами, упакованными struct (ссылки между объектами, например
+owner и target снарядов, хранятся индексами в таблице). По желанию сжимается zlib.
+Восстановление создаёт новые объекты, поэтому снимок можно применять сколько угодно раз.
+
+Для отката сетевой игры есть быстрый вариант без сериализации: save_state() запоминает ссылки
+на объекты мира и значения их полей, load_state() возвращает те же объекты в прежнее состояние
+на месте. Такое состояние живёт только в памяти процесса и не переживает его.
+Состояния держат ссылки на снаряды, поэтому симуляция, для которой вызван save_state,
+больше не отдаёт погибшие снаряды в общий пул POOL: иначе снаряд из сохранённого состояния
+мог бы достаться другой симуляции процесса и после load_state оказаться в двух мирах сразу.
+Ячейки BANK при этом не делятся: ячейка принадлежит объекту снаряда, пока он жив.
+"""
+import importlib
+import struct
+import zlib
+from collections import deque
+from operator import attrgetter
+from project.ships.base_ship import BaseShip
+from project.entities.projectile import Projectile
+from project.entities.projectile_bank import BANK
+
+MAGIC = b"UQMS"
+VERSION = 2
+FLAG_ZLIB = 0x01
+HEADER = struct.Struct("<4sHBI")
+U32 = struct.Struct("<I")
+I64 = struct.Struct("<q")
+F64 = struct.Struct("<d")
+
+# Поля Simulation, из которых состоит состояние матча
+STATE_FIELDS = ("team1_remaining", "team2_remaining", "ship1", "ship2", "planet", "cam",
+                "asteroids", "missiles", "game_time", "winner", "finished",
+                "seed", "rng_events", "rotation_axis", "cyborgs")
+
+
+class SnapshotError(Exception):
+    pass
+
+
+class _Encoder:
+    def __init__(self):
+        self.out = bytearray()
+        self.index = {}
+        self.objects = []
+
+    def ref(self, obj):
+        key = id(obj)
+        if key not in self.index:
+            self.index[key] = len(self.objects)
+            self.objects.append(obj)
+        return self.index[key]
+
+    def value(self, v):
+        out = self.out
+        t = type(v)
+        if v is None:
+            out += b"N"
+        elif v is True:
+            out += b"T"
+        elif v is False:
+            out += b"F"
+        elif t is float:
+            out += b"d"
+            out += F64.pack(v)
+        elif t is int:
+            if -2 ** 63 <= v < 2 ** 63:
+                out += b"i"
+                out += I64.pack(v)
+            else:
+                self.text(b"I", str(v))
+        elif t is str:
+            self.text(b"s", v)
+        elif t is list or t is tuple:
+            out += b"l" if t is list else b"t"
+            out += U32.pack(len(v))
+            for item in v:
+                self.value(item)
+        elif t is dict:
+            out += b"m"
+            out += U32.pack(len(v))
+            for key, item in v.items():
+                self.value(key)
+                self.value(item)
+        elif isinstance(v, tuple) and hasattr(t, "_fields"):
+            # namedtuple (намерения и планы AI) – неизменяемое значение, а не объект с identity
+            self.text(b"n", class_path(t))
+            self.value(tuple(v))
+        elif isinstance(v, type):
+            self.text(b"c", class_path(v))
+        else:
+            out += b"r"
+            out += U32.pack(self.ref(v))
+
+    def text(self, tag, s):
+        data = s.encode("utf-8")
+        self.out += tag
+        self.out += U32.pack(len(data))
+        self.out += data
+
+
+class _Decoder:
+    def __init__(self, data, objects):
+        self.data = data
+        self.pos = 0
+        self.objects = objects
+
+    def u32(self):
+        (n,) = U32.unpack_from(self.data, self.pos)
+        self.pos += 4
+        return n
+
+    def text(self):
+        n = self.u32()
+        s = self.data[self.pos:self.pos + n].decode("utf-8")
+        self.pos += n
+        return s
+
+    def value(self):
+        tag = self.data[self.pos:self.pos + 1]
+        self.pos += 1
+        if tag == b"N":
+            return None
+        if tag == b"T":
+            return True
+        if tag == b"F":
+            return False
+        if tag == b"d":
+            (v,) = F64.unpack_from(self.data, self.pos)
+            self.pos += 8
+            return v
+        if tag == b"i":
+            (v,) = I64.unpack_from(self.data, self.pos)
+            self.pos += 8
+            return v
+        if tag == b"I":
+            return int(self.text())
+        if tag == b"s":
+            return self.text()
+        if tag == b"l" or tag == b"t":
+            items = [self.value() for _ in range(self.u32())]
+            return items if tag == b"l" else tuple(items)
+        if tag == b"m":
+            result = {}
+            for _ in range(self.u32()):
+                key = self.value()
+                result[key] = self.value()
+            return result
+        if tag == b"c":
+            return resolve_class(self.text())
+        if tag == b"n":
+            cls = resolve_class(self.text())
+            return cls(*self.value())
+        if tag == b"r":
+            return self.objects[self.u32()]
+        raise SnapshotError(f"Corrupt snapshot: unknown tag {tag!r}")
+
+
+def class_path(cls):
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def resolve_class(path):
+    module_name, _, qualname = path.partition(":")
+    # Восстанавливаются только классы игры
+    if not module_name.startswith("project."):
+        raise SnapshotError(f"Refusing to restore {path}")
+    obj = importlib.import_module(module_name)
+    for part in qualname.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def object_state(obj):
+    # Снаряды отдают поля из общего хранилища через __getstate__
+    state = obj.__getstate__()
+    if type(state) is tuple:
+        # Объект со __slots__: (__dict__ или None, {слот: значение})
+        extra, slots = state
+        state = {**(extra or {}), **slots}
+    return state
+
+
+def apply_state(obj, state):
+    if hasattr(obj, "__setstate__"):
+        obj.__setstate__(state)
+    else:
+        for name, value in state.items():
+            setattr(obj, name, value)
+
+
+def capture(sim, compress=True):
+    """Возвращает снимок состояния sim в виде bytes."""
+    root = {name: getattr(sim, name) for name in STATE_FIELDS}
+    root["next_ship_id"] = BaseShip.next_id
+    body = _Encoder()
+    body.value(root)
+    # Состояния объектов могут ссылаться на новые объекты – список растёт по ходу обхода
+    states = _Encoder()
+    states.index = body.index
+    states.objects = body.objects
+    i = 0
+    while i < len(states.objects):
+        states.value(object_state(states.objects[i]))
+        i += 1
+    classes = _Encoder()
+    classes.value([class_path(type(obj)) for obj in body.objects])
+    payload = bytes(classes.out + body.out + states.out)
+    flags = 0
+    if compress:
+        payload = zlib.compress(payload, 6)
+        flags |= FLAG_ZLIB
+    return HEADER.pack(MAGIC, VERSION, flags, len(body.objects)) + payload
+
+
+def restore(sim, data):
+    """Переводит sim в состояние из снимка data. Обратные вызовы и запись матча сохраняются."""
+    magic, version, flags, count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotError("Not a snapshot")
+    if version != VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {version}")
+    payload = data[HEADER.size:]
+    if flags & FLAG_ZLIB:
+        payload = zlib.decompress(payload)
+    decoder = _Decoder(payload, [])
+    classes = [resolve_class(path) for path in decoder.value()]
+    if len(classes) != count:
+        raise SnapshotError("Corrupt snapshot: object table size mismatch")
+    # Сначала пустые объекты, чтобы ссылки между ними разрешались при чтении значений
+    decoder.objects = [cls.__new__(cls) for cls in classes]
+    root = decoder.value()
+    for obj in decoder.objects:
+        apply_state(obj, decoder.value())
+    BaseShip.next_id = max(BaseShip.next_id, root.pop("next_ship_id"))
+    for name in STATE_FIELDS:
+        setattr(sim, name, root[name])
+    return sim
+
+
+class RewindBuffer:
+    """
+    Кольцевой буфер снимков для мгновенной перемотки назад во время игры.
+    Снимок делается каждые interval шагов, хранится не больше capacity последних.
+    """
+    def __init__(self, interval=60, capacity=30, compress=True):
+        self.interval = interval
+        self.compress = compress
+        self.snapshots = deque(maxlen=capacity)
+        self.ticks = 0
+
+    def tick(self, sim):
+        if self.ticks % self.interval == 0:
+            self.snapshots.append((self.ticks, capture(sim, self.compress)))
+        self.ticks += 1
+
+    def rewind(self, sim, ticks_back):
+        """Возвращает sim к последнему снимку, сделанному не позже чем ticks_back шагов назад."""
+        target = self.ticks - ticks_back
+        while len(self.snapshots) > 1 and self.snapshots[-1][0] > target:
+            self.snapshots.pop()
+        if not self.snapshots:
+            return False
+        self.ticks, data = self.snapshots[-1]
+        restore(sim, data)
+        # Снимок остаётся в буфере: к нему можно вернуться снова, а tick() не запишет его повторно
+        self.ticks += 1
+        return True
+
+    @property
+    def memory(self):
+        return sum(len(data) for _, data in self.snapshots)
+
+
+# ---------- быстрое состояние для отката ----------
+
+# Поля Simulation, которые save_state копирует (списки меняются на месте), остальные – по ссылке
+COPIED_FIELDS = ("team1_remaining", "team2_remaining", "asteroids", "missiles", "rng_events")
+LAYOUTS = {}
+
+
+class _Layout:
+    """Поля объекта класса cls, которые сохраняет save_state: слоты и столбцы BANK у снарядов."""
+    __slots__ = ("names", "get", "columns", "lists")
+
+    def __init__(self, cls):
+        names = []
+        for klass in reversed(cls.__mro__):
+            for name in klass.__dict__.get("__slots__", ()):
+                if name not in ("__dict__", "__weakref__", "slot") and name not in names:
+                    names.append(name)
+        self.columns = ()
+        if issubclass(cls, Projectile):
+            # Ячейка снаряда не меняется, пока объект жив; значения берутся прямо из столбцов
+            self.columns = tuple(BANK.columns[name] for name in cls.BANK_FIELDS + ("kind", "owner_id"))
+            names = [name for name in names if name not in cls.BANK_FIELDS]
+        self.names = tuple(names)
+        self.get = attrgetter(*names) if len(names) > 1 else (lambda obj: (getattr(obj, names[0]),))
+        # Списки (active_lasers, deployed_mines) меняются на месте – сохраняются копии
+        self.lists = "active_lasers" in names or "deployed_mines" in names
+
+
+def layout(cls):
+    result = LAYOUTS.get(cls)
+    if result is None:
+        result = LAYOUTS[cls] = _Layout(cls)
+    return result
+
+
+def save_object(obj, saved):
+    cls = type(obj)
+    if not hasattr(cls, "__slots__") or hasattr(obj, "__dict__"):
+        saved.append((obj, None, dict(vars(obj))))
+        return
+    plan = LAYOUTS.get(cls) or layout(cls)
+    values = plan.get(obj)
+    if plan.lists:
+        values = tuple(value.copy() if type(value) is list else value for value in values)
+    if plan.columns:
+        slot = obj.slot
+        saved.append((obj, plan, (values, tuple(column[slot] for column in plan.columns))))
+    else:
+        saved.append((obj, plan, values))
+
+
+def load_object(obj, plan, values):
+    if plan is None:
+        fields = vars(obj)
+        fields.clear()
+        fields.update(values)
+        return
+    if plan.columns:
+        values, bank = values
+        slot = obj.slot
+        for column, value in zip(plan.columns, bank):
+            column[slot] = value
+    for name, value in zip(plan.names, values):
+        setattr(obj, name, value.copy() if type(value) is list else value)
+
+
+def save_state(sim):
+    """
+    Состояние sim для отката: поля симуляции, корабли (с AI), астероиды, снаряды (с ячейками BANK:
+    launching мин, ring_start_time плазмоидов, lifetime ракет), камера, игровое время
+    и счётчики случайных событий. Объекты не копируются – только значения их полей.
+    Отключает у sim возврат снарядов в пул (см. описание модуля).
+    Контроллер AI сохраняется поверхностно: поиск планировщика Awesome Cyborg, который
+    продолжается между шагами, после отката не повторяется – откат рассчитан на игру двух людей.
+    """
+    sim.projectile_pool = None
+    fields = {name: getattr(sim, name) for name in STATE_FIELDS}
+    for name in COPIED_FIELDS:
+        fields[name] = fields[name].copy()
+    saved = []
+    for ship in (sim.ship1, sim.ship2):
+        save_object(ship, saved)
+        if ship.ai_controller is not None:
+            save_object(ship.ai_controller, saved)
+        # Мина в режиме запуска и выставленные мины могут быть ещё (или уже) не в sim.missiles
+        current = getattr(ship, "current_mine", None)
+        if current is not None:
+            save_object(current, saved)
+        for mine in getattr(ship, "deployed_mines", ()):
+            save_object(mine, saved)
+    for obj in sim.asteroids:
+        save_object(obj, saved)
+    for obj in sim.missiles:
+        save_object(obj, saved)
+    save_object(sim.cam, saved)
+    return fields, saved, BaseShip.next_id
+
+
+def load_state(sim, state):
+    """Возвращает sim и его объекты к состоянию save_state(); одно состояние можно загружать много раз."""
+    fields, saved, next_id = state
+    for name, value in fields.items():
+        setattr(sim, name, value.copy() if name in COPIED_FIELDS else value)
+    for obj, plan, values in saved:
+        load_object(obj, plan, values)
+    BaseShip.next_id = next_id
+    return sim
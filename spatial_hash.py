@@ -0,0 +1,69 @@
+from project.config import FIELD_W, FIELD_H
+
+
+class SpatialHash:
+    """
+    Равномерная сетка на торе для быстрого отбора кандидатов на столкновение (broad-phase).
+    Размер ячейки выбирается не меньше максимальной дистанции взаимодействия,
+    поэтому все возможные столкновения находятся в соседних ячейках (3x3 с учётом заворота поля).
+    Кандидаты возвращаются в порядке индексов исходного списка, чтобы порядок проверок
+    совпадал с полным перебором.
+    """
+    def __init__(self, cell_size=32.0):
+        self.cells = {}
+        self.resize(cell_size)
+
+    def resize(self, cell_size):
+        cell_size = max(float(cell_size), 1.0)
+        self.cols = max(1, int(FIELD_W // cell_size))
+        self.rows = max(1, int(FIELD_H // cell_size))
+        self.cell_w = FIELD_W / self.cols
+        self.cell_h = FIELD_H / self.rows
+
+    def cell_of(self, x, y):
+        return int(x // self.cell_w) % self.cols, int(y // self.cell_h) % self.rows
+
+    def rebuild(self, objects, cell_size):
+        """Перестраивает сетку по текущим позициям объектов (ключ – индекс в списке)."""
+        self.rebuild_points([obj.x for obj in objects], [obj.y for obj in objects], cell_size)
+
+    def rebuild_points(self, xs, ys, cell_size):
+        """То же по готовым спискам координат (например, из хранилища снарядов)."""
+        self.resize(cell_size)
+        cells = {}
+        cell_w = self.cell_w
+        cell_h = self.cell_h
+        cols = self.cols
+        rows = self.rows
+        for index, (x, y) in enumerate(zip(xs, ys)):
+            key = (int(x // cell_w) % cols, int(y // cell_h) % rows)
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [index]
+            else:
+                bucket.append(index)
+        self.cells = cells
+
+    def query(self, x, y):
+        """Возвращает отсортированные индексы объектов из ячейки точки (x, y) и соседних с ней."""
+        col, row = self.cell_of(x, y)
+        cells = self.cells
+        cols = self.cols
+        rows = self.rows
+        result = []
+        if cols >= 3 and rows >= 3:
+            for c in (col - 1, col, col + 1):
+                c %= cols
+                for r in (row - 1, row, row + 1):
+                    bucket = cells.get((c, r % rows))
+                    if bucket:
+                        result.extend(bucket)
+        else:
+            # На очень крупной сетке соседние ячейки могут совпадать – убираем повторы
+            keys = {(c % cols, r % rows) for c in (col - 1, col, col + 1) for r in (row - 1, row, row + 1)}
+            for key in keys:
+                bucket = cells.get(key)
+                if bucket:
+                    result.extend(bucket)
+        result.sort()
+        return result
@@ -0,0 +1,97 @@
+"""
+Общий кэш повёрнутых спрайтов: астероиды и корпуса кораблей рисуются один раз для каждого
+квантованного угла, размера и цвета, а каждый кадр – только поиск в кэше и blit.
+Кэш ограничен MAX_SPRITES записями и вытесняет давно не использованные (LRU).
+"""
+import math
+from collections import OrderedDict
+import pygame
+
+# Шагов угла на полный оборот: 64 шага – 5.6°, на экране поворот выглядит плавным
+ANGLE_STEPS = 64
+MAX_SPRITES = 2048
+# Цвет прозрачного фона спрайта – не встречается среди цветов объектов
+COLORKEY = (255, 0, 255)
+NOSE_COLOR = (255, 255, 255)
+
+
+class SpriteCache:
+    def __init__(self, capacity=MAX_SPRITES):
+        self.capacity = capacity
+        self.sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build, *args):
+        """Спрайт по ключу; при промахе создаётся вызовом build(*args)."""
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+        self.misses += 1
+        sprite = self.sprites[key] = build(*args)
+        if len(self.sprites) > self.capacity:
+            self.sprites.popitem(last=False)
+        return sprite
+
+    def clear(self):
+        self.sprites.clear()
+
+
+SPRITES = SpriteCache()
+
+
+def quantize(angle, steps=ANGLE_STEPS, period=360):
+    return round(angle % period * steps / period) % steps
+
+
+def blank(half):
+    """Прозрачная поверхность (2 * half + 1) x (2 * half + 1) с центром в пикселе (half, half)."""
+    surface = pygame.Surface((2 * half + 1, 2 * half + 1))
+    surface.fill(COLORKEY)
+    surface.set_colorkey(COLORKEY, pygame.RLEACCEL)
+    return surface
+
+
+def asteroid_sprite(half_size, color, angle):
+    """
+    Квадрат со стороной 2 * half_size, повёрнутый на angle градусов.
+    Возвращает (поверхность, смещение центра). Квадрат симметричен при повороте на 90°,
+    поэтому угол квантуется в пределах четверти оборота.
+    """
+    steps = ANGLE_STEPS // 4
+    step = quantize(angle, steps, 90)
+    size = round(half_size * 2) / 2
+    return SPRITES.get(("asteroid", size, color, step), build_asteroid, size, color, step * 90 / steps)
+
+
+def build_asteroid(half_size, color, angle):
+    half = math.ceil(half_size * math.sqrt(2)) + 1
+    surface = blank(half)
+    rad = math.radians(angle)
+    cos_a = math.cos(rad)
+    sin_a = math.sin(rad)
+    corners = []
+    for dx, dy in [(-half_size, -half_size), (half_size, -half_size),
+                   (half_size, half_size), (-half_size, half_size)]:
+        corners.append((half + dx * cos_a - dy * sin_a, half + dx * sin_a + dy * cos_a))
+    pygame.draw.polygon(surface, color, corners)
+    return surface, half
+
+
+def ship_sprite(radius, color, angle):
+    """Корпус корабля (круг) с линией носа по направлению angle. Возвращает (поверхность, смещение центра)."""
+    step = quantize(angle)
+    return SPRITES.get(("ship", radius, color, step), build_ship, radius, color, step * 360 / ANGLE_STEPS)
+
+
+def build_ship(radius, color, angle):
+    half = radius + 1
+    surface = blank(half)
+    pygame.draw.circle(surface, color, (half, half), radius)
+    rad = math.radians(angle)
+    nose_x = half + int(radius * math.sin(rad))
+    nose_y = half - int(radius * math.cos(rad))
+    pygame.draw.line(surface, NOSE_COLOR, (half, half), (nose_x, nose_y), 2)
+    return surface, half
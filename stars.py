@@ -1,7 +1,19 @@
+import math
 import random
+from collections import OrderedDict
 import pygame
-from config import FIELD_W, FIELD_H, GAME_SCREEN_W, SCREEN_H
-from utils import wrap_delta
+from project.config import FIELD_W, FIELD_H, GAME_SCREEN_W, SCREEN_H
+from project.torus import offsets
+
+STAR_RADIUS = 2
+# Слой запекается для зума, округлённого до 1/ZOOM_BUCKETS октавы – плавный зум не перерисовывает его каждый кадр
+ZOOM_BUCKETS = 8
+# Для скольких масштабов хранится раскладка звёзд по плиткам
+MAX_CACHED_ZOOMS = 4
+# Сторона плитки в пикселях экрана и предел числа запечённых плиток слоя
+TILE_SIZE = 256
+MAX_CACHED_TILES = 256
+
 
 def generate_colored_stars(count):
     stars = []
@@ -14,12 +26,102 @@ def generate_colored_stars(count):
         stars.append((x, y, (r, g, b)))
     return stars
 
+
+def zoom_bucket(zoom):
+    return 2 ** (round(math.log2(zoom) * ZOOM_BUCKETS) / ZOOM_BUCKETS)
+
+
+class StarLayer:
+    """
+    Слой параллакса, заранее нарисованный плитками TILE_SIZE x TILE_SIZE поверх поля (тора) в экранном масштабе.
+    Кадр – несколько blit со смещением камеры слоя вместо отрисовки каждой звезды.
+    Плитки запекаются лениво, только когда впервые попадают на экран, поэтому смена зума
+    не требует перерисовки всего поля. Плитки в формате экрана с colorkey и RLE:
+    SDL хранит их сжатыми по строкам, а blit пропускает пустое небо целыми участками.
+    """
+    def __init__(self, stars, parallax):
+        self.stars = stars
+        self.parallax = parallax
+        self.layouts = OrderedDict()  # масштаб -> (ширина, высота, звёзды по плиткам)
+        self.tiles = OrderedDict()    # (масштаб, tx, ty) -> поверхность или None для пустой плитки
+
+    def layout(self, scale):
+        layout = self.layouts.get(scale)
+        if layout is not None:
+            self.layouts.move_to_end(scale)
+            return layout
+        width = max(1, round(FIELD_W * scale))
+        height = max(1, round(FIELD_H * scale))
+        tiles = {}
+        for x, y, color in self.stars:
+            sx = int(x * scale)
+            sy = int(y * scale)
+            # Звёзды у края рисуются и с другой стороны, чтобы шов между копиями тора не был виден
+            for cx in (sx - width, sx, sx + width):
+                for cy in (sy - height, sy, sy + height):
+                    if not (-STAR_RADIUS <= cx < width + STAR_RADIUS and -STAR_RADIUS <= cy < height + STAR_RADIUS):
+                        continue
+                    for tx in range(max(0, (cx - STAR_RADIUS) // TILE_SIZE),
+                                    min((width - 1) // TILE_SIZE, (cx + STAR_RADIUS) // TILE_SIZE) + 1):
+                        for ty in range(max(0, (cy - STAR_RADIUS) // TILE_SIZE),
+                                        min((height - 1) // TILE_SIZE, (cy + STAR_RADIUS) // TILE_SIZE) + 1):
+                            tiles.setdefault((tx, ty), []).append(
+                                (cx - tx * TILE_SIZE, cy - ty * TILE_SIZE, color))
+        layout = self.layouts[scale] = (width, height, tiles)
+        if len(self.layouts) > MAX_CACHED_ZOOMS:
+            old_scale, _ = self.layouts.popitem(last=False)
+            for key in [key for key in self.tiles if key[0] == old_scale]:
+                del self.tiles[key]
+        return layout
+
+    def tile(self, screen, scale, tx, ty, width, height, stars):
+        key = (scale, tx, ty)
+        if key in self.tiles:
+            self.tiles.move_to_end(key)
+            return self.tiles[key]
+        surface = None
+        if stars:
+            size = (min(TILE_SIZE, width - tx * TILE_SIZE), min(TILE_SIZE, height - ty * TILE_SIZE))
+            surface = pygame.Surface(size, 0, screen)
+            surface.fill((0, 0, 0))
+            for x, y, color in stars:
+                pygame.draw.circle(surface, color, (x, y), STAR_RADIUS)
+            surface.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+        self.tiles[key] = surface
+        if len(self.tiles) > MAX_CACHED_TILES:
+            self.tiles.popitem(last=False)
+        return surface
+
+    def draw(self, screen, global_camx, global_camy, zoom):
+        scale = zoom_bucket(zoom)
+        width, height, tiles = self.layout(scale)
+        layer_cam_x = (global_camx * self.parallax) % FIELD_W
+        layer_cam_y = (global_camy * self.parallax) % FIELD_H
+        # Экранная точка начала поля; копии тора повторяются с периодом width x height
+        left = int(GAME_SCREEN_W / 2 - layer_cam_x * scale) % width - width
+        top = int(SCREEN_H / 2 - layer_cam_y * scale) % height - height
+        last_tx = (width - 1) // TILE_SIZE
+        last_ty = (height - 1) // TILE_SIZE
+        clip = screen.get_clip()
+        screen.set_clip(pygame.Rect(0, 0, GAME_SCREEN_W, SCREEN_H).clip(clip))
+        for x0 in range(left, GAME_SCREEN_W, width):
+            for y0 in range(top, SCREEN_H, height):
+                # Только плитки этой копии, попадающие на экран
+                for tx in range(max(0, -x0 // TILE_SIZE), min(last_tx, (GAME_SCREEN_W - 1 - x0) // TILE_SIZE) + 1):
+                    for ty in range(max(0, -y0 // TILE_SIZE), min(last_ty, (SCREEN_H - 1 - y0) // TILE_SIZE) + 1):
+                        surface = self.tile(screen, scale, tx, ty, width, height, tiles.get((tx, ty)))
+                        if surface is not None:
+                            screen.blit(surface, (x0 + tx * TILE_SIZE, y0 + ty * TILE_SIZE))
+        screen.set_clip(clip)
+
+
 def draw_star_layer_colored(screen, star_list, global_camx, global_camy, parallax, zoom):
+    # Отрисовка по одной звезде – для сравнения с запечённым StarLayer
     layerCamX = (global_camx * parallax) % FIELD_W
     layerCamY = (global_camy * parallax) % FIELD_H
-    for (starX, starY, color) in star_list:
-        dx = wrap_delta(layerCamX, starX, FIELD_W)
-        dy = wrap_delta(layerCamY, starY, FIELD_H)
+    # Смещения всех звёзд слоя от камеры считаются одним вызовом
+    dxs, dys = offsets(layerCamX, layerCamY, [star[0] for star in star_list], [star[1] for star in star_list])
+    for (starX, starY, color), dx, dy in zip(star_list, dxs, dys):
         sx = (GAME_SCREEN_W / 2) + dx * zoom
         sy = (SCREEN_H / 2) + dy * zoom
-        pygame.draw.circle(screen, color, (int(sx), int(sy)), 2)
+        pygame.draw.circle(screen, color, (int(sx), int(sy)), STAR_RADIUS)
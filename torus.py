@@ -0,0 +1,140 @@
+import math
+from project.config import FIELD_W, FIELD_H
+from project.utils import wrap_delta
+from project.spatial_hash import SpatialHash
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен – без него работают скалярный путь и сетка SpatialHash
+    np = None
+
+# Относительный запас отбора: np.hypot может отличаться от math.hypot в последнем бите,
+# поэтому кандидаты берутся чуть шире, а точную проверку выполняет вызывающий код
+TOLERANCE = 1e-9
+# Матрица расстояний считается блоками по столько строк, чтобы ограничить память
+BLOCK_ROWS = 512
+# При меньшем числе пар (источники x цели) сетка и скалярный путь быстрее, чем NumPy
+MIN_VECTOR_PAIRS = 256
+# При большем числе пар квадратичная матрица проигрывает линейной сетке SpatialHash
+MAX_VECTOR_PAIRS = 200000
+
+
+def wrap_array(d, size):
+    """Поэлементный wrap_delta для массива разностей target - origin."""
+    half = size / 2
+    return np.where(d > half, d - size, np.where(d < -half, d + size, d))
+
+
+def deltas(src_x, src_y, dst_x, dst_y):
+    """
+    Завёрнутые смещения от каждого источника до каждой цели за один вызов.
+    Возвращает матрицы dx, dy размера len(src) x len(dst).
+    """
+    if np is None:
+        dx = [[wrap_delta(x, tx, FIELD_W) for tx in dst_x] for x in src_x]
+        dy = [[wrap_delta(y, ty, FIELD_H) for ty in dst_y] for y in src_y]
+        return dx, dy
+    sx = np.asarray(src_x, dtype=float)[:, None]
+    sy = np.asarray(src_y, dtype=float)[:, None]
+    tx = np.asarray(dst_x, dtype=float)[None, :]
+    ty = np.asarray(dst_y, dtype=float)[None, :]
+    return wrap_array(tx - sx, FIELD_W), wrap_array(ty - sy, FIELD_H)
+
+
+def offsets(x, y, xs, ys):
+    """
+    Завёрнутые смещения от одной точки до набора точек в виде двух списков.
+    Значения побитно совпадают с wrap_delta().
+    """
+    if np is None or len(xs) < MIN_VECTOR_PAIRS:
+        return ([wrap_delta(x, tx, FIELD_W) for tx in xs],
+                [wrap_delta(y, ty, FIELD_H) for ty in ys])
+    dx = wrap_array(np.asarray(xs, dtype=float) - x, FIELD_W)
+    dy = wrap_array(np.asarray(ys, dtype=float) - y, FIELD_H)
+    return dx.tolist(), dy.tolist()
+
+
+def distances(src_x, src_y, dst_x, dst_y):
+    """Как deltas(), но дополнительно возвращает матрицу расстояний."""
+    dx, dy = deltas(src_x, src_y, dst_x, dst_y)
+    if np is None:
+        dist = [[math.hypot(a, b) for a, b in zip(row_x, row_y)] for row_x, row_y in zip(dx, dy)]
+        return dx, dy, dist
+    return dx, dy, np.hypot(dx, dy)
+
+
+def neighbours(xs, ys, radii, other_xs=None, other_ys=None, other_radii=None):
+    """
+    Для каждого объекта i возвращает отсортированный список индексов j, для которых
+    расстояние на торе не больше radii[i] + other_radii[j] (с запасом TOLERANCE).
+    Без других объектов ищет соседей внутри того же набора, исключая сам объект.
+    Результат – надмножество точных пересечений, как у broad-phase.
+    """
+    self_query = other_xs is None
+    if self_query:
+        other_xs, other_ys, other_radii = xs, ys, radii
+    n = len(xs)
+    m = len(other_xs)
+    if n == 0 or m == 0:
+        return [[] for _ in range(n)]
+    if n * m < MIN_VECTOR_PAIRS:
+        return _scalar_neighbours(xs, ys, radii, other_xs, other_ys, other_radii, self_query,
+                                  lambda x, y: range(m))
+    if np is None or n * m > MAX_VECTOR_PAIRS:
+        grid = SpatialHash()
+        grid.rebuild_points(other_xs, other_ys, max(radii) + max(other_radii))
+        return _scalar_neighbours(xs, ys, radii, other_xs, other_ys, other_radii, self_query, grid.query)
+
+    tx = np.asarray(other_xs, dtype=float)
+    ty = np.asarray(other_ys, dtype=float)
+    tr = np.asarray(other_radii, dtype=float)
+    sx = np.asarray(xs, dtype=float)
+    sy = np.asarray(ys, dtype=float)
+    sr = np.asarray(radii, dtype=float)
+    rows = []
+    cols = []
+    for start in range(0, n, BLOCK_ROWS):
+        stop = min(start + BLOCK_ROWS, n)
+        # Для отбора нужен только модуль смещения: min(|d|, размер - |d|)
+        dx = np.abs(tx[None, :] - sx[start:stop, None])
+        dx = np.minimum(dx, FIELD_W - dx)
+        dy = np.abs(ty[None, :] - sy[start:stop, None])
+        dy = np.minimum(dy, FIELD_H - dy)
+        reach = (sr[start:stop, None] + tr[None, :]) * (1 + TOLERANCE)
+        mask = dx * dx + dy * dy <= reach * reach
+        if self_query:
+            block = np.arange(stop - start)
+            mask[block, block + start] = False
+        r, c = np.nonzero(mask)
+        rows.append(r + start)
+        cols.append(c)
+    rows = np.concatenate(rows)
+    indices = np.concatenate(cols).tolist()
+    bounds = np.searchsorted(rows, np.arange(n + 1)).tolist()
+    return [indices[bounds[i]:bounds[i + 1]] for i in range(n)]
+
+
+def pairs_within(xs, ys, radii):
+    """Пары (i, j), i < j, объектов одного набора, которые могут пересекаться (в порядке i, затем j)."""
+    pairs = []
+    for i, near in enumerate(neighbours(xs, ys, radii)):
+        pairs.extend((i, j) for j in near if j > i)
+    return pairs
+
+
+def _scalar_neighbours(xs, ys, radii, other_xs, other_ys, other_radii, self_query, candidates):
+    # Скалярный путь: candidates(x, y) – перебор всех целей или ячейки сетки SpatialHash,
+    # размер ячейки которой не меньше максимальной дистанции взаимодействия
+    result = []
+    for i, (x, y, r) in enumerate(zip(xs, ys, radii)):
+        near = []
+        for j in candidates(x, y):
+            if self_query and j == i:
+                continue
+            reach = (r + other_radii[j]) * (1 + TOLERANCE)
+            dx = wrap_delta(x, other_xs[j], FIELD_W)
+            dy = wrap_delta(y, other_ys[j], FIELD_H)
+            if dx * dx + dy * dy <= reach * reach:
+                near.append(j)
+        result.append(near)
+    return result
@@ -0,0 +1,305 @@
+"""
+Турнир киборгов: тысячи матчей без отрисовки на всех ядрах процессора.
+
+Флоты берутся из профилей saved_teams.json, обеими командами управляет AI заданной сложности.
+У каждого матча своё зерно, выведенное из зерна турнира и номера матча, поэтому любой матч
+можно пересчитать отдельно. Результаты дописываются в файл JSON Lines сразу по готовности
+каждого матча: прерванный турнир продолжается с того же места повторным запуском.
+
+    python -m project.tournament PROFILE1 PROFILE2 --matches 1000 --difficulty Hard Medium
+
+Файл --stats с частью характеристик кораблей (в формате ships/ship_stats.json) подменяет
+их на время турнира – так баланс подбирается без правки кода.
+
+Итог – доля побед, средняя длина матча и потери экипажа по каждой паре классов кораблей
+(SHIP_CLASSES), встретившихся в поединках.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from project.config import TICK_RATE
+from project.profiles import ProfileStore
+from project.ships import SHIP_CLASSES
+from project.ships.stats import STATS_FILE, StatsError, read_stats_file, parse_stats, apply_stats
+from project.simulation import Simulation, TEAMS
+
+SAVES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "saved_teams.json")
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+# Матч, не закончившийся за столько секунд игрового времени, считается ничьей
+MAX_MATCH_SECONDS = 600
+DEFAULT_STATS = parse_stats(read_stats_file(STATS_FILE))
+
+
+class TournamentError(Exception):
+    pass
+
+
+def load_fleet(profile, saves_file=SAVES_FILE):
+    """Список имён кораблей из профиля команды (пустые слоты пропускаются)."""
+    config = ProfileStore(saves_file).get(profile)
+    if config is None:
+        raise TournamentError(f"Profile '{profile}' not found in {saves_file}")
+    fleet = [name for name in config["fleet"] if name is not None]
+    for name in fleet:
+        if name not in SHIP_CLASSES:
+            raise TournamentError(f"Profile '{profile}': unknown ship '{name}'")
+    if not fleet:
+        raise TournamentError(f"Profile '{profile}' has an empty fleet")
+    return fleet
+
+
+def ship_stats(overrides_file):
+    """Характеристики из ship_stats.json с правками из overrides_file (указываются только изменённые поля)."""
+    try:
+        data = read_stats_file(STATS_FILE)
+        for name, fields in read_stats_file(overrides_file).items():
+            if name not in data:
+                raise TournamentError(f"{overrides_file}: unknown ship '{name}'")
+            data[name] = {**data[name], **fields}
+        parse_stats(data)
+    except StatsError as e:
+        raise TournamentError(str(e))
+    return data
+
+
+def match_seed(seed, index):
+    # Зерно матча не зависит от порядка и числа процессов
+    return random.Random(f"{seed}:match:{index}").getrandbits(32)
+
+
+def run_match(spec):
+    """Играет один матч по описанию spec и возвращает запись результата."""
+    # Процессы пула переиспользуются, поэтому характеристики назначаются каждому матчу заново
+    apply_stats(SHIP_CLASSES, parse_stats(spec["stats"]) if spec.get("stats") else DEFAULT_STATS)
+    sim = Simulation([SHIP_CLASSES[name] for name in spec["fleets"]["Team 1"]],
+                     [SHIP_CLASSES[name] for name in spec["fleets"]["Team 2"]],
+                     cyborgs=spec["cyborgs"], seed=spec["seed"])
+    dt = 1.0 / spec["tick_rate"]
+    duels = []
+    ships = [sim.ship1, sim.ship2]
+    crews = [sim.ship1.crew, sim.ship2.crew]
+    started = 0
+    ticks = 0
+    while not sim.finished and ticks < spec["max_ticks"]:
+        sim.step(dt)
+        ticks += 1
+        current = [sim.ship1, sim.ship2]
+        if sim.finished or current[0] is not ships[0] or current[1] is not ships[1]:
+            duels.append(duel_record(ships, crews, ticks - started))
+            started = ticks
+            ships = current
+            crews = [ship.crew for ship in current]
+    if not sim.finished:
+        duels.append(duel_record(ships, crews, ticks - started))
+    return {"index": spec["index"], "seed": spec["seed"], "winner": sim.winner,
+            "ticks": ticks, "time": sim.game_time,
+            "crew_lost": {team: sum(d["crew_lost"][i] for d in duels) for i, team in enumerate(TEAMS)},
+            "duels": duels}
+
+
+def duel_record(ships, crews, ticks):
+    # Поединок длится, пока живы оба корабля; победитель – переживший соперника
+    alive = [not ship.dead for ship in ships]
+    winner = None
+    if alive[0] != alive[1]:
+        winner = TEAMS[0] if alive[0] else TEAMS[1]
+    return {"ships": [ship.name for ship in ships], "winner": winner, "ticks": ticks,
+            "crew_lost": [crew - max(ship.crew, 0) for ship, crew in zip(ships, crews)]}
+
+
+def silence_worker():
+    # Корабли сообщают о гибели через print – в турнире это только шум
+    sys.stdout = open(os.devnull, "w")
+
+
+class ResultsFile:
+    """
+    Файл результатов JSON Lines: первая строка – параметры турнира, далее по строке на матч.
+    Каждая строка сбрасывается на диск сразу, оборванная последняя строка при продолжении отбрасывается.
+    """
+    def __init__(self, path, params):
+        self.path = path
+        self.records = []
+        if os.path.exists(path):
+            self.load(params)
+        self.file = open(path, "a", encoding="utf-8")
+        if not self.records and os.path.getsize(path) == 0:
+            self.write({"tournament": params})
+
+    def load(self, params):
+        with open(self.path, "rb") as f:
+            data = f.read()
+        # Всё после последнего перевода строки – недописанная запись убитого процесса
+        complete = data[:data.rfind(b"\n") + 1]
+        if len(complete) != len(data):
+            with open(self.path, "r+b") as f:
+                f.truncate(len(complete))
+        lines = complete.decode("utf-8").splitlines()
+        if not lines:
+            return
+        header = json.loads(lines[0]).get("tournament")
+        if header != params:
+            raise TournamentError(f"{self.path} holds results of a different tournament: {header}")
+        self.records = [json.loads(line) for line in lines[1:]]
+
+    def write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def add(self, record):
+        self.records.append(record)
+        self.write(record)
+
+    def close(self):
+        self.file.close()
+
+
+def run_tournament(params, matches, out, jobs=None, progress=None):
+    """
+    Доигрывает турнир до matches матчей, дописывая результаты в out.
+    Возвращает записи всех сыгранных матчей (включая сыгранные ранее).
+    """
+    results = ResultsFile(out, params)
+    done = {record["index"] for record in results.records}
+    specs = ({"index": index, "seed": match_seed(params["seed"], index), "fleets": params["fleets"],
+              "cyborgs": params["cyborgs"], "tick_rate": params["tick_rate"],
+              "max_ticks": params["max_ticks"], "stats": params.get("stats")}
+             for index in range(matches) if index not in done)
+    jobs = jobs or os.cpu_count() or 1
+    try:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=silence_worker) as executor:
+            # Ограниченное число матчей в очереди: память не растёт с размером турнира
+            pending = set()
+            for spec in specs:
+                pending.add(executor.submit(run_match, spec))
+                if len(pending) >= jobs * 4:
+                    pending = collect(wait(pending, return_when=FIRST_COMPLETED), results, progress)
+            while pending:
+                pending = collect(wait(pending, return_when=FIRST_COMPLETED), results, progress)
+    finally:
+        results.close()
+    return results.records
+
+
+def collect(waited, results, progress):
+    finished, pending = waited
+    for future in finished:
+        results.add(future.result())
+        if progress is not None:
+            progress(len(results.records))
+    return pending
+
+
+def summarize(records, tick_rate):
+    """Сводка по матчам и по парам классов кораблей; tick_rate – частота шагов, с которой они сыграны."""
+    total = len(records)
+    wins = defaultdict(int)
+    for record in records:
+        wins[record["winner"]] += 1
+    matchups = defaultdict(lambda: {"duels": 0, "wins": [0, 0], "draws": 0, "ticks": 0, "crew_lost": [0, 0]})
+    for record in records:
+        for duel in record["duels"]:
+            # Пара хранится в алфавитном порядке, статистика – с точки зрения первого корабля пары
+            order = (0, 1) if duel["ships"][0] <= duel["ships"][1] else (1, 0)
+            stats = matchups[tuple(duel["ships"][i] for i in order)]
+            stats["duels"] += 1
+            stats["ticks"] += duel["ticks"]
+            if duel["winner"] is None:
+                stats["draws"] += 1
+            else:
+                stats["wins"][order.index(TEAMS.index(duel["winner"]))] += 1
+            for side, i in enumerate(order):
+                stats["crew_lost"][side] += duel["crew_lost"][i]
+    return {
+        "matches": total,
+        "win_rate": {team: wins[team] / total if total else 0.0 for team in TEAMS},
+        "draw_rate": wins[None] / total if total else 0.0,
+        "average_time": sum(r["time"] for r in records) / total if total else 0.0,
+        "average_crew_lost": {team: sum(r["crew_lost"][team] for r in records) / total if total else 0.0
+                              for team in TEAMS},
+        "matchups": {f"{a} vs {b}": {
+            "duels": s["duels"],
+            "win_rate": [w / s["duels"] for w in s["wins"]],
+            "draw_rate": s["draws"] / s["duels"],
+            "average_time": s["ticks"] / s["duels"] / tick_rate,
+            "average_crew_lost": [c / s["duels"] for c in s["crew_lost"]],
+        } for (a, b), s in sorted(matchups.items())},
+    }
+
+
+def print_summary(summary, params):
+    names = {team: f"{team} ({params['profiles'][team]}, {params['cyborgs'][team]})" for team in TEAMS}
+    print(f"Matches: {summary['matches']}  Draws: {summary['draw_rate']:.1%}  "
+          f"Average length: {summary['average_time']:.1f}s")
+    for team in TEAMS:
+        print(f"  {names[team]}: wins {summary['win_rate'][team]:.1%}, "
+              f"crew lost per match {summary['average_crew_lost'][team]:.1f}")
+    print(f"{'Matchup':<44} {'duels':>6} {'wins':>13} {'draws':>6} {'length':>7} {'crew lost':>11}")
+    for name, s in summary["matchups"].items():
+        print(f"{name:<44} {s['duels']:>6} {s['win_rate'][0]:>6.1%} {s['win_rate'][1]:>6.1%} "
+              f"{s['draw_rate']:>6.1%} {s['average_time']:>6.1f}s "
+              f"{s['average_crew_lost'][0]:>5.1f} {s['average_crew_lost'][1]:>5.1f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Турнир киборгов без отрисовки")
+    parser.add_argument("team1", help="профиль Team 1 из saved_teams.json")
+    parser.add_argument("team2", help="профиль Team 2 из saved_teams.json")
+    parser.add_argument("--difficulty", nargs=2, default=("Medium", "Medium"), metavar=("TEAM1", "TEAM2"),
+                        choices=DIFFICULTIES, help="сложность AI команд: Easy, Medium или Hard")
+    parser.add_argument("--matches", type=int, default=1000, help="число матчей")
+    parser.add_argument("--jobs", type=int, default=None, help="число процессов (по умолчанию – все ядра)")
+    parser.add_argument("--seed", type=int, default=0, help="зерно турнира")
+    parser.add_argument("--max-time", type=float, default=MAX_MATCH_SECONDS,
+                        help="лимит игрового времени матча в секундах, после него – ничья")
+    parser.add_argument("--out", default="tournament.jsonl", help="файл результатов (продолжается, если есть)")
+    parser.add_argument("--saves", default=SAVES_FILE, help="файл профилей команд")
+    parser.add_argument("--stats", default=None, help="JSON с изменёнными характеристиками кораблей")
+    parser.add_argument("--json", action="store_true", help="вывести сводку в JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        params = {
+            "seed": args.seed,
+            "profiles": {"Team 1": args.team1, "Team 2": args.team2},
+            "fleets": {"Team 1": load_fleet(args.team1, args.saves), "Team 2": load_fleet(args.team2, args.saves)},
+            "cyborgs": {"Team 1": args.difficulty[0], "Team 2": args.difficulty[1]},
+            "tick_rate": TICK_RATE,
+            "max_ticks": round(args.max_time * TICK_RATE),
+        }
+        if args.stats:
+            # Характеристики входят в параметры: продолжение турнира с другими значениями – ошибка
+            params["stats"] = ship_stats(args.stats)
+        started = time.perf_counter()
+        resumed = []
+
+        def progress(count):
+            if not resumed:
+                resumed.append(count - 1)  # матчи из прошлых запусков не входят в скорость
+            if count % 50 == 0 or count == args.matches:
+                rate = (count - resumed[0]) / (time.perf_counter() - started)
+                print(f"\r{count}/{args.matches} matches, {rate:.1f}/s", end="", file=sys.stderr, flush=True)
+
+        records = run_tournament(params, args.matches, args.out, args.jobs, progress)
+    except TournamentError as e:
+        print("Error:", e, file=sys.stderr)
+        return 2
+    print(file=sys.stderr)
+    summary = summarize(records, params["tick_rate"])
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        print_summary(summary, params)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,10 +2,10 @@ import math
 import random
 from project.config import FIELD_W, FIELD_H
 
-def spawn_ship():
+def spawn_ship(rng=random):
     margin = 15  # чтобы корабль полностью был внутри поля
-    x = random.uniform(margin, FIELD_W - margin)
-    y = random.uniform(margin, FIELD_H - margin)
+    x = rng.uniform(margin, FIELD_W - margin)
+    y = rng.uniform(margin, FIELD_H - margin)
     return (x, y)
 
 def wrap_coord(coord, max_val):
@@ -32,7 +32,7 @@ def wrap_midpoint(xA, yA, xB, yB):
 def world_to_screen(obj_x, obj_y, cam_x, cam_y, zoom):
     dx = wrap_delta(cam_x, obj_x, FIELD_W)
     dy = wrap_delta(cam_y, obj_y, FIELD_H)
-    from config import GAME_SCREEN_W, SCREEN_H
+    from project.config import GAME_SCREEN_W, SCREEN_H
     sx = (GAME_SCREEN_W / 2) + dx * zoom
     sy = (SCREEN_H / 2) + dy * zoom
     return (int(sx), int(sy))